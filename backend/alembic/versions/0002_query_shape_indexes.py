@@ -0,0 +1,73 @@
+"""composite indexes for the router queries, session running aggregates
+
+Every listing filters on user_id (and optionally session_id) and pages newest-first on
+(timestamp, id), so the single-column indexes are replaced with composites that end in
+(timestamp, id). The per-session snapshot index INCLUDEs the metric columns so stats and
+series queries are index-only.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 19:25:02.104117
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0002"
+down_revision: str | Sequence[str] | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sessions", sa.Column("snapshot_count", sa.Integer(), server_default="0", nullable=False)
+    )
+    op.add_column(
+        "sessions", sa.Column("score_sum", sa.Float(), server_default="0", nullable=False)
+    )
+    op.add_column(
+        "sessions", sa.Column("good_count", sa.Integer(), server_default="0", nullable=False)
+    )
+
+    op.drop_index("ix_sessions_user_id", table_name="sessions")
+    op.create_index("ix_sessions_user_started_id", "sessions", ["user_id", "started_at", "id"])
+
+    op.drop_index("ix_snapshots_session_id", table_name="snapshots")
+    op.create_index("ix_snapshots_user_captured_id", "snapshots", ["user_id", "captured_at", "id"])
+    op.create_index(
+        "ix_snapshots_session_captured_id",
+        "snapshots",
+        ["session_id", "captured_at", "id"],
+        postgresql_include=[
+            "user_id", "posture_score", "posture_state", "neck_angle", "shoulder_tilt",
+            "spine_angle",
+        ],
+    )
+
+    op.drop_index("ix_alerts_session_id", table_name="alerts")
+    op.create_index("ix_alerts_user_triggered_id", "alerts", ["user_id", "triggered_at", "id"])
+    op.create_index(
+        "ix_alerts_session_triggered_id",
+        "alerts",
+        ["session_id", "triggered_at", "id"],
+        postgresql_include=["alert_type"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_alerts_session_triggered_id", table_name="alerts")
+    op.drop_index("ix_alerts_user_triggered_id", table_name="alerts")
+    op.create_index("ix_alerts_session_id", "alerts", ["session_id"])
+
+    op.drop_index("ix_snapshots_session_captured_id", table_name="snapshots")
+    op.drop_index("ix_snapshots_user_captured_id", table_name="snapshots")
+    op.create_index("ix_snapshots_session_id", "snapshots", ["session_id"])
+
+    op.drop_index("ix_sessions_user_started_id", table_name="sessions")
+    op.create_index("ix_sessions_user_id", "sessions", ["user_id"])
+
+    op.drop_column("sessions", "good_count")
+    op.drop_column("sessions", "score_sum")
+    op.drop_column("sessions", "snapshot_count")
@@ -0,0 +1,42 @@
+"""snapshot rollups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 19:31:40.512276
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0003"
+down_revision: str | Sequence[str] | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "snapshot_rollups",
+        sa.Column("session_id", sa.String(), nullable=False),
+        sa.Column("minute", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("sample_count", sa.Integer(), nullable=False),
+        sa.Column("avg_posture_score", sa.Float(), nullable=False),
+        sa.Column("min_posture_score", sa.Float(), nullable=False),
+        sa.Column("max_posture_score", sa.Float(), nullable=False),
+        sa.Column("good_count", sa.Integer(), nullable=False),
+        sa.Column("bad_count", sa.Integer(), nullable=False),
+        sa.Column("risky_count", sa.Integer(), nullable=False),
+        sa.Column("avg_neck_angle", sa.Float(), nullable=True),
+        sa.Column("avg_shoulder_tilt", sa.Float(), nullable=True),
+        sa.Column("avg_spine_angle", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["session_id"], ["sessions.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("session_id", "minute"),
+    )
+    op.create_index("ix_snapshot_rollups_user_minute", "snapshot_rollups", ["user_id", "minute"])
+
+
+def downgrade() -> None:
+    op.drop_table("snapshot_rollups")
@@ -0,0 +1,35 @@
+"""insight cache
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 19:44:08.337910
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0004"
+down_revision: str | Sequence[str] | None = "0003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "insight_cache",
+        sa.Column("session_id", sa.String(), nullable=False),
+        sa.Column("stats_hash", sa.String(), nullable=False),
+        sa.Column("insights", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True),
+            server_default=sa.text("now()"), nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["session_id"], ["sessions.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("session_id", "stats_hash"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("insight_cache")
@@ -0,0 +1,38 @@
+"""badge uniqueness
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 20:33:05.438903
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0006"
+down_revision: str | Sequence[str] | None = "0005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # the old read-modify-write could award a badge twice under concurrent session ends;
+    # keep the earliest copy before adding the constraint
+    op.execute(
+        """
+        DELETE FROM badges b
+        USING badges keep
+        WHERE keep.user_id = b.user_id AND keep.badge_key = b.badge_key
+          AND (keep.earned_at, keep.id) < (b.earned_at, b.id)
+        """
+    )
+    # the unique index leads with user_id, so it replaces the plain user_id index
+    op.create_unique_constraint("uq_badges_user_key", "badges", ["user_id", "badge_key"])
+    op.drop_index("ix_badges_user_id", table_name="badges")
+    op.alter_column("badges", "notified", server_default=sa.text("false"))
+
+
+def downgrade() -> None:
+    op.alter_column("badges", "notified", server_default=None)
+    op.create_index("ix_badges_user_id", "badges", ["user_id"])
+    op.drop_constraint("uq_badges_user_key", "badges", type_="unique")
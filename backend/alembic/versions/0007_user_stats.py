@@ -0,0 +1,59 @@
+"""user stats
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 20:34:18.452122
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0007"
+down_revision: str | Sequence[str] | None = "0006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("total_sessions", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("total_seconds", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("score_sum", sa.Float(), server_default="0", nullable=False),
+        sa.Column("scored_sessions", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("badge_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    # backfill from existing history
+    op.execute(
+        """
+        INSERT INTO user_stats
+            (user_id, total_sessions, total_seconds, score_sum, scored_sessions, badge_count)
+        SELECT u.id,
+               coalesce(s.total_sessions, 0), coalesce(s.total_seconds, 0),
+               coalesce(s.score_sum, 0), coalesce(s.scored_sessions, 0),
+               coalesce(b.badge_count, 0)
+        FROM users u
+        LEFT JOIN (
+            SELECT user_id, count(*) AS total_sessions,
+                   sum(coalesce(duration_seconds, 0)) AS total_seconds,
+                   sum(avg_posture_score) AS score_sum, count(avg_posture_score) AS scored_sessions
+            FROM sessions WHERE status = 'completed' GROUP BY user_id
+        ) s ON s.user_id = u.id
+        LEFT JOIN (
+            SELECT user_id, count(*) AS badge_count FROM badges GROUP BY user_id
+        ) b ON b.user_id = u.id
+        WHERE s.user_id IS NOT NULL OR b.user_id IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_stats")
@@ -0,0 +1,34 @@
+"""alert coalescing
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 21:02:41.118604
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0008"
+down_revision: str | Sequence[str] | None = "0007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "alerts", sa.Column("repeat_count", sa.Integer(), server_default="1", nullable=False)
+    )
+    op.add_column(
+        "alerts",
+        sa.Column(
+            "last_triggered_at", sa.DateTime(timezone=True),
+            server_default=sa.text("now()"), nullable=False,
+        ),
+    )
+    op.execute("UPDATE alerts SET last_triggered_at = triggered_at")
+
+
+def downgrade() -> None:
+    op.drop_column("alerts", "last_triggered_at")
+    op.drop_column("alerts", "repeat_count")
@@ -0,0 +1,46 @@
+"""daily user stats
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 21:58:12.906337
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0010"
+down_revision: str | Sequence[str] | None = "0009"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # filled at session end from here on; history comes from
+    # `python -m scripts.backfill_daily_stats`
+    op.create_table(
+        "daily_user_stats",
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("sessions", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("tracked_seconds", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("score_seconds", sa.Float(), server_default="0", nullable=False),
+        sa.Column("scored_seconds", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("good_seconds", sa.Float(), server_default="0", nullable=False),
+        sa.Column("rated_seconds", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("total_alerts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("neck_alerts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("shoulder_alerts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("spine_alerts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("break_reminder_alerts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True),
+            server_default=sa.text("now()"), nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "day"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_user_stats")
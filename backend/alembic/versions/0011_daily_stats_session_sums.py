@@ -0,0 +1,51 @@
+"""daily stats session sums
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 09:12:40.581377
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0011"
+down_revision: str | Sequence[str] | None = "0010"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_COLUMNS = [
+    ("score_sum", sa.Float()),
+    ("scored_sessions", sa.Integer()),
+    ("good_sum", sa.Float()),
+    ("rated_sessions", sa.Integer()),
+]
+
+
+def upgrade() -> None:
+    for name, type_ in _COLUMNS:
+        op.add_column(
+            "daily_user_stats", sa.Column(name, type_, server_default="0", nullable=False)
+        )
+    op.execute(
+        """
+        UPDATE daily_user_stats d
+        SET score_sum = s.score_sum, scored_sessions = s.scored_sessions,
+            good_sum = s.good_sum, rated_sessions = s.rated_sessions
+        FROM (
+            SELECT user_id, (started_at AT TIME ZONE 'UTC')::date AS day,
+                   coalesce(sum(avg_posture_score), 0) AS score_sum,
+                   count(avg_posture_score) AS scored_sessions,
+                   coalesce(sum(good_posture_percent), 0) AS good_sum,
+                   count(good_posture_percent) AS rated_sessions
+            FROM sessions WHERE status = 'completed'
+            GROUP BY 1, 2
+        ) s
+        WHERE d.user_id = s.user_id AND d.day = s.day
+        """
+    )
+
+
+def downgrade() -> None:
+    for name, _ in reversed(_COLUMNS):
+        op.drop_column("daily_user_stats", name)
@@ -13,6 +13,105 @@ class Settings(BaseSettings):
     RESEND_API_KEY: str = ""
     FRONTEND_URL: str = "http://localhost:3000"
 
+    # /insights results, keyed by session id + hash of the submitted stats
+    INSIGHTS_CACHE_TTL_SECONDS: float = 3600
+    INSIGHTS_CACHE_MAX_SIZE: int = 1024
+    INSIGHTS_CACHE_PERSIST: bool = False  # also keep results in the insight_cache table
+
+    # default /insights engine: "gemini", "local" (rule-based, no network) or "auto"
+    # (Gemini, answered locally when it is slower than the timeout or failing)
+    INSIGHTS_ENGINE: str = "gemini"
+    INSIGHTS_REMOTE_TIMEOUT_SECONDS: float = 3.0
+    INSIGHTS_REMOTE_COOLDOWN_SECONDS: float = 30  # after a Gemini error, "auto" skips it this long
+
+    # background workers for POST /insights?mode=job; jobs are claimed from the insight_jobs
+    # table with FOR UPDATE SKIP LOCKED, so several app processes can share one queue
+    INSIGHTS_WORKERS: int = 2  # per process; 0 leaves jobs for another process to run
+    INSIGHTS_MAX_CONCURRENCY: int = 2  # Gemini calls in flight per process
+    INSIGHTS_RATE_PER_SECOND: float = 5.0  # Gemini calls started per second per process
+    INSIGHTS_JOB_MAX_ATTEMPTS: int = 4
+    INSIGHTS_JOB_BACKOFF_SECONDS: float = 2.0  # doubled after every failed attempt
+    INSIGHTS_JOB_POLL_SECONDS: float = 2.0
+    INSIGHTS_JOB_TIMEOUT_SECONDS: float = 120  # a running job untouched this long is re-claimed
+
+    # argon2 cost and the thread pool that runs it off the event loop; logins beyond
+    # PASSWORD_HASH_MAX_PENDING queued hashes are turned away with 503
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_WORKERS: int = 2  # keep below the core count; each hash is CPU-bound
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # connection pool, per app process; size workers so that processes x (DB_POOL_SIZE +
+    # DB_MAX_OVERFLOW) stays below Postgres max_connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30  # seconds a checkout waits before failing
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 keeps connections forever
+    DB_POOL_PRE_PING: bool = False
+    # asyncpg's statement cache and SQLAlchemy's prepared statement cache, per connection;
+    # set both to 0 behind pgbouncer in transaction pooling mode
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+
+    # optional streaming replica for list/analytics reads; a user's reads stay on the primary
+    # for REPLICA_READ_YOUR_WRITES_SECONDS after they commit a write in this process
+    DATABASE_REPLICA_URL: str = ""
+    REPLICA_READ_YOUR_WRITES_SECONDS: float = 5
+
+    # GET /metrics (Prometheus text format) and per-request timing; the slow-request log is
+    # off while both thresholds are 0, and includes the request's SQL when it fires
+    METRICS_ENABLED: bool = True
+    SLOW_REQUEST_MS: float = 0
+    SLOW_REQUEST_QUERIES: int = 0  # e.g. 20 to catch N+1 patterns
+
+    # run `alembic upgrade head` in the app lifespan; turn off when deploys migrate separately
+    DB_MIGRATE_ON_STARTUP: bool = True
+
+    # how end_session fills avg_posture_score / good_posture_percent / total_alerts:
+    # "client" trusts the request body, "query" aggregates snapshots and alerts at session
+    # end, "running" keeps counters on the session row up to date on every ingest
+    SESSION_AGGREGATES: str = "query"
+
+    # optional range partitioning of snapshots by captured_at, and raw-snapshot retention;
+    # SNAPSHOT_RETENTION_DAYS=0 keeps raw rows forever
+    SNAPSHOT_PARTITIONING: bool = False
+    SNAPSHOT_PARTITION_MONTHS: int = 1
+    SNAPSHOT_PARTITIONS_AHEAD: int = 2
+    SNAPSHOT_RETENTION_DAYS: int = 0
+
+    # /sessions/{id}/stream write batching
+    STREAM_BATCH_SIZE: int = 200
+    STREAM_FLUSH_SECONDS: float = 1.0
+    STREAM_MAX_PENDING: int = 2000
+
+    # a repeat of an alert type within this many seconds of the session's open (unacknowledged)
+    # alert of that type bumps its repeat_count instead of adding a row; 0 stores every alert
+    ALERT_COALESCE_SECONDS: float = 0
+
+    # GET /notifications/stream (server-sent events); NOTIFY_VIA_POSTGRES fans events out
+    # through LISTEN/NOTIFY so clients hear about writes handled by any worker process
+    NOTIFY_VIA_POSTGRES: bool = False
+    NOTIFY_HEARTBEAT_SECONDS: float = 15
+    NOTIFY_QUEUE_SIZE: int = 100  # events buffered per connection before a slow client misses some
+
+    # in-process cache of authenticated users and decoded access tokens
+    USER_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_ENABLED: bool = True
+    USER_CACHE_TTL_SECONDS: float = 60
+    USER_CACHE_MAX_SIZE: int = 10_000
+
+    # token revocation: revoked refresh tokens and token families are mirrored into an
+    # in-memory Bloom filter, refreshed from revoked_tokens every REVOCATION_RELOAD_SECONDS
+    # (the longest another worker may still accept a token revoked elsewhere)
+    REVOCATION_RELOAD_SECONDS: float = 5
+    REVOCATION_REBUILD_SECONDS: float = 3600  # prune expired rows and rebuild the filter
+    REVOCATION_BLOOM_CAPACITY: int = 100_000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001  # false positives cost one confirming query
+    # replaying a rotated refresh token revokes its whole family, except within this window,
+    # which covers two tabs refreshing at the same moment
+    REFRESH_REUSE_GRACE_SECONDS: float = 10
+
     model_config = SettingsConfigDict(
         env_file=".env", case_sensitive=False, extra="ignore"
     )
@@ -1,18 +1,152 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+import bisect
+import time
+from pathlib import Path
 
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event, exc, inspect, make_url
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, ORMExecuteState, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.cache import TTLCache
 from app.config import get_settings
 
 settings = get_settings()
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)  # seconds, upper bounds
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_counts = [0] * (len(self.WAIT_BUCKETS) + 1)  # last one is +Inf
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self.wait_counts[bisect.bisect_left(self.WAIT_BUCKETS, waited)] += 1
+
+
+def _engine_options(url: str) -> dict:
+    options = {
+        "echo": False,
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if make_url(url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
+# sessions check a connection out on their first statement, not when they are opened, so
+# requests answered from caches never touch the pool
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
+replica_engine = (
+    create_async_engine(
+        settings.DATABASE_REPLICA_URL, **_engine_options(settings.DATABASE_REPLICA_URL)
+    )
+    if settings.DATABASE_REPLICA_URL else None
+)
+ReplicaSessionLocal = (
+    async_sessionmaker(replica_engine, expire_on_commit=False) if replica_engine else None
+)
+
+
+def pool_stats(target: AsyncEngine = engine) -> dict:
+    pool = target.sync_engine.pool
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    return {
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "saturation": round(pool.checkedout() / capacity, 3) if capacity else None,
+        "checkouts": pool.checkouts,
+        "timeouts": pool.timeouts,
+        "wait_avg_ms": round(pool.wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+        "wait_max_ms": round(pool.wait_max * 1000, 3),
+        "wait_buckets": dict(
+            zip([*map(str, InstrumentedPool.WAIT_BUCKETS), "+Inf"], pool.wait_counts, strict=True)
+        ),
+    }
+
+
+# read-your-writes: users who committed a write recently, in this process. A session learns
+# its user from get_current_user (session.info["user_id"]) and notes any flush or DML.
+_recent_writers = TTLCache(maxsize=100_000, ttl=settings.REPLICA_READ_YOUR_WRITES_SECONDS)
+
+
+def wrote_recently(user_id: str) -> bool:
+    return _recent_writers.get(user_id) is not None
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flush(session: Session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_dml(state: ORMExecuteState):
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _note_commit(session: Session):
+    if session.info.pop("wrote", False) and (user_id := session.info.get("user_id")):
+        _recent_writers.set(user_id, True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_writes(session: Session):
+    session.info.pop("wrote", None)
+
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
 
 class Base(DeclarativeBase):
     pass
 
 
+def _upgrade_to_head(connection: Connection):
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.attributes["connection"] = connection
+    tables = set(inspect(connection).get_table_names())
+    if "users" in tables and "alembic_version" not in tables:
+        # schema was built by create_all before migrations existed; it matches 0001
+        command.stamp(cfg, "0001")
+    command.upgrade(cfg, "head")
+
+
 async def init_db():
+    if not settings.DB_MIGRATE_ON_STARTUP:
+        return
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(_upgrade_to_head)
@@ -1,42 +1,48 @@
 from typing import AsyncGenerator
 
 from fastapi import Cookie, Depends, HTTPException, status
-from jose import JWTError, jwt
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import get_settings
-from app.database import AsyncSessionLocal
+from app.database import AsyncSessionLocal, ReplicaSessionLocal, wrote_recently
 from app.models.user import User
+from app.services.user_cache import load_user, user_id_from_token
 
 
-settings = get_settings()
-
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
 
 
+async def get_read_db(
+    access_token: str | None = Cookie(default=None),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints: the replica when one is configured, unless the
+    caller committed a write within REPLICA_READ_YOUR_WRITES_SECONDS."""
+    user_id = await user_id_from_token(access_token) if access_token else None
+    use_primary = ReplicaSessionLocal is None or (user_id is not None and wrote_recently(user_id))
+    async with (AsyncSessionLocal if use_primary else ReplicaSessionLocal)() as session:
+        yield session
+
+
+async def user_from_token(access_token: str | None, db: AsyncSession) -> User | None:
+    if not access_token:
+        return None
+    user_id = await user_id_from_token(access_token)
+    if not user_id:
+        return None
+    return await load_user(user_id, db)
+
+
 async def get_current_user(
     access_token: str | None = Cookie(default=None),
     db: AsyncSession = Depends(get_db),
 ) -> User:
-    credentials_exc = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid or expired token",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    if not access_token:
-        raise credentials_exc
-    try:
-        payload = jwt.decode(access_token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        user_id: str = payload.get("sub")
-        if not user_id:
-            raise credentials_exc
-    except JWTError:
-        raise credentials_exc
-
-    user = await db.scalar(select(User).where(User.id == user_id))
+    user = await user_from_token(access_token, db)
     if not user:
-        raise credentials_exc
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    db.info["user_id"] = user.id  # lets commits on this session mark the user for read-your-writes
     return user
\ No newline at end of file
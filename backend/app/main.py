@@ -1,20 +1,49 @@
+import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from app.config import get_settings
-from app.database import init_db
 import app.models  # noqa: F401 — ensures all models are registered with Base.metadata
-from app.routers import alerts, auth, gamification, insights, sessions, snapshots
-
+from app import metrics
+from app.config import get_settings
+from app.database import InstrumentedPool, engine, init_db, pool_stats, replica_engine
+from app.pagination import NEXT_CURSOR_HEADER
+from app.routers import (
+    alerts,
+    auth,
+    export,
+    gamification,
+    insights,
+    notifications,
+    sessions,
+    snapshots,
+    stats,
+)
+from app.services.auth_service import HashingBusy, hash_pool_stats
+from app.services.insight_jobs import job_workers
+from app.services.insights_service import insights_cache
+from app.services.notifications import hub
+from app.services.retention_service import maintain_partitions
+from app.services.token_revocation import revocations
+from app.services.user_cache import cache_stats
 
 settings = get_settings()
+log = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    if settings.SNAPSHOT_PARTITIONING:
+        await maintain_partitions()
+    await revocations.start()
+    job_workers.start()
+    hub.start()
     yield
+    await hub.stop()
+    await job_workers.stop()
+    await revocations.stop()
 
 
 app = FastAPI(title="Ergonomics Coach API", lifespan=lifespan)
@@ -25,15 +54,85 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+
+@app.exception_handler(HashingBusy)
+async def hashing_busy_handler(request: Request, exc: HashingBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many sign-ins in progress, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+if settings.METRICS_ENABLED:
+    engines = {"primary": engine}
+    if replica_engine is not None:
+        engines["replica"] = replica_engine
+    for name, eng in engines.items():
+        metrics.instrument_engine(eng, name)
+
+    def _pool_metrics() -> list[str]:
+        pools = {n: e.sync_engine.pool for n, e in engines.items()}
+        lines = [
+            "# HELP db_pool_checked_out Connections currently checked out.",
+            "# TYPE db_pool_checked_out gauge",
+            *(f'db_pool_checked_out{{pool="{n}"}} {p.checkedout()}' for n, p in pools.items()),
+            "# HELP db_pool_capacity Pool size plus max overflow.",
+            "# TYPE db_pool_capacity gauge",
+            *(f'db_pool_capacity{{pool="{n}"}} {p.size() + max(p._max_overflow, 0)}'
+              for n, p in pools.items()),
+            "# HELP db_pool_timeouts_total Checkouts that gave up after DB_POOL_TIMEOUT.",
+            "# TYPE db_pool_timeouts_total counter",
+            *(f'db_pool_timeouts_total{{pool="{n}"}} {p.timeouts}' for n, p in pools.items()),
+            "# HELP db_pool_wait_seconds Time spent waiting for a pooled connection.",
+            "# TYPE db_pool_wait_seconds histogram",
+        ]
+        for n, pool in pools.items():
+            lines += metrics.histogram_lines(
+                "db_pool_wait_seconds", {"pool": n}, InstrumentedPool.WAIT_BUCKETS,
+                pool.wait_counts, pool.wait_total,
+            )
+        return lines
+
+    metrics.register_collector(_pool_metrics)
+
+    app.add_middleware(
+        metrics.RequestMetricsMiddleware,
+        slow_ms=settings.SLOW_REQUEST_MS,
+        slow_queries=settings.SLOW_REQUEST_QUERIES,
+    )
+
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 app.include_router(auth.router)
 app.include_router(sessions.router)
 app.include_router(snapshots.router)
 app.include_router(alerts.router)
 app.include_router(gamification.router)
 app.include_router(insights.router)
+app.include_router(notifications.router)
+app.include_router(stats.router)
+app.include_router(export.router)
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
\ No newline at end of file
+    body = {
+        "status": "ok",
+        "password_hashing": hash_pool_stats(),
+        "insights_cache": insights_cache.stats(),
+        "insight_jobs": job_workers.stats(),
+        "notifications": hub.stats(),
+        "token_revocation": revocations.stats(),
+        "db_pool": pool_stats(),
+    }
+    if replica_engine is not None:
+        body["db_replica_pool"] = pool_stats(replica_engine)
+    if settings.USER_CACHE_ENABLED or settings.TOKEN_CACHE_ENABLED:
+        body["auth_cache"] = cache_stats()
+    return body
@@ -0,0 +1,218 @@
+"""Prometheus-format metrics without a client library dependency.
+
+Counters and histograms live in process memory and are rendered by GET /metrics. Per-request
+DB query counts and time are collected through a ContextVar that RequestMetricsMiddleware
+sets and the engine's cursor hooks update.
+"""
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+log = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def histogram_lines(
+    name: str, labels: dict, buckets: Iterable, counts: list[int], total: float
+) -> list[str]:
+    """Sample lines for one histogram series; counts are per bucket (not cumulative) plus +Inf."""
+    lines, cumulative = [], 0
+    for bound, n in zip((*buckets, "+Inf"), counts, strict=True):
+        cumulative += n
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {cumulative}")
+    lines.append(f"{name}_sum{_labels(labels)} {total}")
+    lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self._values: dict[tuple, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1, **labels):
+        self._values[tuple(labels[n] for n in self.labelnames)] += amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in self._values.items():
+            labels = dict(zip(self.labelnames, key, strict=True))
+            lines.append(f"{self.name}{_labels(labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple = LATENCY_BUCKETS,
+    ):
+        self.name, self.help, self.labelnames, self.buckets = name, help, labelnames, buckets
+        self._counts: dict[tuple, list[int]] = {}  # per label set: per bucket, then +Inf
+        self._sums: dict[tuple, float] = defaultdict(float)
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        self._sums[key] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, counts in self._counts.items():
+            labels = dict(zip(self.labelnames, key, strict=True))
+            lines += histogram_lines(self.name, labels, self.buckets, counts, self._sums[key])
+        return lines
+
+
+http_requests = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, up to the last byte of the response.",
+    ("method", "route", "status"),
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request.", ("route",), COUNT_BUCKETS
+)
+db_time_per_request = Histogram(
+    "db_time_per_request_seconds", "Time spent in SQL per HTTP request.", ("route",)
+)
+db_queries = Histogram("db_query_duration_seconds", "SQL statement latency.", ("engine",))
+gemini_calls = Histogram(
+    "gemini_request_duration_seconds", "Gemini generate_content latency.", ("outcome",)
+)
+slow_requests = Counter(
+    "http_slow_requests_total", "Requests over the slow-request thresholds.", ("route",)
+)
+
+_registry = [
+    http_requests,
+    db_queries_per_request,
+    db_time_per_request,
+    db_queries,
+    gemini_calls,
+    slow_requests,
+]
+_collectors: list[Callable[[], list[str]]] = []
+
+
+def register_collector(collect: Callable[[], list[str]]):
+    """Add a callable producing extra exposition lines (gauges read at scrape time)."""
+    _collectors.append(collect)
+
+
+def render() -> str:
+    lines = [line for metric in _registry for line in metric.render()]
+    for collect in _collectors:
+        lines += collect()
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    statements: list[tuple[float, str]] | None = None  # (seconds, sql), only when capturing
+
+
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+class RequestMetricsMiddleware:
+    """Times each HTTP request and counts its SQL, logging requests over the slow thresholds.
+
+    Plain ASGI rather than BaseHTTPMiddleware: the request is observed once the last body
+    message has been sent, so streamed responses (exports, NDJSON listings) are measured in
+    full, including the queries that run while the body is produced.
+    """
+
+    def __init__(self, app: ASGIApp, slow_ms: float = 0, slow_queries: int = 0):
+        self.app = app
+        self.slow_ms = slow_ms
+        self.slow_queries = slow_queries
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        capture = self.slow_ms > 0 or self.slow_queries > 0
+        stats = RequestStats(statements=[] if capture else None)
+        token = current_request.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+        observed = False
+
+        async def send_and_observe(message: Message):
+            nonlocal status_code, observed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                observed = True
+                self._observe(scope, status_code, stats, time.perf_counter() - start)
+
+        try:
+            await self.app(scope, receive, send_and_observe)
+        finally:
+            current_request.reset(token)
+            if not observed:  # failed, or the client left before the body was complete
+                self._observe(scope, status_code, stats, time.perf_counter() - start)
+
+    def _observe(self, scope: Scope, status_code: int, stats: RequestStats, elapsed: float):
+        method = scope["method"]
+        route = getattr(scope.get("route"), "path", "unmatched")
+        http_requests.observe(elapsed, method=method, route=route, status=status_code)
+        db_queries_per_request.observe(stats.queries, route=route)
+        db_time_per_request.observe(stats.db_seconds, route=route)
+        too_slow = self.slow_ms > 0 and elapsed * 1000 >= self.slow_ms
+        too_chatty = self.slow_queries > 0 and stats.queries >= self.slow_queries
+        if too_slow or too_chatty:
+            slow_requests.inc(route=route)
+            sql = "\n".join(f"  {secs * 1000:.1f}ms  {stmt}" for secs, stmt in stats.statements)
+            log.warning(
+                "slow request %s %s: %.1fms, %d queries, %.1fms in SQL\n%s",
+                method, route, elapsed * 1000, stats.queries, stats.db_seconds * 1000, sql,
+            )
+
+
+def instrument_engine(engine: AsyncEngine, name: str):
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_start
+        db_queries.observe(elapsed, engine=name)
+        if (stats := current_request.get()) is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            if stats.statements is not None:
+                stats.statements.append((elapsed, statement))
@@ -1,7 +1,22 @@
 from app.models.alert import PostureAlert
-from app.models.gamification import UserBadge, UserStreak
+from app.models.gamification import UserBadge, UserStats, UserStreak
+from app.models.insight import InsightCacheEntry, InsightJob
+from app.models.rollup import DailyUserStats, SnapshotRollup
 from app.models.session import PostureSession
 from app.models.snapshot import PostureSnapshot
-from app.models.user import User
+from app.models.user import RevokedToken, User
 
-__all__ = ["User", "PostureSession", "PostureSnapshot", "PostureAlert", "UserStreak", "UserBadge"]
\ No newline at end of file
+__all__ = [
+    "User",
+    "RevokedToken",
+    "PostureSession",
+    "PostureSnapshot",
+    "PostureAlert",
+    "UserStreak",
+    "UserBadge",
+    "UserStats",
+    "SnapshotRollup",
+    "DailyUserStats",
+    "InsightCacheEntry",
+    "InsightJob",
+]
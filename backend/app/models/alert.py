@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -9,11 +9,25 @@ from app.database import Base
 
 class PostureAlert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        Index("ix_alerts_user_triggered_id", "user_id", "triggered_at", "id"),
+        Index(
+            "ix_alerts_session_triggered_id", "session_id", "triggered_at", "id",
+            postgresql_include=["alert_type"],
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    session_id: Mapped[str] = mapped_column(String, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+    session_id: Mapped[str] = mapped_column(
+        String, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False
+    )
     user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     triggered_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     alert_type: Mapped[str] = mapped_column(String, nullable=False)  # neck | shoulder | spine | break_reminder
     message: Mapped[str] = mapped_column(String, nullable=False)
-    acknowledged: Mapped[bool] = mapped_column(Boolean, default=False)
\ No newline at end of file
+    acknowledged: Mapped[bool] = mapped_column(Boolean, default=False)
+    # repeats folded into this row by ALERT_COALESCE_SECONDS, and when the latest one fired
+    repeat_count: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
+    last_triggered_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
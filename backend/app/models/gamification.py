@@ -1,7 +1,18 @@
 import uuid
 from datetime import date, datetime
 
-from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -20,9 +31,29 @@ class UserStreak(Base):
 
 class UserBadge(Base):
     __tablename__ = "badges"
+    # one row per earned badge; also what makes the set-based badge insert idempotent
+    __table_args__ = (UniqueConstraint("user_id", "badge_key", name="uq_badges_user_key"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(
+        String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
     badge_key: Mapped[str] = mapped_column(String, nullable=False)  # e.g. "streak_7", "perfect_session"
     earned_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    notified: Mapped[bool] = mapped_column(Boolean, default=False)
\ No newline at end of file
+    notified: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
+
+class UserStats(Base):
+    """Lifetime totals per user, folded in at every session end."""
+
+    __tablename__ = "user_stats"
+
+    user_id: Mapped[str] = mapped_column(
+        String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    total_sessions: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    total_seconds: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    # sum of the per-session averages
+    score_sum: Mapped[float] = mapped_column(Float, default=0, server_default="0")
+    scored_sessions: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    badge_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
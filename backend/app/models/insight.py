@@ -0,0 +1,52 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class InsightCacheEntry(Base):
+    __tablename__ = "insight_cache"
+
+    session_id: Mapped[str] = mapped_column(
+        String, ForeignKey("sessions.id", ondelete="CASCADE"), primary_key=True
+    )
+    # sha256 of the InsightsRequest stats
+    stats_hash: Mapped[str] = mapped_column(String, primary_key=True)
+    insights: Mapped[list] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class InsightJob(Base):
+    __tablename__ = "insight_jobs"
+    __table_args__ = (
+        # the claim query only ever scans runnable jobs
+        Index(
+            "ix_insight_jobs_runnable", "run_after",
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+        Index("ix_insight_jobs_user_created", "user_id", "created_at"),
+    )
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id: Mapped[str] = mapped_column(
+        String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    session_id: Mapped[str] = mapped_column(
+        String, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False
+    )
+    # queued | running | done | failed
+    status: Mapped[str] = mapped_column(String, nullable=False, server_default="queued")
+    # InsightsRequest stats, without session_id
+    request: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    result: Mapped[list | None] = mapped_column(JSONB)
+    error: Mapped[str | None] = mapped_column(String)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,63 @@
+from datetime import date, datetime
+
+from sqlalchemy import BigInteger, Date, DateTime, Float, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class SnapshotRollup(Base):
+    """Per-session, per-minute summary of snapshots that the retention job has purged."""
+
+    __tablename__ = "snapshot_rollups"
+    __table_args__ = (Index("ix_snapshot_rollups_user_minute", "user_id", "minute"),)
+
+    session_id: Mapped[str] = mapped_column(
+        String, ForeignKey("sessions.id", ondelete="CASCADE"), primary_key=True
+    )
+    minute: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    user_id: Mapped[str] = mapped_column(
+        String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    avg_posture_score: Mapped[float] = mapped_column(Float, nullable=False)
+    min_posture_score: Mapped[float] = mapped_column(Float, nullable=False)
+    max_posture_score: Mapped[float] = mapped_column(Float, nullable=False)
+    good_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    bad_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    risky_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    avg_neck_angle: Mapped[float | None] = mapped_column(Float, nullable=True)
+    avg_shoulder_tilt: Mapped[float | None] = mapped_column(Float, nullable=True)
+    avg_spine_angle: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+
+class DailyUserStats(Base):
+    """Per-user, per-day totals of completed sessions, by UTC start date, folded in at every
+    session end. Averages are weighted by session duration, or by session count on a day
+    whose scored sessions add up to no time at all."""
+
+    __tablename__ = "daily_user_stats"
+
+    user_id: Mapped[str] = mapped_column(
+        String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    sessions: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    tracked_seconds: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    # sum of avg_posture_score * duration over sessions that have a score, and their duration
+    score_seconds: Mapped[float] = mapped_column(Float, default=0, server_default="0")
+    scored_seconds: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    # likewise for good_posture_percent, as seconds of good posture
+    good_seconds: Mapped[float] = mapped_column(Float, default=0, server_default="0")
+    rated_seconds: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    # unweighted sums and counts of the same, for days whose weights add up to zero
+    score_sum: Mapped[float] = mapped_column(Float, default=0, server_default="0")
+    scored_sessions: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    good_sum: Mapped[float] = mapped_column(Float, default=0, server_default="0")
+    rated_sessions: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    total_alerts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    neck_alerts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    shoulder_alerts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    spine_alerts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    break_reminder_alerts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, func
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -9,13 +9,21 @@ from app.database import Base
 
 class PostureSession(Base):
     __tablename__ = "sessions"
+    __table_args__ = (Index("ix_sessions_user_started_id", "user_id", "started_at", "id"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(
+        String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
     started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     duration_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
     avg_posture_score: Mapped[float | None] = mapped_column(Float, nullable=True)
     good_posture_percent: Mapped[float | None] = mapped_column(Float, nullable=True)
     total_alerts: Mapped[int] = mapped_column(Integer, default=0)
-    status: Mapped[str] = mapped_column(String, default="active")  # active | completed
\ No newline at end of file
+    status: Mapped[str] = mapped_column(String, default="active")  # active | completed
+
+    # running aggregates, maintained on ingest when SESSION_AGGREGATES == "running"
+    snapshot_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    score_sum: Mapped[float] = mapped_column(Float, default=0, server_default="0")
+    good_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, String, func
+from sqlalchemy import DateTime, Float, ForeignKey, Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -9,9 +9,25 @@ from app.database import Base
 
 class PostureSnapshot(Base):
     __tablename__ = "snapshots"
+    __table_args__ = (
+        Index("ix_snapshots_user_captured_id", "user_id", "captured_at", "id"),
+        # covers per-session listings, stats and series without touching the heap
+        Index(
+            "ix_snapshots_session_captured_id",
+            "session_id",
+            "captured_at",
+            "id",
+            postgresql_include=[
+                "user_id", "posture_score", "posture_state", "neck_angle", "shoulder_tilt",
+                "spine_angle",
+            ],
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    session_id: Mapped[str] = mapped_column(String, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+    session_id: Mapped[str] = mapped_column(
+        String, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False
+    )
     user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     captured_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     posture_score: Mapped[float] = mapped_column(Float, nullable=False)
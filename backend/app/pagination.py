@@ -0,0 +1,45 @@
+import base64
+import binascii
+from datetime import datetime
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(ts: datetime, row_id: str) -> str:
+    raw = f"{ts.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, row_id = raw.split("|", 1)
+        ts = datetime.fromisoformat(ts)
+        if ts.tzinfo is None:  # encode_cursor only sees timestamptz values
+            raise ValueError("naive timestamp")
+        return ts, row_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid cursor") from None
+
+
+def keyset_page(q: Select, ts_col, id_col, cursor: str | None, limit: int) -> Select:
+    """Newest-first page of q, continuing strictly after `cursor` when one is given.
+
+    Seeks on (ts, id) so deep pages cost the same as the first one, given an index that
+    ends in (ts_col, id_col).
+    """
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        q = q.where(tuple_(ts_col, id_col) < tuple_(ts, row_id))
+    return q.order_by(ts_col.desc(), id_col.desc()).limit(limit)
+
+
+def set_next_cursor(response: Response, rows: list, ts_attr: str, limit: int, id_attr: str = "id"):
+    """Advertise the cursor for the following page when this one came back full."""
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        cursor = encode_cursor(getattr(last, ts_attr), getattr(last, id_attr))
+        response.headers[NEXT_CURSOR_HEADER] = cursor
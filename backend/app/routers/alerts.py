@@ -1,12 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_current_user, get_db
+from app.dependencies import get_current_user, get_db, get_read_db
 from app.models.alert import PostureAlert
 from app.models.session import PostureSession
 from app.models.user import User
-from app.schemas.alert import AlertCreate, AlertResponse
+from app.pagination import keyset_page, set_next_cursor
+from app.schemas.alert import (
+    AlertAcknowledgeRequest,
+    AlertAcknowledgeResponse,
+    AlertCreate,
+    AlertResponse,
+)
+from app.serialization import ListFormat, list_format, ndjson_stream, rows_response, select_fields
+from app.services.alert_service import (
+    acknowledge_alerts,
+    alert_event,
+    coalesce_alert,
+    coalescing_enabled,
+)
+from app.services.notifications import notify_user
+from app.services.session_service import bump_alert_count, running_aggregates_enabled
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
 
@@ -17,34 +32,65 @@ async def create_alert(body: AlertCreate, db: AsyncSession = Depends(get_db), us
     if not session:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Session not found")
 
-    alert = PostureAlert(**body.model_dump(), user_id=user.id)
-    db.add(alert)
+    if coalescing_enabled():
+        alert = await coalesce_alert(user.id, body, db)  # loaded from RETURNING, no refresh needed
+    else:
+        alert = PostureAlert(**body.model_dump(), user_id=user.id)
+        db.add(alert)
+        await db.flush()  # assigns the id for the notification; commit would send the same INSERT
+    await notify_user(db, user.id, "alert", alert_event(alert.id, body, alert.repeat_count))
+    if running_aggregates_enabled():
+        await bump_alert_count(body.session_id, 1, db)
     await db.commit()
-    await db.refresh(alert)
+    if not coalescing_enabled():
+        await db.refresh(alert)
     return alert
 
 
 @router.get("", response_model=list[AlertResponse])
 async def list_alerts(
+    response: Response,
     session_id: str | None = None,
     limit: int = 50,
     offset: int = 0,
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = None,
+    fmt: ListFormat = Depends(list_format),
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
 ):
-    q = select(PostureAlert).where(PostureAlert.user_id == user.id)
+    q = select_fields(PostureAlert, AlertResponse).where(PostureAlert.user_id == user.id)
     if session_id:
         q = q.where(PostureAlert.session_id == session_id)
-    rows = await db.scalars(q.order_by(PostureAlert.triggered_at.desc()).limit(limit).offset(offset))
-    return rows.all()
+    q = keyset_page(q, PostureAlert.triggered_at, PostureAlert.id, cursor, limit).offset(offset)
+    if fmt == "ndjson":
+        return ndjson_stream(q, db)
+    rows = (await db.execute(q)).all()
+    set_next_cursor(response, rows, "triggered_at", limit)
+    return rows_response(q, rows, fmt, response)
+
+
+@router.post("/acknowledge", response_model=AlertAcknowledgeResponse)
+async def acknowledge_alerts_bulk(
+    body: AlertAcknowledgeRequest,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    ids = await acknowledge_alerts(
+        user.id, db, ids=body.ids, session_id=body.session_id, before=body.before
+    )
+    await db.commit()
+    return AlertAcknowledgeResponse(acknowledged=len(ids), ids=ids)
 
 
 @router.patch("/{alert_id}/acknowledge", response_model=AlertResponse)
 async def acknowledge_alert(alert_id: str, db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)):
-    alert = await db.scalar(select(PostureAlert).where(PostureAlert.id == alert_id, PostureAlert.user_id == user.id))
+    alert = await db.scalar(
+        update(PostureAlert)
+        .where(PostureAlert.id == alert_id, PostureAlert.user_id == user.id)
+        .values(acknowledged=True)
+        .returning(PostureAlert)
+    )
     if not alert:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Alert not found")
-    alert.acknowledged = True
     await db.commit()
-    await db.refresh(alert)
     return alert
\ No newline at end of file
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Cookie, Depends, HTTPException, Response, status
 from jose import JWTError, jwt
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
@@ -10,9 +11,12 @@ from app.schemas.auth import LoginRequest, RegisterRequest, UserResponse
 from app.services.auth_service import (
     create_access_token,
     create_refresh_token,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    new_token_family,
+    verify_password_async,
 )
+from app.services.token_revocation import revoke_family, rotate_refresh_token
+from app.services.user_cache import load_user
 
 settings = get_settings()
 
@@ -21,19 +25,47 @@ router = APIRouter(prefix='/auth', tags=["auth"])
 COOKIE_OPTS = dict(httponly=True, secure=False, samesite="lax")  # set secure=True in prod
 
 
-def _set_auth_cookies(response: Response, user_id: str):
-    response.set_cookie("access_token", create_access_token(user_id), max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60, **COOKIE_OPTS)
-    response.set_cookie("refresh_token", create_refresh_token(user_id), max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400, **COOKIE_OPTS)
+def _set_auth_cookies(response: Response, user_id: str, family: str | None = None):
+    # a sign-in starts a token family; refreshes keep it so logout can revoke every descendant
+    family = family or new_token_family()
+    response.set_cookie(
+        "access_token", create_access_token(user_id, family),
+        max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60, **COOKIE_OPTS,
+    )
+    response.set_cookie(
+        "refresh_token", create_refresh_token(user_id, family),
+        max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400, **COOKIE_OPTS,
+    )
+
+
+def _decode(token: str | None, verify_exp: bool = True) -> dict | None:
+    if not token:
+        return None
+    try:
+        return jwt.decode(
+            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM],
+            options={"verify_exp": verify_exp},
+        )
+    except JWTError:
+        return None
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(body: RegisterRequest, response: Response, db: AsyncSession = Depends(get_db)):
+    taken = HTTPException(status.HTTP_409_CONFLICT, "Email already registered")
     if await db.scalar(select(User).where(User.email == body.email)):
-        raise HTTPException(status.HTTP_409_CONFLICT, "Email already registered")
-    
-    user = User(email=body.email, hashed_password=hash_password(body.password), full_name=body.full_name)
+        raise taken
+    await db.commit()  # end the read so the pooled connection is free while argon2 runs
+
+    hashed = await hash_password_async(body.password)
+    user = User(email=body.email, hashed_password=hashed, full_name=body.full_name)
     db.add(user)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        # a concurrent registration took the email while the password was hashing
+        await db.rollback()
+        raise taken from e
     await db.refresh(user)
 
     _set_auth_cookies(response, user.id)
@@ -43,7 +75,8 @@ async def register(body: RegisterRequest, response: Response, db: AsyncSession =
 @router.post("/login", response_model=UserResponse)
 async def login(body: LoginRequest, response: Response, db: AsyncSession = Depends(get_db)):
     user = await db.scalar(select(User).where(User.email == body.email))
-    if not user or not verify_password(body.password, user.hashed_password):
+    await db.commit()  # end the read so the pooled connection is free while argon2 runs
+    if not user or not await verify_password_async(body.password, user.hashed_password):
         raise HTTPException(status.HTTP_401_UNAUTHORIZED , "Invalid credentials")
     
     _set_auth_cookies(response, user.id)
@@ -53,24 +86,36 @@ async def login(body: LoginRequest, response: Response, db: AsyncSession = Depen
 @router.post("/refresh", response_model=UserResponse)
 async def refresh(response: Response, refresh_token: str | None = Cookie(default=None), db: AsyncSession = Depends(get_db)):
     exc = HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid refresh token")
-    if not refresh_token:
-        raise exc
-    try:
-        payload = jwt.decode(refresh_token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        user_id: str = payload.get("sub")
-    except JWTError:
+    claims = _decode(refresh_token)
+    # tokens minted before rotation have no jti and cannot be spent safely; they sign in again
+    if not claims or claims.get("typ") != "refresh" or not claims.get("jti"):
         raise exc
 
-    user = await db.scalar(select(User).where(User.id == user_id))
+    user = await load_user(claims["sub"], db)
     if not user:
         raise exc
+    # the only query on this path: recording the spent jti (a replay revokes the family)
+    rotated = await rotate_refresh_token(claims, db)
+    await db.commit()
+    if not rotated:
+        raise exc
 
-    _set_auth_cookies(response, user.id)
+    _set_auth_cookies(response, user.id, claims["fam"])
     return user
 
 
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(
+    response: Response,
+    access_token: str | None = Cookie(default=None),
+    refresh_token: str | None = Cookie(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    # revoke the whole family so copies of these cookies stop working too, even expired ones
+    claims = _decode(refresh_token, verify_exp=False) or _decode(access_token, verify_exp=False)
+    if claims and claims.get("fam"):
+        await revoke_family(claims["fam"], claims["sub"], "logout", db)
+        await db.commit()
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
     return {"detail": "Logged out"}
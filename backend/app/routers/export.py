@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dependencies import get_current_user, get_read_db
+from app.models.user import User
+from app.services.export_service import (
+    MEDIA_TYPES,
+    ExportFormat,
+    ExportResource,
+    export_chunks,
+    parquet_available,
+)
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("/{resource}")
+async def export_history(
+    resource: ExportResource,
+    format: ExportFormat = Query("ndjson", description="ndjson, csv or parquet"),
+    gzip: bool = Query(False, description="gzip the file (Parquet: gzip its column chunks)"),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    """The user's whole history of `resource` as a file download, streamed in chunks."""
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status.HTTP_501_NOT_IMPLEMENTED, "Parquet export is not available on this server"
+        )
+    filename = f"posture-{resource}.{format}" + (".gz" if gzip and format != "parquet" else "")
+    return StreamingResponse(
+        export_chunks(resource, format, user.id, db, gzip),
+        media_type="application/gzip" if filename.endswith(".gz") else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
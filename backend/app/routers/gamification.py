@@ -1,27 +1,81 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_current_user, get_db
-from app.models.gamification import UserBadge, UserStreak
-from app.models.session import PostureSession
+from app.dependencies import get_current_user, get_read_db
+from app.models.gamification import UserBadge, UserStats, UserStreak
 from app.models.user import User
-from app.schemas.gamification import BadgeResponse, GamificationResponse, StreakResponse
+from app.schemas.gamification import (
+    BadgeResponse,
+    GamificationResponse,
+    LifetimeStatsResponse,
+    StreakResponse,
+)
 
 router = APIRouter(prefix="/gamification", tags=["gamification"])
 
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    return header.strip() == "*" or etag in (t.strip() for t in header.split(","))
+
+
 @router.get("", response_model=GamificationResponse)
-async def get_gamification(db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)):
-    streak = await db.scalar(select(UserStreak).where(UserStreak.user_id == user.id))
-    badges = await db.scalars(select(UserBadge).where(UserBadge.user_id == user.id).order_by(UserBadge.earned_at))
-    total_sessions = await db.scalar(select(func.count()).select_from(PostureSession).where(PostureSession.user_id == user.id)) or 0
-
-    streak_data = StreakResponse(
-        current_streak=streak.current_streak if streak else 0,
-        longest_streak=streak.longest_streak if streak else 0,
-        last_active_date=streak.last_active_date if streak else None,
-        total_sessions=total_sessions,
+async def get_gamification(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    badge = func.json_build_object(
+        "id", UserBadge.id, "badge_key", UserBadge.badge_key,
+        "earned_at", UserBadge.earned_at, "notified", UserBadge.notified,
+    )
+    badge_list = func.json_agg(aggregate_order_by(badge, UserBadge.earned_at))
+    badges = (
+        select(func.coalesce(badge_list, literal_column("'[]'::json")))
+        .where(UserBadge.user_id == user.id)
+        .scalar_subquery()
     )
+    # streak, badges and lifetime totals all change together in record_session_end, so
+    # user_stats.updated_at versions the whole response
+    row = (await db.execute(
+        select(
+            UserStats.updated_at,
+            UserStreak.current_streak, UserStreak.longest_streak, UserStreak.last_active_date,
+            UserStats.total_sessions, UserStats.total_seconds,
+            UserStats.score_sum, UserStats.scored_sessions, UserStats.badge_count,
+            badges,
+        )
+        .select_from(User)
+        .outerjoin(UserStreak, UserStreak.user_id == User.id)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .where(User.id == user.id)
+    )).one()
+    updated_at, current, longest, last_active, *totals, badge_rows = row
+    sessions, seconds, score_sum, scored, badge_count = totals
 
-    return GamificationResponse(streak=streak_data, badges=[BadgeResponse.model_validate(b) for b in badges.all()])
\ No newline at end of file
+    etag = f'W/"{user.id}:{updated_at.timestamp() if updated_at else 0}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+    return GamificationResponse(
+        streak=StreakResponse(
+            current_streak=current or 0,
+            longest_streak=longest or 0,
+            last_active_date=last_active,
+            total_sessions=sessions or 0,
+        ),
+        stats=LifetimeStatsResponse(
+            total_sessions=sessions or 0,
+            total_seconds=seconds or 0,
+            avg_posture_score=score_sum / scored if scored else None,
+            badge_count=badge_count or 0,
+        ),
+        badges=[BadgeResponse.model_validate(b) for b in badge_rows],
+    )
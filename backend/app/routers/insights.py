@@ -1,31 +1,91 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.dependencies import get_current_user, get_db
+from app.models.insight import InsightJob
 from app.models.session import PostureSession
 from app.models.user import User
-from app.schemas.insights import InsightsRequest, InsightsResponse
-from app.services.insights_service import generate_insights
+from app.schemas.insights import InsightJobResponse, InsightsRequest, InsightsResponse
+from app.services.insight_jobs import enqueue_job
+from app.services.insights_service import insights_cache, insights_with_fallback
+from app.services.local_insights import local_insights
+from app.services.session_service import compute_session_stats
+
+settings = get_settings()
 
 router = APIRouter(prefix="/insights", tags=["insights"])
 
 
-@router.post("", response_model=InsightsResponse)
+def _job_response(job: InsightJob) -> InsightJobResponse:
+    return InsightJobResponse(
+        job_id=job.id,
+        session_id=job.session_id,
+        status=job.status,
+        attempts=job.attempts,
+        insights=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+@router.post("", response_model=InsightsResponse | InsightJobResponse)
 async def get_insights(
     body: InsightsRequest,
+    response: Response,
+    mode: Literal["sync", "job"] = Query("sync"),
+    engine: Literal["gemini", "local", "auto"] | None = Query(None),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
+    engine = engine or settings.INSIGHTS_ENGINE
+    if engine == "local" and mode == "job":
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "The local engine does not run jobs")
+
     session = await db.scalar(
         select(PostureSession).where(PostureSession.id == body.session_id, PostureSession.user_id == user.id)
     )
     if not session:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Session not found")
 
+    stats = body.model_dump(exclude={"session_id"})
+    if engine == "local":
+        insights = local_insights(stats, await compute_session_stats(body.session_id, db))
+        return InsightsResponse(session_id=body.session_id, insights=insights, engine="local")
+    if mode == "job":
+        job = await enqueue_job(user.id, body.session_id, stats, db)
+        response.status_code = status.HTTP_202_ACCEPTED
+        response.headers["Location"] = f"/insights/jobs/{job.id}"
+        return _job_response(job)
+
+    if engine == "auto":
+        insights, used = await insights_with_fallback(body.session_id, stats, db)
+        return InsightsResponse(session_id=body.session_id, insights=insights, engine=used)
+
     try:
-        insights = await generate_insights(body.model_dump(exclude={"session_id"}))
+        insights = await insights_cache.get(body.session_id, stats, db)
     except Exception as e:
         raise HTTPException(status.HTTP_502_BAD_GATEWAY, f"Gemini error: {e}")
 
-    return InsightsResponse(session_id=body.session_id, insights=insights)
\ No newline at end of file
+    return InsightsResponse(session_id=body.session_id, insights=insights)
+
+
+@router.get("/jobs/{job_id}", response_model=InsightJobResponse)
+async def get_insight_job(
+    job_id: str,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    job = await db.scalar(
+        select(InsightJob).where(InsightJob.id == job_id, InsightJob.user_id == user.id)
+    )
+    if not job:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Job not found")
+    if job.status in ("queued", "running"):
+        response.headers["Retry-After"] = "1"
+    return _job_response(job)
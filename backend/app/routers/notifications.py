@@ -0,0 +1,80 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+import orjson
+from fastapi import APIRouter, Cookie, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.dependencies import user_from_token
+from app.services.gamification_service import badge_event, mark_badges_notified, pending_badges
+from app.services.notifications import hub
+
+settings = get_settings()
+router = APIRouter(prefix="/notifications", tags=["notifications"])
+
+# longest a sent badge waits to be flagged while more events keep arriving
+MARK_DELAY_SECONDS = 1.0
+
+
+def _sse(event: dict) -> bytes:
+    data = orjson.dumps(event["data"])
+    return b"event: " + event["type"].encode() + b"\ndata: " + data + b"\n\n"
+
+
+async def _mark_delivered(user_id: str, keys: list[str]):
+    async with AsyncSessionLocal() as db:
+        await mark_badges_notified(user_id, keys, db)
+        await db.commit()
+
+
+async def _events(user_id: str) -> AsyncIterator[bytes]:
+    # subscribe before the catch-up read so a badge earned in between is not missed
+    with hub.subscribe(user_id) as queue:
+        async with AsyncSessionLocal() as db:
+            missed = await pending_badges(user_id, db)
+        loop = asyncio.get_running_loop()
+        # badges sent but not yet flagged; one transaction flags a whole burst of them
+        sent: list[str] = []
+        for key in missed:
+            yield _sse({"type": "badge", "data": badge_event(key)})
+            sent.append(key)
+        flush_by = loop.time() + MARK_DELAY_SECONDS
+
+        while True:
+            if sent and (queue.empty() or loop.time() >= flush_by):
+                await _mark_delivered(user_id, sent)
+                sent = []
+            try:
+                event = await asyncio.wait_for(queue.get(), settings.NOTIFY_HEARTBEAT_SECONDS)
+            except TimeoutError:
+                yield b": keepalive\n\n"  # keeps proxies from closing an idle stream
+                continue
+            yield _sse(event)
+            # resumed only once the chunk is sent, so a badge is flagged after it reached the
+            # client; one still unflagged when the client leaves is sent again next time
+            if event["type"] == "badge":
+                if not sent:
+                    flush_by = loop.time() + MARK_DELAY_SECONDS
+                sent.append(event["data"]["badge_key"])
+
+
+@router.get("/stream")
+async def stream_notifications(access_token: str | None = Cookie(default=None)):
+    """Server-sent events: `alert` for each new or repeated alert, `badge` for each badge
+    earned, including any earned while no stream was open."""
+    # a short-lived session for auth; the stream itself holds no pooled connection while idle
+    async with AsyncSessionLocal() as db:
+        user = await user_from_token(access_token, db)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return StreamingResponse(
+        _events(user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,14 +1,20 @@
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, WebSocket, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_current_user, get_db
+from app.database import AsyncSessionLocal
+from app.dependencies import get_current_user, get_db, get_read_db, user_from_token
 from app.models.session import PostureSession
 from app.models.user import User
-from app.schemas.session import EndSessionRequest, SessionResponse
-from app.services.gamification_service import update_streak_and_badges
+from app.pagination import keyset_page, set_next_cursor
+from app.schemas.session import EndSessionRequest, SessionResponse, SessionStats
+from app.serialization import ListFormat, list_format, ndjson_stream, rows_response, select_fields
+from app.services.gamification_service import badge_event, record_session_end
+from app.services.notifications import notify_user
+from app.services.session_service import compute_session_stats, finalize_aggregates
+from app.services.stream_service import SessionStream
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
@@ -29,7 +35,14 @@ async def end_session(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    session = await db.scalar(select(PostureSession).where(PostureSession.id == session_id, PostureSession.user_id == user.id))
+    # the row lock makes a concurrent end of the same session wait here and then see it
+    # completed, so a session is folded into the user's stats exactly once
+    owned = select(PostureSession).where(
+        PostureSession.id == session_id, PostureSession.user_id == user.id
+    )
+    session = await db.scalar(
+        owned.with_for_update().execution_options(populate_existing=True)
+    )
     if not session:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Session not found")
     if session.status == "completed":
@@ -38,32 +51,48 @@ async def end_session(
     now = datetime.now(timezone.utc)
     session.ended_at = now
     session.duration_seconds = int((now - session.started_at.replace(tzinfo=timezone.utc)).total_seconds())
-    session.avg_posture_score = body.avg_posture_score
-    session.good_posture_percent = body.good_posture_percent
-    session.total_alerts = body.total_alerts
+    await finalize_aggregates(session, body, db)
     session.status = "completed"
 
+    new_badges = await record_session_end(session, db)
+    await notify_user(db, user.id, "badge", *map(badge_event, new_badges))
     await db.commit()
-    await update_streak_and_badges(user.id, db)
-    await db.refresh(session)
     return session
 
 
 @router.get("", response_model=list[SessionResponse])
 async def list_sessions(
+    response: Response,
     limit: int = 20,
     offset: int = 0,
+    cursor: str | None = None,
+    fmt: ListFormat = Depends(list_format),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    q = select_fields(PostureSession, SessionResponse).where(PostureSession.user_id == user.id)
+    q = keyset_page(q, PostureSession.started_at, PostureSession.id, cursor, limit).offset(offset)
+    if fmt == "ndjson":
+        return ndjson_stream(q, db)
+    rows = (await db.execute(q)).all()
+    set_next_cursor(response, rows, "started_at", limit)
+    return rows_response(q, rows, fmt, response)
+
+
+@router.get("/{session_id}/stats", response_model=SessionStats)
+async def get_session_stats(
+    session_id: str,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    rows = await db.scalars(
-        select(PostureSession)
-        .where(PostureSession.user_id == user.id)
-        .order_by(PostureSession.started_at.desc())
-        .limit(limit)
-        .offset(offset)
+    owned = await db.scalar(
+        select(PostureSession.id).where(
+            PostureSession.id == session_id, PostureSession.user_id == user.id
+        )
     )
-    return rows.all()
+    if not owned:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Session not found")
+    return await compute_session_stats(session_id, db)
 
 
 @router.get("/{session_id}", response_model=SessionResponse)
@@ -71,4 +100,24 @@ async def get_session(session_id: str, db: AsyncSession = Depends(get_db), user:
     session = await db.scalar(select(PostureSession).where(PostureSession.id == session_id, PostureSession.user_id == user.id))
     if not session:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Session not found")
-    return session
\ No newline at end of file
+    return session
+
+
+@router.websocket("/{session_id}/stream")
+async def stream_session(websocket: WebSocket, session_id: str):
+    # authenticate and check ownership once; frames after that cost no per-sample lookups
+    async with AsyncSessionLocal() as db:
+        user = await user_from_token(websocket.cookies.get("access_token"), db)
+        owned = user and await db.scalar(
+            select(PostureSession.id).where(
+                PostureSession.id == session_id,
+                PostureSession.user_id == user.id,
+                PostureSession.status == "active",
+            )
+        )
+    if not owned:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    await SessionStream(websocket, user.id, session_id).run()
@@ -1,12 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_current_user, get_db
+from app.dependencies import get_current_user, get_db, get_read_db
+from app.models.rollup import SnapshotRollup
 from app.models.session import PostureSession
 from app.models.snapshot import PostureSnapshot
 from app.models.user import User
-from app.schemas.snapshot import SnapshotCreate, SnapshotResponse
+from app.pagination import keyset_page, set_next_cursor
+from app.schemas.snapshot import (
+    SnapshotBatchCreate,
+    SnapshotBatchResponse,
+    SnapshotCreate,
+    SnapshotResponse,
+    SnapshotRollupResponse,
+    SnapshotSeriesResponse,
+)
+from app.serialization import ListFormat, list_format, ndjson_stream, rows_response, select_fields
+from app.services.series_service import snapshot_series
+from app.services.session_service import bump_snapshot_aggregates, running_aggregates_enabled
+from app.services.snapshot_service import insert_snapshots, missing_sessions
 
 router = APIRouter(prefix="/snapshots", tags=["snapshots"])
 
@@ -20,21 +36,105 @@ async def create_snapshot(body: SnapshotCreate, db: AsyncSession = Depends(get_d
 
     snapshot = PostureSnapshot(**body.model_dump(), user_id=user.id)
     db.add(snapshot)
+    if running_aggregates_enabled():
+        await bump_snapshot_aggregates([body], db)
     await db.commit()
     await db.refresh(snapshot)
     return snapshot
 
 
+@router.post("/batch", response_model=SnapshotBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_snapshots_batch(
+    body: SnapshotBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    # one ownership check per distinct session, then a single multi-row INSERT
+    missing = await missing_sessions(user.id, {s.session_id for s in body.snapshots}, db)
+    if missing:
+        detail = f"Session not found: {', '.join(sorted(missing))}"
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail)
+
+    ids = await insert_snapshots(user.id, body.snapshots, db)
+    await db.commit()
+    return SnapshotBatchResponse(accepted=len(ids), ids=ids)
+
+
 @router.get("", response_model=list[SnapshotResponse])
 async def list_snapshots(
+    response: Response,
     session_id: str | None = None,
     limit: int = 100,
     offset: int = 0,
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = None,
+    fmt: ListFormat = Depends(list_format),
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
 ):
-    q = select(PostureSnapshot).where(PostureSnapshot.user_id == user.id)
+    q = select_fields(PostureSnapshot, SnapshotResponse).where(PostureSnapshot.user_id == user.id)
     if session_id:
         q = q.where(PostureSnapshot.session_id == session_id)
-    rows = await db.scalars(q.order_by(PostureSnapshot.captured_at.desc()).limit(limit).offset(offset))
-    return rows.all()
\ No newline at end of file
+    q = keyset_page(q, PostureSnapshot.captured_at, PostureSnapshot.id, cursor, limit)
+    q = q.offset(offset)
+    if fmt == "ndjson":
+        return ndjson_stream(q, db)
+    rows = (await db.execute(q)).all()
+    set_next_cursor(response, rows, "captured_at", limit)
+    return rows_response(q, rows, fmt, response)
+
+
+@router.get("/series", response_model=SnapshotSeriesResponse)
+async def get_snapshot_series(
+    session_id: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    bucket_seconds: int | None = Query(default=None, ge=1),
+    points: int | None = Query(default=None, ge=3, le=2000),
+    downsample: Literal["avg", "lttb"] = "avg",
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    if bucket_seconds is None and points is None:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Pass bucket_seconds or points")
+    if downsample == "lttb" and points is None:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "lttb needs a target point count")
+
+    try:
+        width, buckets = await snapshot_series(
+            user.id,
+            db,
+            session_id,
+            start,
+            end,
+            bucket_seconds=bucket_seconds,
+            points=points,
+            downsample=downsample,
+        )
+    except ValueError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e)) from e
+    return SnapshotSeriesResponse(bucket_seconds=width, downsample=downsample, buckets=buckets)
+
+
+@router.get("/rollups", response_model=list[SnapshotRollupResponse])
+async def list_snapshot_rollups(
+    response: Response,
+    session_id: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = 500,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    # per-minute summaries of snapshots that the retention job has already purged
+    q = select(SnapshotRollup).where(SnapshotRollup.user_id == user.id)
+    if session_id:
+        q = q.where(SnapshotRollup.session_id == session_id)
+    if start:
+        q = q.where(SnapshotRollup.minute >= start)
+    if end:
+        q = q.where(SnapshotRollup.minute < end)
+    q = keyset_page(q, SnapshotRollup.minute, SnapshotRollup.session_id, cursor, limit)
+    rows = (await db.scalars(q)).all()
+    set_next_cursor(response, rows, "minute", limit, id_attr="session_id")
+    return rows
@@ -0,0 +1,30 @@
+from datetime import UTC, date, datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dependencies import get_current_user, get_read_db
+from app.models.user import User
+from app.schemas.stats import DailyStatsResponse
+from app.services.daily_stats import daily_stats
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+MAX_DAYS = 366
+
+
+@router.get("/daily", response_model=list[DailyStatsResponse])
+async def get_daily_stats(
+    start: date | None = Query(None, alias="from"),
+    end: date | None = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    """One row per UTC day with completed sessions in [from, to]; defaults to the last 90 days."""
+    end = end or datetime.now(UTC).date()
+    start = start or end - timedelta(days=89)
+    if end < start:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "'to' is before 'from'")
+    if (end - start).days >= MAX_DAYS:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, f"Range is limited to {MAX_DAYS} days")
+    return await daily_stats(user.id, start, end, db)
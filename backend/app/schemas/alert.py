@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 
 
 class AlertCreate(BaseModel):
@@ -17,5 +17,25 @@ class AlertResponse(BaseModel):
     alert_type: str
     message: str
     acknowledged: bool
+    repeat_count: int
+    last_triggered_at: datetime
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+
+class AlertAcknowledgeRequest(BaseModel):
+    # filters combine; at least one is required so an empty body cannot clear the whole feed
+    ids: list[str] | None = Field(default=None, min_length=1, max_length=1000)
+    session_id: str | None = None
+    before: datetime | None = None  # alerts whose latest firing is at or before this time
+
+    @model_validator(mode="after")
+    def _has_filter(self):
+        if self.ids is None and self.session_id is None and self.before is None:
+            raise ValueError("Pass ids, session_id or before")
+        return self
+
+
+class AlertAcknowledgeResponse(BaseModel):
+    acknowledged: int
+    ids: list[str]
@@ -6,7 +6,7 @@ class StreakResponse(BaseModel):
     current_streak: int
     longest_streak: int
     last_active_date: date | None
-    total_sessions: int
+    total_sessions: int   # completed sessions; an active one counts once it has ended
 
     model_config = {"from_attributes": True}
 
@@ -20,6 +20,14 @@ class BadgeResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class LifetimeStatsResponse(BaseModel):
+    total_sessions: int   # completed sessions only
+    total_seconds: int
+    avg_posture_score: float | None   # mean of per-session averages
+    badge_count: int
+
+
 class GamificationResponse(BaseModel):
     streak: StreakResponse
+    stats: LifetimeStatsResponse
     badges: list[BadgeResponse]
\ No newline at end of file
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -21,4 +23,15 @@ class Insight(BaseModel):
 
 class InsightsResponse(BaseModel):
     session_id: str
-    insights: list[Insight]
\ No newline at end of file
+    insights: list[Insight]
+    engine: str = "gemini"   # gemini | local
+
+class InsightJobResponse(BaseModel):
+    job_id: str
+    session_id: str
+    status: str   # queued | running | done | failed
+    attempts: int
+    insights: list[Insight] | None = None
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
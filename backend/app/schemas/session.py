@@ -2,6 +2,8 @@ from datetime import datetime
 
 from pydantic import BaseModel
 
+from app.schemas.snapshot import MinAvgMax
+
 
 class SessionResponse(BaseModel):
     id: str
@@ -20,4 +22,15 @@ class SessionResponse(BaseModel):
 class EndSessionRequest(BaseModel):
     avg_posture_score: float | None = None
     good_posture_percent: float | None = None  # make optional
-    total_alerts: int = 0
\ No newline at end of file
+    total_alerts: int = 0
+
+class SessionStats(BaseModel):
+    session_id: str
+    snapshot_count: int
+    avg_posture_score: float | None
+    good_posture_percent: float | None
+    total_alerts: int
+    alerts_by_type: dict[str, int]
+    neck_angle: MinAvgMax
+    shoulder_tilt: MinAvgMax
+    spine_angle: MinAvgMax
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class SnapshotCreate(BaseModel):
@@ -12,6 +12,19 @@ class SnapshotCreate(BaseModel):
     spine_angle: float | None = None
 
 
+class SnapshotBatchItem(SnapshotCreate):
+    captured_at: datetime | None = None  # server time when omitted
+
+
+class SnapshotBatchCreate(BaseModel):
+    snapshots: list[SnapshotBatchItem] = Field(min_length=1, max_length=1000)
+
+
+class SnapshotBatchResponse(BaseModel):
+    accepted: int
+    ids: list[str]
+
+
 class SnapshotResponse(BaseModel):
     id: str
     session_id: str
@@ -23,4 +36,45 @@ class SnapshotResponse(BaseModel):
     shoulder_tilt: float | None
     spine_angle: float | None
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+
+class SnapshotRollupResponse(BaseModel):
+    session_id: str
+    minute: datetime
+    sample_count: int
+    avg_posture_score: float
+    min_posture_score: float
+    max_posture_score: float
+    good_count: int
+    bad_count: int
+    risky_count: int
+    avg_neck_angle: float | None
+    avg_shoulder_tilt: float | None
+    avg_spine_angle: float | None
+
+    model_config = {"from_attributes": True}
+
+
+class MinAvgMax(BaseModel):
+    min: float | None
+    avg: float | None
+    max: float | None
+
+
+class SeriesBucket(BaseModel):
+    bucket_start: datetime
+    count: int
+    posture_score: MinAvgMax
+    neck_angle: MinAvgMax
+    shoulder_tilt: MinAvgMax
+    spine_angle: MinAvgMax
+    good: int
+    bad: int
+    risky: int
+
+
+class SnapshotSeriesResponse(BaseModel):
+    bucket_seconds: int
+    downsample: str
+    buckets: list[SeriesBucket]
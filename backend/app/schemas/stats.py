@@ -0,0 +1,13 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class DailyStatsResponse(BaseModel):
+    day: date                           # UTC date the sessions started
+    sessions: int
+    tracked_seconds: int
+    avg_posture_score: float | None     # weighted by session duration
+    good_posture_percent: float | None  # weighted by session duration
+    total_alerts: int
+    alerts_by_type: dict[str, int]
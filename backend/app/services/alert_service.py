@@ -0,0 +1,136 @@
+import uuid
+from collections import Counter
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+from sqlalchemy import String, exists, func, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.alert import PostureAlert
+from app.schemas.alert import AlertCreate
+from app.services.notifications import notify_user
+from app.services.session_service import bump_alert_count, running_aggregates_enabled
+
+settings = get_settings()
+
+
+def coalescing_enabled() -> bool:
+    return settings.ALERT_COALESCE_SECONDS > 0
+
+
+def alert_event(alert_id: str, item: AlertCreate, repeat_count: int = 1) -> dict:
+    return {"id": alert_id, **item.model_dump(), "repeat_count": repeat_count}
+
+
+async def coalesce_alert(
+    user_id: str, item: AlertCreate, db: AsyncSession, repeats: int = 1
+) -> PostureAlert:
+    """Record `repeats` firings of item as one statement: fold them into the session's open
+    alert of the same type when it last fired within ALERT_COALESCE_SECONDS, otherwise
+    insert a new row. Returns the written alert. Does not commit or bump session counters.
+    """
+    now = func.now()
+    window = timedelta(seconds=settings.ALERT_COALESCE_SECONDS)
+    open_alert = (
+        select(PostureAlert.id)
+        .where(
+            PostureAlert.session_id == item.session_id,
+            PostureAlert.alert_type == item.alert_type,
+            PostureAlert.acknowledged.is_(False),
+            PostureAlert.last_triggered_at >= now - window,
+        )
+        .order_by(PostureAlert.last_triggered_at.desc())
+        .limit(1)
+        .with_for_update()
+        .scalar_subquery()
+    )
+    bumped = (
+        update(PostureAlert)
+        .where(PostureAlert.id == open_alert)
+        .values(
+            repeat_count=PostureAlert.repeat_count + repeats,
+            last_triggered_at=now,
+            message=item.message,
+        )
+        .returning(*PostureAlert.__table__.c)
+        .cte("bumped")
+    )
+    new_row = select(
+        literal(str(uuid.uuid4()), String),
+        literal(item.session_id, String),
+        literal(user_id, String),
+        literal(item.alert_type, String),
+        literal(item.message, String),
+        literal(repeats),
+    ).where(~exists(select(bumped.c.id)))
+    columns = ["id", "session_id", "user_id", "alert_type", "message", "repeat_count"]
+    inserted = (
+        insert(PostureAlert)
+        .from_select(columns, new_row)
+        .returning(*PostureAlert.__table__.c)
+        .cte("inserted")
+    )
+    written = select(bumped).union_all(select(inserted))
+    # populate_existing: a bumped alert already in the session must show the new values
+    stmt = select(PostureAlert).from_statement(written)
+    return await db.scalar(stmt.execution_options(populate_existing=True))
+
+
+async def insert_alerts(
+    user_id: str, items: Sequence[AlertCreate], db: AsyncSession
+) -> list[str]:
+    """Write all items in a single multi-row INSERT and queue their notifications.
+    Does not commit; returns the ids in order.
+
+    With coalescing on, each (session, type) in the batch instead costs one coalesce_alert
+    statement carrying all of its repeats, and its items share the resulting row's id.
+    """
+    if coalescing_enabled():
+        groups = Counter((item.session_id, item.alert_type) for item in items)
+        latest = {(item.session_id, item.alert_type): item for item in items}
+        written = {
+            key: await coalesce_alert(user_id, latest[key], db, n) for key, n in groups.items()
+        }
+        ids = [written[(item.session_id, item.alert_type)].id for item in items]
+        events = [alert_event(a.id, latest[key], a.repeat_count) for key, a in written.items()]
+    else:
+        rows = [
+            {
+                **item.model_dump(),
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "triggered_at": func.now(),
+            }
+            for item in items
+        ]
+        await db.execute(insert(PostureAlert).values(rows))
+        ids = [row["id"] for row in rows]
+        events = [alert_event(row["id"], item) for row, item in zip(rows, items, strict=True)]
+    await notify_user(db, user_id, "alert", *events)
+    if running_aggregates_enabled():
+        for session_id, n in Counter(item.session_id for item in items).items():
+            await bump_alert_count(session_id, n, db)
+    return ids
+
+
+async def acknowledge_alerts(
+    user_id: str,
+    db: AsyncSession,
+    ids: Sequence[str] | None = None,
+    session_id: str | None = None,
+    before: datetime | None = None,
+) -> list[str]:
+    """Acknowledge the user's open alerts matching every given filter with one
+    UPDATE ... RETURNING. `before` compares last_triggered_at, so an alert that repeated
+    after the cut-off stays open. Returns the acknowledged ids. Does not commit."""
+    q = update(PostureAlert).where(
+        PostureAlert.user_id == user_id, PostureAlert.acknowledged.is_(False)
+    )
+    if ids is not None:
+        q = q.where(PostureAlert.id.in_(ids))
+    if session_id is not None:
+        q = q.where(PostureAlert.session_id == session_id)
+    if before is not None:
+        q = q.where(PostureAlert.last_triggered_at <= before)
+    return list(await db.scalars(q.values(acknowledged=True).returning(PostureAlert.id)))
@@ -1,4 +1,7 @@
-from datetime import  datetime, timedelta, UTC
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
 
 from jose import jwt
 from passlib.context import CryptContext
@@ -7,7 +10,23 @@ from app.config import get_settings
 
 settings = get_settings()
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+# argon2 releases the GIL, so a small thread pool keeps hashing off the event loop
+_hash_pool = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="pwhash"
+)
+_pending = 0
+
+
+class HashingBusy(Exception):
+    """Raised when more than PASSWORD_HASH_MAX_PENDING hashes are already queued or running."""
 
 
 def hash_password(password: str) -> str:
@@ -18,17 +37,52 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
-def _make_token(sub: str, expires_delta: timedelta) -> str:
+async def _run_in_hash_pool(fn, *args):
+    global _pending
+    if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HashingBusy
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, fn, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hash_pool(hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await _run_in_hash_pool(verify_password, plain, hashed)
+
+
+def hash_pool_stats() -> dict:
+    running = min(_pending, settings.PASSWORD_HASH_WORKERS)
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "running": running,
+        "queued": _pending - running,
+        "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+    }
+
+
+def _make_token(sub: str, expires_delta: timedelta, **claims) -> str:
     return jwt.encode(
-        {"sub": sub, "exp": datetime.now(UTC) + expires_delta},
+        {"sub": sub, "exp": datetime.now(UTC) + expires_delta, **claims},
         settings.JWT_SECRET,
         algorithm=settings.JWT_ALGORITHM,
     )
 
 
-def create_access_token(user_id: str) -> str:
-    return _make_token(user_id, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+def new_token_family() -> str:
+    return uuid.uuid4().hex
+
+
+def create_access_token(user_id: str, family: str) -> str:
+    expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return _make_token(user_id, expires, typ="access", fam=family)
 
 
-def create_refresh_token(user_id: str) -> str:
-    return _make_token(user_id, timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
\ No newline at end of file
+def create_refresh_token(user_id: str, family: str) -> str:
+    expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    return _make_token(user_id, expires, typ="refresh", fam=family, jti=uuid.uuid4().hex)
@@ -0,0 +1,136 @@
+"""Declarative badge rules, compiled to SQL.
+
+A rule is "metric >= threshold", optionally over a filtered set of completed sessions.
+Each metric compiles to a SELECT of (user_id, value) rows, so the same rule drives both
+the per-user check at session end and a set-based backfill over every user.
+"""
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+from sqlalchemy import Date, Float, Select, String, cast, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.gamification import UserBadge, UserStats, UserStreak
+from app.models.session import PostureSession
+
+
+@dataclass(frozen=True)
+class BadgeDefinition:
+    key: str
+    label: str
+    metric: str  # a key of METRICS
+    threshold: float
+    # session metrics only: PostureSession column -> minimum value a session needs to count
+    where: dict[str, float] = field(default_factory=dict)
+
+
+BADGES: list[BadgeDefinition] = [
+    BadgeDefinition("first_session", "First Step", "sessions", 1),
+    BadgeDefinition("streak_3", "3-Day Streak", "streak_days", 3),
+    BadgeDefinition("streak_7", "Week Warrior", "streak_days", 7),
+    BadgeDefinition("streak_30", "Monthly Master", "streak_days", 30),
+    BadgeDefinition(
+        "perfect_session", "Perfect Session", "sessions", 1,
+        {"good_posture_percent": 100, "duration_seconds": 600},
+    ),
+    BadgeDefinition("hours_10", "10 Hours Tracked", "hours_tracked", 10),
+    BadgeDefinition("hours_100", "Century", "hours_tracked", 100),
+    BadgeDefinition(
+        "good_days_7", "Good Posture Week", "active_days", 7, {"good_posture_percent": 80}
+    ),
+]
+
+
+def _completed_sessions(where: dict[str, float]) -> Select:
+    q = select(PostureSession.user_id).where(PostureSession.status == "completed")
+    for name, minimum in where.items():
+        q = q.where(getattr(PostureSession, name) >= minimum)
+    return q
+
+
+MetricSource = Callable[[dict[str, float]], Select]
+
+# each returns SELECT user_id, value
+METRICS: dict[str, MetricSource] = {
+    "streak_days": lambda where: select(UserStreak.user_id, UserStreak.longest_streak),
+    "hours_tracked": lambda where: select(UserStats.user_id, UserStats.total_seconds / 3600.0),
+    "sessions": lambda where: (
+        _completed_sessions(where).add_columns(func.count()).group_by(PostureSession.user_id)
+    ),
+    "active_days": lambda where: (
+        _completed_sessions(where)
+        .add_columns(func.count(cast(PostureSession.started_at, Date).distinct()))
+        .group_by(PostureSession.user_id)
+    ),
+}
+
+
+def earned_by(
+    rule: BadgeDefinition, user_id: str | None = None, sources: dict[str, Select] | None = None
+) -> Select:
+    """SELECT user_id, badge_key for every user (or just user_id) satisfying the rule.
+
+    `sources` replaces a metric's default SELECT, e.g. with values that are being written
+    in the same statement and so cannot be read back from the table yet.
+    """
+    if rule.where and rule.metric not in ("sessions", "active_days"):
+        raise ValueError(f"badge {rule.key}: 'where' only applies to session metrics")
+    source = (sources or {}).get(rule.metric)
+    if source is None:
+        source = METRICS[rule.metric](rule.where)
+        if user_id is not None:
+            source = source.where(source.selected_columns[0] == user_id)
+    metric = source.subquery()
+    user_col, value_col = metric.c
+    return select(user_col, literal(rule.key, String)).where(
+        cast(value_col, Float) >= rule.threshold
+    )
+
+
+def award_badges(
+    rules: Iterable[BadgeDefinition],
+    user_id: str | None = None,
+    sources: dict[str, Select] | None = None,
+):
+    """INSERT ... SELECT of every earned, not yet held badge; RETURNING user_id, badge_key."""
+    earned = union_all(*(earned_by(rule, user_id, sources) for rule in rules)).subquery()
+    user_col, key_col = earned.c
+    return (
+        insert(UserBadge)
+        .from_select(
+            ["id", "user_id", "badge_key"],
+            select(cast(func.gen_random_uuid(), String), user_col, key_col),
+            include_defaults=False,
+        )
+        .on_conflict_do_nothing(constraint="uq_badges_user_key")
+        .returning(UserBadge.user_id, UserBadge.badge_key)
+    )
+
+
+async def backfill_badges(db: AsyncSession, keys: Iterable[str] | None = None) -> dict[str, int]:
+    """Award badges (all, or just `keys`) to every user who qualifies, in one statement.
+    Returns the number of new badges per key. Does not commit."""
+    wanted = set(keys) if keys is not None else None
+    rules = [b for b in BADGES if wanted is None or b.key in wanted]
+    if wanted is not None and (unknown := wanted - {b.key for b in rules}):
+        raise ValueError(f"unknown badges: {', '.join(sorted(unknown))}")
+    if not rules:
+        return {}
+
+    new = award_badges(rules).cte("new_badges")
+    per_user = select(new.c.user_id, func.count().label("n")).group_by(new.c.user_id)
+    counts = insert(UserStats).from_select(
+        ["user_id", "badge_count"], per_user, include_defaults=False
+    )
+    counts = counts.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={
+            "badge_count": UserStats.badge_count + counts.excluded.badge_count,
+            "updated_at": func.now(),
+        },
+    ).cte("counts")
+    rows = await db.execute(
+        select(new.c.badge_key, func.count()).group_by(new.c.badge_key).add_cte(counts)
+    )
+    return dict(rows.all())
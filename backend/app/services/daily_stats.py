@@ -0,0 +1,183 @@
+"""Per-user daily rollup behind GET /stats/daily.
+
+record_session_end folds each completed session into the row for its UTC start date, so a
+trend over any range is one primary-key range scan. rebuild_daily_stats recomputes rows
+from sessions and alerts, for history older than the table or after a correction.
+"""
+from datetime import UTC, date
+
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    Float,
+    Insert,
+    Integer,
+    String,
+    cast,
+    delete,
+    func,
+    literal,
+    select,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.alert import PostureAlert
+from app.models.rollup import DailyUserStats
+from app.models.session import PostureSession
+from app.schemas.stats import DailyStatsResponse
+
+# any other alert type only counts in total_alerts
+ALERT_TYPES = ("neck", "shoulder", "spine", "break_reminder")
+
+_SUMMED = [
+    "sessions",
+    "tracked_seconds",
+    "score_seconds",
+    "scored_seconds",
+    "good_seconds",
+    "rated_seconds",
+    "score_sum",
+    "scored_sessions",
+    "good_sum",
+    "rated_sessions",
+    "total_alerts",
+    *(f"{t}_alerts" for t in ALERT_TYPES),
+]
+
+
+def _alerts_by_type():
+    repeats = func.sum(PostureAlert.repeat_count)
+    return [
+        func.coalesce(repeats.filter(PostureAlert.alert_type == t), 0).label(f"{t}_alerts")
+        for t in ALERT_TYPES
+    ]
+
+
+def _accumulate(stmt: Insert) -> Insert:
+    table = DailyUserStats.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=[DailyUserStats.user_id, DailyUserStats.day],
+        set_={**{c: table.c[c] + stmt.excluded[c] for c in _SUMMED}, "updated_at": func.now()},
+    )
+
+
+def session_day(session: PostureSession) -> date:
+    """The UTC date a session is counted under, by its start."""
+    return session.started_at.astimezone(UTC).date()
+
+
+def _average(weighted: float, weight: int, total: float, count: int) -> float | None:
+    """Duration-weighted when the sessions took any time, else the plain mean."""
+    if weight:
+        return weighted / weight
+    return total / count if count else None
+
+
+def fold_session(session: PostureSession) -> Insert:
+    """Upsert adding one just-ended session to its day, with the per-type alert counts read
+    from alerts in the same statement."""
+    seconds = session.duration_seconds or 0
+    score, good = session.avg_posture_score, session.good_posture_percent
+    row = select(
+        literal(session.user_id, String),
+        literal(session_day(session), Date),
+        literal(1, Integer),
+        literal(seconds, BigInteger),
+        literal(score * seconds if score is not None else 0.0, Float),
+        literal(seconds if score is not None else 0, BigInteger),
+        literal(good * seconds / 100 if good is not None else 0.0, Float),
+        literal(seconds if good is not None else 0, BigInteger),
+        literal(score if score is not None else 0.0, Float),
+        literal(int(score is not None), Integer),
+        literal(good if good is not None else 0.0, Float),
+        literal(int(good is not None), Integer),
+        literal(session.total_alerts or 0, Integer),
+        *_alerts_by_type(),
+    ).where(PostureAlert.session_id == session.id)
+    stmt = insert(DailyUserStats).from_select(
+        ["user_id", "day", *_SUMMED], row, include_defaults=False
+    )
+    return _accumulate(stmt)
+
+
+async def rebuild_daily_stats(
+    db: AsyncSession, start: date | None = None, end: date | None = None
+) -> int:
+    """Recompute every user's rows for days in [start, end] (open-ended when omitted) from
+    completed sessions. Returns the number of rows written. Does not commit.
+
+    Sessions ending while this runs can be counted twice for the rebuilt days, so run it
+    when session ends are quiet, or rebuild those days again afterwards.
+    """
+    day = cast(func.timezone("UTC", PostureSession.started_at), Date)
+    seconds = func.coalesce(PostureSession.duration_seconds, 0)
+    score, good = PostureSession.avg_posture_score, PostureSession.good_posture_percent
+    alerts = (
+        select(PostureAlert.session_id, *_alerts_by_type())
+        .group_by(PostureAlert.session_id)
+        .subquery()
+    )
+
+    per_day = (
+        select(
+            PostureSession.user_id,
+            day,
+            func.count(),
+            func.sum(seconds),
+            func.coalesce(func.sum(score * seconds), 0),
+            func.coalesce(func.sum(seconds).filter(score.is_not(None)), 0),
+            func.coalesce(func.sum(good * seconds / 100), 0),
+            func.coalesce(func.sum(seconds).filter(good.is_not(None)), 0),
+            func.coalesce(func.sum(score), 0),
+            func.count(score),
+            func.coalesce(func.sum(good), 0),
+            func.count(good),
+            func.sum(PostureSession.total_alerts),
+            *(func.coalesce(func.sum(alerts.c[f"{t}_alerts"]), 0) for t in ALERT_TYPES),
+        )
+        .outerjoin(alerts, alerts.c.session_id == PostureSession.id)
+        .where(PostureSession.status == "completed")
+        .group_by(PostureSession.user_id, day)
+    )
+    clear = delete(DailyUserStats)
+    if start is not None:
+        per_day = per_day.where(day >= start)
+        clear = clear.where(DailyUserStats.day >= start)
+    if end is not None:
+        per_day = per_day.where(day <= end)
+        clear = clear.where(DailyUserStats.day <= end)
+
+    await db.execute(clear)
+    result = await db.execute(
+        insert(DailyUserStats).from_select(
+            ["user_id", "day", *_SUMMED], per_day, include_defaults=False
+        )
+    )
+    return result.rowcount
+
+
+async def daily_stats(
+    user_id: str, start: date, end: date, db: AsyncSession
+) -> list[DailyStatsResponse]:
+    rows = await db.scalars(
+        select(DailyUserStats)
+        .where(DailyUserStats.user_id == user_id, DailyUserStats.day.between(start, end))
+        .order_by(DailyUserStats.day)
+    )
+    return [
+        DailyStatsResponse(
+            day=r.day,
+            sessions=r.sessions,
+            tracked_seconds=r.tracked_seconds,
+            avg_posture_score=_average(
+                r.score_seconds, r.scored_seconds, r.score_sum, r.scored_sessions
+            ),
+            good_posture_percent=_average(
+                r.good_seconds * 100, r.rated_seconds, r.good_sum, r.rated_sessions
+            ),
+            total_alerts=r.total_alerts,
+            alerts_by_type={t: getattr(r, f"{t}_alerts") for t in ALERT_TYPES},
+        )
+        for r in rows
+    ]
@@ -0,0 +1,163 @@
+"""Whole-history exports for GET /export/{resource}.
+
+Rows come off a server-side cursor EXPORT_CHUNK_ROWS at a time, in index order, and each
+chunk is encoded and handed to the response before the next one is fetched. Memory stays
+flat however long the history is. Parquet needs the optional pyarrow package
+(`pip install ".[export]"`).
+"""
+import csv
+import io
+import zlib
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Literal
+
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.alert import PostureAlert
+from app.models.session import PostureSession
+from app.models.snapshot import PostureSnapshot
+from app.schemas.alert import AlertResponse
+from app.schemas.session import SessionResponse
+from app.schemas.snapshot import SnapshotResponse
+from app.serialization import dumps, select_fields
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: pip install ".[export]"
+    pa = pq = None
+
+ExportResource = Literal["sessions", "snapshots", "alerts"]
+ExportFormat = Literal["ndjson", "csv", "parquet"]
+
+# each chunk is encoded on the event loop, so it is kept to a few ms of work
+EXPORT_CHUNK_ROWS = 2_000
+PARQUET_ROW_GROUP_ROWS = 50_000
+GZIP_LEVEL = 1  # about 10% larger than the default level 6 at half the CPU
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+_EXPORTS = {
+    "sessions": (PostureSession, SessionResponse, PostureSession.started_at),
+    "snapshots": (PostureSnapshot, SnapshotResponse, PostureSnapshot.captured_at),
+    "alerts": (PostureAlert, AlertResponse, PostureAlert.triggered_at),
+}
+
+
+def parquet_available() -> bool:
+    return pa is not None
+
+
+def export_query(resource: ExportResource, user_id: str) -> Select:
+    """The user's rows oldest first, walking the (user_id, time, id) index so no sort is needed."""
+    model, schema, ts = _EXPORTS[resource]
+    return select_fields(model, schema).where(model.user_id == user_id).order_by(ts, model.id)
+
+
+async def _ndjson(q: Select, batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    keys = q.selected_columns.keys()
+    async for rows in batches:
+        # zip over the keys is roughly twice as fast as Row._asdict() at this volume
+        yield b"".join(dumps(dict(zip(keys, row, strict=True))) + b"\n" for row in rows)
+
+
+async def _csv(q: Select, batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(q.selected_columns.keys())
+    async for rows in batches:
+        writer.writerows(rows)
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():  # header only: no rows
+        yield buf.getvalue().encode()
+
+
+class _Sink:
+    """Append-only file for ParquetWriter; drain() hands over what was written since the
+    last call. tell() keeps counting across drains, since the footer records offsets."""
+
+    closed = False
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._pos = 0
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _arrow_type(python_type: type):
+    if python_type is datetime:
+        return pa.timestamp("us", tz="UTC")
+    return {str: pa.string(), int: pa.int64(), float: pa.float64(), bool: pa.bool_()}[python_type]
+
+
+async def _parquet(
+    q: Select, batches: AsyncIterator[Sequence[Row]], compression: str
+) -> AsyncIterator[bytes]:
+    schema = pa.schema([(c.key, _arrow_type(c.type.python_type)) for c in q.selected_columns])
+    sink = _Sink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression=compression)
+    # chunks are converted to Arrow as they arrive and written as row groups of
+    # PARQUET_ROW_GROUP_ROWS, which columnar readers handle far better than small ones
+    pending: list = []
+    pending_rows = 0
+    async for rows in batches:
+        columns = zip(*rows, strict=True)
+        arrays = [pa.array(c, f.type) for c, f in zip(columns, schema, strict=True)]
+        pending.append(pa.record_batch(arrays, schema=schema))
+        pending_rows += len(rows)
+        if pending_rows >= PARQUET_ROW_GROUP_ROWS:
+            writer.write_table(pa.Table.from_batches(pending), row_group_size=pending_rows)
+            pending, pending_rows = [], 0
+            yield sink.drain()
+    if pending:
+        writer.write_table(pa.Table.from_batches(pending), row_group_size=pending_rows)
+    writer.close()
+    yield sink.drain()
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    z = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    async for chunk in chunks:
+        if out := z.compress(chunk):
+            yield out
+    yield z.flush()
+
+
+async def export_chunks(
+    resource: ExportResource, fmt: ExportFormat, user_id: str, db: AsyncSession, gzip: bool = False,
+) -> AsyncIterator[bytes]:
+    """Encoded export of every `resource` row of the user. With `gzip`, NDJSON and CSV come
+    out as a .gz stream; Parquet compresses its column chunks with gzip instead of snappy."""
+    q = export_query(resource, user_id)
+    result = await db.stream(q.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+    batches = result.partitions()
+    if fmt == "parquet":
+        async for chunk in _parquet(q, batches, "gzip" if gzip else "snappy"):
+            yield chunk
+        return
+    chunks = _csv(q, batches) if fmt == "csv" else _ndjson(q, batches)
+    async for chunk in _gzip(chunks) if gzip else chunks:
+        yield chunk
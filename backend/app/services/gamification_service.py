@@ -1,60 +1,128 @@
-from dataclasses import dataclass
-from datetime import date, timedelta
+import uuid
+from datetime import timedelta
 
-from sqlalchemy import select
+from sqlalchemy import case, exists, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.gamification import UserBadge, UserStreak
-
-
-@dataclass
-class BadgeDefinition:
-    key: str
-    label: str
-    check: callable  # (streak: int, badges_earned: set[str]) -> bool
-
-
-BADGES: list[BadgeDefinition] = [
-    BadgeDefinition("first_session", "First Step", lambda s, b: True),
-    BadgeDefinition("streak_3", "3-Day Streak", lambda s, b: s >= 3),
-    BadgeDefinition("streak_7", "Week Warrior", lambda s, b: s >= 7),
-    BadgeDefinition("streak_30", "Monthly Master", lambda s, b: s >= 30),
-]
+from app.models.gamification import UserBadge, UserStats, UserStreak
+from app.models.session import PostureSession
+from app.services.badge_rules import BADGES, award_badges
+from app.services.daily_stats import fold_session, session_day
+
+
+async def record_session_end(session: PostureSession, db: AsyncSession) -> list[str]:
+    """Fold a just-ended session into the user's streak, badges, lifetime stats and daily
+    rollup. Returns list of newly earned badge keys.
+
+    One statement: the streak upsert does the arithmetic in SQL and returns nothing when the
+    user was already active on the session's day, the badge rules are evaluated for this
+    user into an idempotent insert, the user_stats upsert counts the session and the new
+    badges, and the daily_user_stats upsert adds it to its day.
+    The streak and user_stats row locks serialize concurrent ends of different sessions of
+    one user; the caller must hold the session's own row lock (end_session selects it FOR
+    UPDATE) so a session is never recorded twice. Does not commit.
+    """
+    user_id = session.user_id
+    # the session's UTC start date, as in daily_user_stats, so the two always agree
+    day = session_day(session)
+    streaks, totals = UserStreak.__table__, UserStats.__table__
+
+    yesterday = day - timedelta(days=1)
+    continued = case(
+        (streaks.c.last_active_date == yesterday, streaks.c.current_streak + 1), else_=1
+    )
+    upsert = insert(UserStreak).values(
+        id=str(uuid.uuid4()), user_id=user_id, current_streak=1, longest_streak=1,
+        last_active_date=day,
+    )
+    streak = (
+        upsert.on_conflict_do_update(
+            index_elements=[UserStreak.user_id],
+            set_={
+                "current_streak": continued,
+                "longest_streak": func.greatest(streaks.c.longest_streak, continued),
+                "last_active_date": day,
+                "updated_at": func.now(),
+            },
+            # a session started before midnight can end after one that started today
+            where=or_(streaks.c.last_active_date.is_(None), streaks.c.last_active_date < day),
+        )
+        .returning(UserStreak.user_id, UserStreak.longest_streak)
+        .cte("streak")
+    )
 
+    # the streak and lifetime seconds being written by this statement are not visible to
+    # its other parts, so the rules read them from the upsert / request instead of the tables
+    seconds = session.duration_seconds or 0
+    prior_seconds = (
+        select(UserStats.total_seconds).where(UserStats.user_id == user_id).scalar_subquery()
+    )
+    hours = (func.coalesce(prior_seconds, 0) + seconds) / 3600.0
+    sources = {
+        "streak_days": select(streak.c.user_id, streak.c.longest_streak),
+        "hours_tracked": select(literal(user_id), hours),
+    }
+    new_badges = award_badges(BADGES, user_id, sources).cte("new_badges")
+
+    scored = session.avg_posture_score is not None
+    stats = insert(UserStats).values(
+        user_id=user_id,
+        total_sessions=1,
+        total_seconds=seconds,
+        score_sum=session.avg_posture_score if scored else 0,
+        scored_sessions=int(scored),
+        badge_count=select(func.count()).select_from(new_badges).scalar_subquery(),
+    )
+    stats = stats.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={
+            "total_sessions": totals.c.total_sessions + 1,
+            "total_seconds": totals.c.total_seconds + stats.excluded.total_seconds,
+            "score_sum": totals.c.score_sum + stats.excluded.score_sum,
+            "scored_sessions": totals.c.scored_sessions + stats.excluded.scored_sessions,
+            "badge_count": totals.c.badge_count + stats.excluded.badge_count,
+            "updated_at": func.now(),
+        },
+    ).cte("stats")
 
-async def update_streak_and_badges(user_id: str, db: AsyncSession) -> list[str]:
-    """Update streak for today's session. Returns list of newly earned badge keys."""
-    today = date.today()
+    daily = fold_session(session).cte("daily")
 
-    streak = await db.scalar(select(UserStreak).where(UserStreak.user_id == user_id))
-    if not streak:
-        streak = UserStreak(user_id=user_id, current_streak=0, longest_streak=0)
-        db.add(streak)
+    return list(await db.scalars(select(new_badges.c.badge_key).add_cte(stats, daily)))
 
-    if streak.last_active_date == today:
-        return []  # already logged today
 
-    if streak.last_active_date == today - timedelta(days=1):
-        streak.current_streak += 1
-    else:
-        streak.current_streak = 1  # streak broken or first session
+def badge_event(badge_key: str) -> dict:
+    label = next((b.label for b in BADGES if b.key == badge_key), badge_key)
+    return {"badge_key": badge_key, "label": label}
 
-    streak.longest_streak = max(streak.longest_streak, streak.current_streak)
-    streak.last_active_date = today
 
-    existing_keys = set(
-        row for row in await db.scalars(
-            select(UserBadge.badge_key).where(UserBadge.user_id == user_id)
+async def pending_badges(user_id: str, db: AsyncSession) -> list[str]:
+    """Keys of earned badges the user has not been told about yet, oldest first."""
+    q = select(UserBadge.badge_key).where(
+        UserBadge.user_id == user_id, UserBadge.notified.is_(False)
+    )
+    return list(await db.scalars(q.order_by(UserBadge.earned_at)))
+
+
+async def mark_badges_notified(user_id: str, keys: list[str], db: AsyncSession) -> list[str]:
+    """Flag the given badges as delivered in one statement, bumping user_stats.updated_at
+    so GET /gamification's ETag changes. Returns the keys that were still pending. Does not
+    commit."""
+    marked = (
+        update(UserBadge)
+        .where(
+            UserBadge.user_id == user_id,
+            UserBadge.badge_key.in_(keys),
+            UserBadge.notified.is_(False),
         )
+        .values(notified=True)
+        .returning(UserBadge.badge_key)
+        .cte("marked")
     )
-
-    new_badges = [
-        b for b in BADGES
-        if b.key not in existing_keys and b.check(streak.current_streak, existing_keys)
-    ]
-
-    for badge in new_badges:
-        db.add(UserBadge(user_id=user_id, badge_key=badge.key))
-
-    await db.commit()
-    return [b.key for b in new_badges]
\ No newline at end of file
+    touched = (
+        update(UserStats)
+        .where(UserStats.user_id == user_id, exists(select(marked.c.badge_key)))
+        .values(updated_at=func.now())
+        .cte("touched")
+    )
+    return list(await db.scalars(select(marked.c.badge_key).add_cte(touched)))
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import random
+from datetime import timedelta
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models.insight import InsightJob
+from app.services.insights_cache import InsightsCache
+from app.services.insights_service import insights_cache
+from app.services.local_insights import local_insights
+from app.services.session_service import compute_session_stats
+
+settings = get_settings()
+log = logging.getLogger(__name__)
+
+# a run is abandoned after this share of INSIGHTS_JOB_TIMEOUT_SECONDS, leaving time to record
+# the outcome before claim_job would treat the job as stale
+RUN_TIMEOUT_FRACTION = 0.8
+
+
+async def enqueue_job(user_id: str, session_id: str, stats: dict, db: AsyncSession) -> InsightJob:
+    job = InsightJob(user_id=user_id, session_id=session_id, request=stats)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    job_workers.notify()
+    return job
+
+
+async def claim_job(db: AsyncSession) -> InsightJob | None:
+    """Marks the next runnable job as running and returns it, or None when the queue is idle.
+
+    Queued jobs become runnable at run_after; running jobs whose worker went quiet for
+    INSIGHTS_JOB_TIMEOUT_SECONDS (crashed process, lost connection) are taken over.
+    SKIP LOCKED lets any number of workers, in any number of processes, claim concurrently.
+    """
+    now = func.now()
+    stale = now - timedelta(seconds=settings.INSIGHTS_JOB_TIMEOUT_SECONDS)
+    next_id = (
+        select(InsightJob.id)
+        .where(
+            InsightJob.status.in_(("queued", "running")),
+            or_(
+                and_(InsightJob.status == "queued", InsightJob.run_after <= now),
+                and_(InsightJob.status == "running", InsightJob.updated_at < stale),
+            ),
+        )
+        .order_by(InsightJob.run_after)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    job = await db.scalar(
+        update(InsightJob)
+        .where(InsightJob.id == next_id)
+        .values(status="running", attempts=InsightJob.attempts + 1, updated_at=now)
+        .returning(InsightJob)
+    )
+    await db.commit()
+    return job
+
+
+async def _finish(job: InsightJob, db: AsyncSession, **values):
+    # guarded on attempts so a worker whose job was taken over cannot overwrite the newer run
+    await db.execute(
+        update(InsightJob)
+        .where(InsightJob.id == job.id, InsightJob.attempts == job.attempts)
+        .values(updated_at=func.now(), **values)
+    )
+    await db.commit()
+
+
+class InsightsWorkerPool:
+    """Background workers that drain insight_jobs through the shared insights cache.
+
+    Model calls are capped at max_concurrency in flight and rate_per_second started;
+    failed jobs are retried with exponential backoff until INSIGHTS_JOB_MAX_ATTEMPTS, then
+    marked failed, or answered by the local engine when INSIGHTS_ENGINE is "auto".
+    """
+
+    def __init__(
+        self, insights: InsightsCache, workers: int, max_concurrency: int, rate_per_second: float
+    ):
+        self.insights = insights
+        self.workers = workers
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.fell_back = 0
+        self._limit = asyncio.Semaphore(max(1, max_concurrency))
+        self._interval = 1 / rate_per_second if rate_per_second > 0 else 0
+        self._next_start = 0.0
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"insights-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        self._wakeup.set()
+
+    async def _throttled(self, stats: dict) -> list[dict]:
+        async with self._limit:
+            loop = asyncio.get_running_loop()
+            start = max(loop.time(), self._next_start)
+            self._next_start = start + self._interval
+            await asyncio.sleep(start - loop.time())
+            return await self.insights.generate(stats)
+
+    async def _worker(self):
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    job = await claim_job(db)
+                    if job is not None:
+                        db.info["user_id"] = job.user_id  # read-your-writes for the result
+                        await self._run(job, db)
+                        continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("insights worker error")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.INSIGHTS_JOB_POLL_SECONDS)
+            except TimeoutError:
+                pass
+
+    async def _run(self, job: InsightJob, db: AsyncSession):
+        try:
+            if job.attempts > settings.INSIGHTS_JOB_MAX_ATTEMPTS:
+                raise TimeoutError("job timed out")
+            # give up well before claim_job hands the job to another worker; the model call
+            # itself keeps running and fills the cache for the retry. No db: the worker's
+            # connection would sit idle in a transaction for the whole model call
+            result = await asyncio.wait_for(
+                self.insights.get(job.session_id, job.request, generate=self._throttled),
+                settings.INSIGHTS_JOB_TIMEOUT_SECONDS * RUN_TIMEOUT_FRACTION,
+            )
+        except Exception as e:
+            await db.rollback()
+            error = str(e) or type(e).__name__
+            if job.attempts < settings.INSIGHTS_JOB_MAX_ATTEMPTS:
+                backoff = settings.INSIGHTS_JOB_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+                delay = backoff * random.uniform(0.5, 1.5)
+                run_after = func.now() + timedelta(seconds=delay)
+                await _finish(job, db, status="queued", error=error, run_after=run_after)
+                self.retried += 1
+            elif settings.INSIGHTS_ENGINE == "auto":
+                stats = await compute_session_stats(job.session_id, db)
+                fallback = local_insights(job.request, stats)
+                await _finish(job, db, status="done", result=fallback, error=error)
+                self.fell_back += 1
+            else:
+                await _finish(job, db, status="failed", error=error)
+                self.failed += 1
+            return
+        await _finish(job, db, status="done", result=result, error=None)
+        self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "fell_back": self.fell_back,
+        }
+
+
+job_workers = InsightsWorkerPool(
+    insights_cache,
+    settings.INSIGHTS_WORKERS,
+    settings.INSIGHTS_MAX_CONCURRENCY,
+    settings.INSIGHTS_RATE_PER_SECOND,
+)
@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import json
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import TTLCache
+from app.database import AsyncSessionLocal
+from app.models.insight import InsightCacheEntry
+
+Generate = Callable[[dict], Awaitable[list[dict]]]
+
+
+def stats_hash(stats: dict) -> str:
+    return hashlib.sha256(json.dumps(stats, sort_keys=True).encode()).hexdigest()
+
+
+class InsightsCache:
+    """Memoizes an insights generator per (session id, stats hash).
+
+    Results live in a bounded TTL cache and, with persist=True, in the insight_cache table
+    so they survive restarts and are shared between workers. Concurrent identical requests
+    share one generator call, run as its own task: a caller that gives up (timeout, client
+    gone) does not cancel it for the others, and it still fills the cache. Failures are
+    never cached. A caller may pass its own `generate` (e.g. a throttled wrapper) to be used
+    on a miss. Without a db the persisted lookup runs in a short session of its own, so a
+    caller that waits on the generator holds no pooled connection meanwhile.
+    """
+
+    def __init__(self, generate: Generate, maxsize: int, ttl: float, persist: bool = False):
+        self.generate = generate
+        self.ttl = ttl
+        self.persist = persist
+        self.coalesced = 0
+        self._memory = TTLCache(maxsize, ttl)
+        self._inflight: dict[tuple[str, str], asyncio.Task] = {}
+
+    async def get(
+        self,
+        session_id: str,
+        stats: dict,
+        db: AsyncSession | None = None,
+        generate: Generate | None = None,
+    ) -> list[dict]:
+        key = (session_id, stats_hash(stats))
+        if (cached := self._memory.get(key)) is not None:
+            return cached
+        if self.persist and key not in self._inflight:
+            if (stored := await self._load(key, db)) is not None:
+                self._memory.set(key, stored)
+                return stored
+
+        if (task := self._inflight.get(key)) is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.create_task(self._fill(key, stats, generate or self.generate))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    async def _fill(self, key: tuple[str, str], stats: dict, generate: Generate) -> list[dict]:
+        result = await generate(stats)
+        if result is None:  # insight_cache.insights is NOT NULL, and None reads as a miss
+            raise ValueError("insights generator returned no result")
+        if self.persist:
+            # its own session: the caller's may be closed by the time the generator returns
+            async with AsyncSessionLocal() as db:
+                await self._store(key, result, db)
+        self._memory.set(key, result)
+        return result
+
+    def _done(self, key: tuple[str, str], task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller has already given up
+
+    async def _load(self, key: tuple[str, str], db: AsyncSession | None) -> list[dict] | None:
+        if db is None:
+            async with AsyncSessionLocal() as db:
+                return await self._load(key, db)
+        fresh_after = datetime.now(UTC) - timedelta(seconds=self.ttl)
+        return await db.scalar(
+            select(InsightCacheEntry.insights).where(
+                InsightCacheEntry.session_id == key[0],
+                InsightCacheEntry.stats_hash == key[1],
+                InsightCacheEntry.created_at > fresh_after,
+            )
+        )
+
+    async def _store(self, key: tuple[str, str], insights: list[dict], db: AsyncSession):
+        stmt = insert(InsightCacheEntry).values(
+            session_id=key[0], stats_hash=key[1], insights=insights
+        )
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[InsightCacheEntry.session_id, InsightCacheEntry.stats_hash],
+                set_={"insights": stmt.excluded.insights, "created_at": stmt.excluded.created_at},
+            )
+        )
+        await db.commit()
+
+    def invalidate(self, session_id: str, stats: dict):
+        self._memory.pop((session_id, stats_hash(stats)))
+
+    def stats(self) -> dict:
+        return {
+            **self._memory.stats(),
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
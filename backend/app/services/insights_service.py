@@ -1,9 +1,19 @@
+import asyncio
+import logging
+import time
+
 from google import genai
 from google.genai import types
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
+from app.metrics import gemini_calls
+from app.services.insights_cache import InsightsCache
+from app.services.local_insights import local_insights
+from app.services.session_service import compute_session_stats
 
 settings = get_settings()
+log = logging.getLogger(__name__)
 
 _client = genai.Client(api_key=settings.GEMINI_API_KEY)
 
@@ -36,12 +46,57 @@ Session stats:
 
 
 async def generate_insights(session_stats: dict) -> list[dict]:
-    response = await _client.aio.models.generate_content(
-        model="gemini-1.5-flash",
-        contents=_PROMPT.format(**session_stats),
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-            response_schema=_RESPONSE_SCHEMA,
-        ),
-    )
-    return response.parsed
\ No newline at end of file
+    start, outcome = time.perf_counter(), "error"
+    try:
+        response = await _client.aio.models.generate_content(
+            model="gemini-1.5-flash",
+            contents=_PROMPT.format(**session_stats),
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=_RESPONSE_SCHEMA,
+            ),
+        )
+        if response.parsed is None:  # blocked, or the output did not match the schema
+            raise ValueError("Gemini returned no parsable insights")
+        outcome = "ok"
+        return response.parsed
+    finally:
+        gemini_calls.observe(time.perf_counter() - start, outcome=outcome)
+
+insights_cache = InsightsCache(
+    generate_insights,
+    maxsize=settings.INSIGHTS_CACHE_MAX_SIZE,
+    ttl=settings.INSIGHTS_CACHE_TTL_SECONDS,
+    persist=settings.INSIGHTS_CACHE_PERSIST,
+)
+
+_remote_down_until = 0.0
+
+
+def _retrieve(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        log.warning("background Gemini call failed: %s", task.exception())
+
+
+async def insights_with_fallback(
+    session_id: str, stats: dict, db: AsyncSession
+) -> tuple[list[dict], str]:
+    """Gemini insights bounded by INSIGHTS_REMOTE_TIMEOUT_SECONDS, else local ones.
+
+    Returns the insights and the engine that produced them. A Gemini call that times out
+    keeps running in the background and fills the cache for the next request; an error
+    makes later calls go straight to the local engine for INSIGHTS_REMOTE_COOLDOWN_SECONDS.
+    """
+    global _remote_down_until
+    if time.monotonic() >= _remote_down_until:
+        # no db: the call may outlive this request's session
+        task = asyncio.ensure_future(insights_cache.get(session_id, stats))
+        try:
+            timeout = settings.INSIGHTS_REMOTE_TIMEOUT_SECONDS
+            return await asyncio.wait_for(asyncio.shield(task), timeout), "gemini"
+        except TimeoutError:
+            task.add_done_callback(_retrieve)
+        except Exception as e:
+            log.warning("Gemini unavailable, using local insights: %s", e)
+            _remote_down_until = time.monotonic() + settings.INSIGHTS_REMOTE_COOLDOWN_SECONDS
+    return local_insights(stats, await compute_session_stats(session_id, db)), "local"
@@ -0,0 +1,128 @@
+"""Rule-based session insights with the same shape as the Gemini ones.
+
+Pure functions of the InsightsRequest stats and, when available, the stored snapshot
+aggregates, so they run in microseconds and never fail. Thresholds mirror the live
+scoring in frontend/src/lib/postureAnalysis.ts.
+"""
+from collections.abc import Iterable
+
+from app.schemas.session import SessionStats
+
+NECK_MIN_ANGLE = 150        # ear-shoulder-hip angle; below this the head is forward
+SPINE_MAX_ANGLE = 15        # torso lean from vertical
+SHOULDER_MIN_ALIGNMENT = 80  # shoulder_tilt is a 0-100 levelness score
+MIN_INSIGHTS, MAX_INSIGHTS = 3, 5
+
+_ALERT_ADVICE = {
+    "neck": (
+        "Neck strain",
+        "Raise your screen so the top edge is at eye level and keep your chin tucked.",
+    ),
+    "shoulder": (
+        "Uneven shoulders",
+        "Rest both forearms on the desk and check your chair armrests are level.",
+    ),
+    "spine": (
+        "Leaning torso",
+        "Sit back so your lower back touches the chair and keep your feet flat.",
+    ),
+}
+
+_FILLER = [
+    {"type": "tip", "title": "Micro-breaks",
+     "message": "Stand up and move for a minute every 30 minutes."},
+    {"type": "tip", "title": "Screen distance",
+     "message": "Keep your monitor about an arm's length away."},
+    {"type": "tip", "title": "Check in",
+     "message": "Scan your neck, shoulders and back at the start of each task."},
+]
+
+
+def _insight(kind: str, title: str, message: str) -> dict:
+    return {"type": kind, "title": title, "message": message}
+
+
+def local_insights(stats: dict, snapshot_stats: SessionStats | None = None) -> list[dict]:
+    """3-5 insights for one session from its InsightsRequest stats (without session_id)."""
+    out = []
+    score = stats["avg_posture_score"]
+    good = stats["good_posture_percent"]
+    minutes = stats["duration_seconds"] / 60
+
+    if score >= 80:
+        out.append(_insight(
+            "success", "Strong session", f"You averaged {score:.0f}/100 — keep your current setup."
+        ))
+    elif score >= 60:
+        out.append(_insight(
+            "tip", "Room to improve",
+            f"You averaged {score:.0f}/100; small adjustments will push you past 80.",
+        ))
+    else:
+        out.append(_insight(
+            "warning", "Low posture score",
+            f"You averaged {score:.0f}/100. Reset your chair and screen before the next session.",
+        ))
+
+    if good >= 75:
+        out.append(_insight(
+            "success", "Consistent posture", f"You held good posture {good:.0f}% of the time."
+        ))
+    elif good < 50:
+        out.append(_insight(
+            "warning", "Posture drifts",
+            f"Good posture only {good:.0f}% of the time — it tends to slip as sessions go on.",
+        ))
+
+    by_type = {t: stats.get(f"{t}_alerts", 0) for t in _ALERT_ADVICE}
+    worst = max(by_type, key=by_type.get)
+    if by_type[worst]:
+        title, advice = _ALERT_ADVICE[worst]
+        rate = stats["total_alerts"] / minutes * 60 if minutes else 0
+        out.append(_insight(
+            "warning", title, f"{by_type[worst]} {worst} alerts ({rate:.0f}/hour overall). {advice}"
+        ))
+
+    if snapshot_stats is not None and snapshot_stats.snapshot_count:
+        neck = snapshot_stats.neck_angle
+        spine = snapshot_stats.spine_angle
+        shoulder = snapshot_stats.shoulder_tilt
+        if neck.avg is not None and neck.avg < NECK_MIN_ANGLE and worst != "neck":
+            out.append(_insight(
+                "warning", "Forward head",
+                f"Your neck averaged {neck.avg:.0f}°; aim for {NECK_MIN_ANGLE}° or more.",
+            ))
+        elif neck.min is not None and neck.min < NECK_MIN_ANGLE - 20:
+            out.append(_insight(
+                "tip", "Occasional slouch",
+                f"Your neck dipped to {neck.min:.0f}° at times"
+                " — watch for it when you concentrate.",
+            ))
+        if spine.avg is not None and spine.avg > SPINE_MAX_ANGLE and worst != "spine":
+            out.append(_insight(
+                "warning", "Leaning",
+                f"Your torso leaned {spine.avg:.0f}° on average; sit upright against the backrest.",
+            ))
+        if (shoulder.avg is not None and shoulder.avg < SHOULDER_MIN_ALIGNMENT
+                and worst != "shoulder"):
+            out.append(_insight(
+                "tip", "Level your shoulders",
+                f"Shoulder alignment averaged {shoulder.avg:.0f}/100.",
+            ))
+
+    if stats.get("break_alerts", 0) or minutes >= 50:
+        out.append(_insight(
+            "tip", "Take breaks",
+            f"This session ran {minutes:.0f} minutes; stand and stretch at least hourly.",
+        ))
+
+    for filler in _FILLER:
+        if len(out) >= MIN_INSIGHTS:
+            break
+        out.append(dict(filler))
+    return out[:MAX_INSIGHTS]
+
+
+def local_insights_batch(rows: Iterable[tuple[dict, SessionStats | None]]) -> list[list[dict]]:
+    """Score many sessions at once, e.g. with stats from compute_sessions_stats."""
+    return [local_insights(stats, snapshot_stats) for stats, snapshot_stats in rows]
@@ -0,0 +1,130 @@
+"""Per-user event fan-out for GET /notifications/stream.
+
+Writers queue events on their DB session with notify_user(); they go out when that session
+commits and are dropped if it rolls back. By default the hub delivers them to this process's
+subscribers. With NOTIFY_VIA_POSTGRES the events ride pg_notify inside the transaction
+instead, and each process LISTENs and hands them to its own subscribers, so a client
+connected to any worker hears about writes made on every other.
+"""
+import asyncio
+import contextlib
+import logging
+from collections import defaultdict
+from collections.abc import Iterator
+
+import asyncpg
+import orjson
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import engine
+
+settings = get_settings()
+log = logging.getLogger(__name__)
+
+CHANNEL = "user_events"
+
+
+class NotificationHub:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.delivered = 0
+        self.dropped = 0
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._listener: asyncio.Task | None = None
+
+    def deliver(self, user_id: str, events: list[dict]):
+        """Hand events to every local subscriber of user_id; a subscriber whose queue is full
+        (a stalled client) loses them rather than holding up the writer."""
+        for queue in self._subscribers.get(user_id, ()):
+            for e in events:
+                try:
+                    queue.put_nowait(e)
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    self.dropped += 1
+
+    @contextlib.contextmanager
+    def subscribe(self, user_id: str) -> Iterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers[user_id].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[user_id].discard(queue)
+            if not self._subscribers[user_id]:
+                del self._subscribers[user_id]
+
+    def start(self):
+        if settings.NOTIFY_VIA_POSTGRES:
+            self._listener = asyncio.create_task(self._listen(), name="notifications-listener")
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    def _on_notify(self, conn, pid, channel, payload: str):
+        user_id, events = orjson.loads(payload)
+        self.deliver(user_id, events)
+
+    async def _listen(self):
+        # a dedicated connection outside the pool: LISTEN lasts as long as the connection
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                conn = await asyncpg.connect(dsn)
+                try:
+                    await conn.add_listener(CHANNEL, self._on_notify)
+                    while not conn.is_closed():
+                        await asyncio.sleep(settings.NOTIFY_HEARTBEAT_SECONDS)
+                finally:
+                    await conn.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("notifications listener lost its connection")
+            await asyncio.sleep(1)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "postgres" if settings.NOTIFY_VIA_POSTGRES else "memory",
+            "users": len(self._subscribers),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+hub = NotificationHub(settings.NOTIFY_QUEUE_SIZE)
+
+
+async def notify_user(db: AsyncSession, user_id: str, kind: str, *data: dict):
+    """Queue one `kind` event per data item for user_id, sent when db commits."""
+    events = [{"type": kind, "data": d} for d in data]
+    if not events:
+        return
+    if settings.NOTIFY_VIA_POSTGRES:
+        # NOTIFY is transactional, so listeners only see these once the transaction commits;
+        # one notification per event keeps each payload well under the 8000-byte limit
+        payloads = [orjson.dumps([user_id, [e]]).decode() for e in events]
+        await db.execute(
+            text("SELECT pg_notify(:channel, p) FROM unnest(CAST(:payloads AS text[])) p"),
+            {"channel": CHANNEL, "payloads": payloads},
+        )
+    else:
+        db.info.setdefault("events", []).append((user_id, events))
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_on_commit(session: Session):
+    for user_id, events in session.info.pop("events", ()):
+        hub.deliver(user_id, events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_on_rollback(session: Session):
+    session.info.pop("events", None)
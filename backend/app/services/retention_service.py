@@ -0,0 +1,263 @@
+"""Snapshot partition maintenance and raw-snapshot retention.
+
+When SNAPSHOT_PARTITIONING is on, `snapshots` is a table range-partitioned on captured_at
+in blocks of SNAPSHOT_PARTITION_MONTHS, with a DEFAULT partition catching anything outside
+the pre-created range. Routers keep querying `snapshots` and Postgres prunes partitions.
+
+The retention job folds raw snapshots older than the cutoff into per-session, per-minute
+`snapshot_rollups` rows and then removes them, dropping whole partitions where it can.
+"""
+import logging
+from datetime import UTC, date, datetime, time
+
+from sqlalchemy import case, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models.rollup import SnapshotRollup
+from app.models.snapshot import PostureSnapshot
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_PARENT = PostureSnapshot.__tablename__
+
+
+async def is_partitioned(db: AsyncSession) -> bool:
+    return bool(
+        await db.scalar(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:t))"
+            ),
+            {"t": _PARENT},
+        )
+    )
+
+
+def _block_start(d: date, months: int) -> date:
+    index = (d.year * 12 + d.month - 1) // months * months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _add_months(d: date, months: int) -> date:
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_ranges(start: date, end: date, months: int) -> list[tuple[str, date, date]]:
+    """(name, lower, upper) for every aligned partition block overlapping [start, end]."""
+    ranges = []
+    lower = _block_start(start, months)
+    while lower <= end:
+        upper = _add_months(lower, months)
+        ranges.append((f"{_PARENT}_p{lower:%Y%m}", lower, upper))
+        lower = upper
+    return ranges
+
+
+async def ensure_partitions(db: AsyncSession, start: date | None = None) -> list[str]:
+    """Create any missing partitions from `start` (default: today) through the look-ahead window.
+
+    Rows of a new partition's range that already landed in the DEFAULT partition (a client
+    clock far ahead, a missed maintenance run) are moved into it first; Postgres refuses to
+    add a partition whose range the DEFAULT partition holds rows for.
+    """
+    today = datetime.now(UTC).date()
+    months = settings.SNAPSHOT_PARTITION_MONTHS
+    end = _add_months(today, months * settings.SNAPSHOT_PARTITIONS_AHEAD)
+    default = f"{_PARENT}_default"
+    has_default = await db.scalar(text("SELECT to_regclass(:n) IS NOT NULL"), {"n": default})
+    created = []
+    for name, lower, upper in partition_ranges(start or today, end, months):
+        exists = await db.scalar(text("SELECT to_regclass(:n) IS NOT NULL"), {"n": name})
+        if exists:
+            continue
+        bounds = f"FROM ('{lower.isoformat()} 00:00+00') TO ('{upper.isoformat()} 00:00+00')"
+        if not has_default:
+            await db.execute(
+                text(f"CREATE TABLE {name} PARTITION OF {_PARENT} FOR VALUES {bounds}")
+            )
+        else:
+            await db.execute(
+                text(
+                    f"CREATE TABLE {name} "
+                    f"(LIKE {_PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                )
+            )
+            await db.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {default} "
+                    "WHERE captured_at >= :lower AND captured_at < :upper RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved"
+                ),
+                {
+                    "lower": datetime.combine(lower, time(), UTC),
+                    "upper": datetime.combine(upper, time(), UTC),
+                },
+            )
+            await db.execute(
+                text(f"ALTER TABLE {_PARENT} ATTACH PARTITION {name} FOR VALUES {bounds}")
+            )
+        created.append(name)
+    return created
+
+
+async def convert_to_partitioned(db: AsyncSession):
+    """Rebuild `snapshots` as a partitioned table, copying every row. Runs in the caller's
+    transaction.
+
+    The primary key becomes (id, captured_at) because Postgres requires the partition key in
+    every unique constraint; ids are still generated as UUIDs so they stay unique in practice.
+    """
+    if await is_partitioned(db):
+        return
+    oldest = await db.scalar(select(func.min(PostureSnapshot.captured_at)))
+
+    await db.execute(text(f"ALTER TABLE {_PARENT} RENAME TO {_PARENT}_unpartitioned"))
+    await db.execute(
+        text(
+            f"ALTER TABLE {_PARENT}_unpartitioned "
+            f"RENAME CONSTRAINT {_PARENT}_pkey TO {_PARENT}_pkey_unpartitioned"
+        )
+    )
+    for index in PostureSnapshot.__table__.indexes:
+        await db.execute(text(f"ALTER INDEX {index.name} RENAME TO {index.name}_unpartitioned"))
+    await db.execute(
+        text(
+            f"CREATE TABLE {_PARENT} "
+            f"(LIKE {_PARENT}_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            "PARTITION BY RANGE (captured_at)"
+        )
+    )
+    await db.execute(
+        text(
+            f"ALTER TABLE {_PARENT} "
+            f"ADD CONSTRAINT {_PARENT}_pkey PRIMARY KEY (id, captured_at), "
+            f"ADD CONSTRAINT {_PARENT}_session_id_fkey FOREIGN KEY (session_id) "
+            "REFERENCES sessions (id) ON DELETE CASCADE, "
+            f"ADD CONSTRAINT {_PARENT}_user_id_fkey FOREIGN KEY (user_id) "
+            "REFERENCES users (id) ON DELETE CASCADE"
+        )
+    )
+    await db.execute(text(f"CREATE TABLE {_PARENT}_default PARTITION OF {_PARENT} DEFAULT"))
+    await ensure_partitions(db, start=oldest.date() if oldest else None)
+
+    await db.execute(text(f"INSERT INTO {_PARENT} SELECT * FROM {_PARENT}_unpartitioned"))
+    await db.execute(text(f"DROP TABLE {_PARENT}_unpartitioned"))
+    for index in PostureSnapshot.__table__.indexes:
+        await db.run_sync(lambda session, index=index: index.create(session.connection()))
+
+
+async def maintain_partitions():
+    """Startup hook: keep the look-ahead partitions in place when partitioning is enabled."""
+    async with AsyncSessionLocal() as db:
+        if not await is_partitioned(db):
+            logger.warning(
+                "SNAPSHOT_PARTITIONING is on but %s is not partitioned; "
+                "run `python -m scripts.snapshot_retention partition`",
+                _PARENT,
+            )
+            return
+        await ensure_partitions(db)
+        await db.commit()
+
+
+def _merge_avg(col: str):
+    """Sample-weighted average of the stored and incoming rollup values for `col`."""
+    stored, new = getattr(SnapshotRollup, col), literal_column(f"excluded.{col}")
+    n_stored, n_new = SnapshotRollup.sample_count, literal_column("excluded.sample_count")
+    return case(
+        (stored.is_(None), new),
+        (new.is_(None), stored),
+        else_=(stored * n_stored + new * n_new) / (n_stored + n_new),
+    )
+
+
+async def rollup_snapshots(db: AsyncSession, cutoff: datetime) -> int:
+    """Fold raw snapshots captured before `cutoff` into snapshot_rollups. Returns rows written."""
+    s = PostureSnapshot
+    minute = func.date_trunc("minute", s.captured_at)
+    source = select(
+        s.session_id,
+        minute,
+        s.user_id,
+        func.count(),
+        func.avg(s.posture_score),
+        func.min(s.posture_score),
+        func.max(s.posture_score),
+        func.count().filter(s.posture_state == "good"),
+        func.count().filter(s.posture_state == "bad"),
+        func.count().filter(s.posture_state == "risky"),
+        func.avg(s.neck_angle),
+        func.avg(s.shoulder_tilt),
+        func.avg(s.spine_angle),
+    ).where(s.captured_at < cutoff).group_by(s.session_id, minute, s.user_id)
+
+    r = SnapshotRollup
+    stmt = insert(r).from_select(
+        [
+            r.session_id, r.minute, r.user_id, r.sample_count,
+            r.avg_posture_score, r.min_posture_score, r.max_posture_score,
+            r.good_count, r.bad_count, r.risky_count,
+            r.avg_neck_angle, r.avg_shoulder_tilt, r.avg_spine_angle,
+        ],
+        source,
+    )
+    ex = stmt.excluded
+    # a minute can straddle two runs (the cutoff moves), so merge rather than overwrite
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[r.session_id, r.minute],
+        set_={
+            "avg_posture_score": _merge_avg("avg_posture_score"),
+            "avg_neck_angle": _merge_avg("avg_neck_angle"),
+            "avg_shoulder_tilt": _merge_avg("avg_shoulder_tilt"),
+            "avg_spine_angle": _merge_avg("avg_spine_angle"),
+            "min_posture_score": func.least(r.min_posture_score, ex.min_posture_score),
+            "max_posture_score": func.greatest(r.max_posture_score, ex.max_posture_score),
+            "good_count": r.good_count + ex.good_count,
+            "bad_count": r.bad_count + ex.bad_count,
+            "risky_count": r.risky_count + ex.risky_count,
+            "sample_count": r.sample_count + ex.sample_count,
+        },
+    )
+    result = await db.execute(stmt)
+    return result.rowcount
+
+
+async def purge_snapshots(db: AsyncSession, cutoff: datetime) -> dict:
+    """Remove raw snapshots captured before `cutoff`: drop partitions that end at or before it,
+    then delete what is left below it in the straddling partition."""
+    dropped = []
+    if await is_partitioned(db):
+        rows = await db.execute(
+            text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(:t)"
+            ),
+            {"t": _PARENT},
+        )
+        for name, bound in rows.all():
+            if bound == "DEFAULT":
+                continue
+            upper = datetime.fromisoformat(bound.rsplit("TO ('", 1)[1].rstrip("')"))
+            if upper <= cutoff:
+                await db.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+
+    result = await db.execute(
+        PostureSnapshot.__table__.delete().where(PostureSnapshot.captured_at < cutoff)
+    )
+    return {"dropped_partitions": dropped, "deleted_rows": result.rowcount}
+
+
+async def run_retention(db: AsyncSession, cutoff: datetime) -> dict:
+    """Roll up and purge everything captured before `cutoff` in one transaction."""
+    rolled_up = await rollup_snapshots(db, cutoff)
+    purged = await purge_snapshots(db, cutoff)
+    if await is_partitioned(db):
+        purged["created_partitions"] = await ensure_partitions(db)
+    await db.commit()
+    return {"cutoff": cutoff.isoformat(), "rollup_rows": rolled_up, **purged}
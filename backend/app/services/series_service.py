@@ -0,0 +1,159 @@
+import math
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import Select, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.snapshot import PostureSnapshot
+from app.schemas.snapshot import MinAvgMax, SeriesBucket
+
+MAX_BUCKETS = 5000
+LTTB_OVERSAMPLE = 4  # DB buckets per output point that LTTB picks from
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def series_filters(
+    user_id: str, session_id: str | None, start: datetime | None, end: datetime | None
+) -> list:
+    clauses = [PostureSnapshot.user_id == user_id]
+    if session_id:
+        clauses.append(PostureSnapshot.session_id == session_id)
+    if start:
+        clauses.append(PostureSnapshot.captured_at >= start)
+    if end:
+        clauses.append(PostureSnapshot.captured_at < end)
+    return clauses
+
+
+async def _time_span(clauses: list, db: AsyncSession) -> tuple[datetime | None, datetime | None]:
+    captured = PostureSnapshot.captured_at
+    return (await db.execute(select(func.min(captured), func.max(captured)).where(*clauses))).one()
+
+
+def bucket_width_for(points: int, lo: datetime, hi: datetime) -> int:
+    """Smallest whole-second bucket width that spreads [lo, hi] over `points` buckets."""
+    return max(1, math.ceil((hi - lo).total_seconds() / points))
+
+
+def bucket_count(bucket_seconds: int, lo: datetime, hi: datetime) -> int:
+    """Number of epoch-aligned buckets of `bucket_seconds` that [lo, hi] touches."""
+    width = timedelta(seconds=bucket_seconds)
+    return (hi - _EPOCH) // width - (lo - _EPOCH) // width + 1
+
+
+def _mam(lo, avg, hi) -> MinAvgMax:
+    return MinAvgMax(min=lo, avg=avg, max=hi)
+
+
+def series_query(bucket_seconds: int, clauses: list) -> Select:
+    width = literal(timedelta(seconds=bucket_seconds))
+    bucket = func.date_bin(width, PostureSnapshot.captured_at, literal(_EPOCH))
+    aggs = []
+    for col in (
+        PostureSnapshot.posture_score,
+        PostureSnapshot.neck_angle,
+        PostureSnapshot.shoulder_tilt,
+        PostureSnapshot.spine_angle,
+    ):
+        aggs += [func.min(col), func.avg(col), func.max(col)]
+    state = PostureSnapshot.posture_state
+    return (
+        select(
+            bucket.label("bucket"),
+            func.count(),
+            *aggs,
+            func.count().filter(state == "good"),
+            func.count().filter(state == "bad"),
+            func.count().filter(state == "risky"),
+        )
+        .where(*clauses)
+        .group_by("bucket")
+        .order_by("bucket")
+    )
+
+
+async def _bucketed(bucket_seconds: int, clauses: list, db: AsyncSession) -> list[SeriesBucket]:
+    rows = await db.execute(series_query(bucket_seconds, clauses))
+    return [
+        SeriesBucket(
+            bucket_start=r[0],
+            count=r[1],
+            posture_score=_mam(*r[2:5]),
+            neck_angle=_mam(*r[5:8]),
+            shoulder_tilt=_mam(*r[8:11]),
+            spine_angle=_mam(*r[11:14]),
+            good=r[14],
+            bad=r[15],
+            risky=r[16],
+        )
+        for r in rows
+    ]
+
+
+def lttb(buckets: list[SeriesBucket], threshold: int) -> list[SeriesBucket]:
+    """Largest-Triangle-Three-Buckets over the average posture score; keeps first and last."""
+    n = len(buckets)
+    if threshold >= n or threshold < 3:
+        return buckets
+
+    xs = [b.bucket_start.timestamp() for b in buckets]
+    ys = [b.posture_score.avg or 0.0 for b in buckets]
+    every = (n - 2) / (threshold - 2)
+    picked = [buckets[0]]
+    a = 0
+    for i in range(threshold - 2):
+        # average of the next range is the third triangle vertex
+        nxt_lo = int((i + 1) * every) + 1
+        nxt_hi = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(xs[nxt_lo:nxt_hi]) / (nxt_hi - nxt_lo)
+        avg_y = sum(ys[nxt_lo:nxt_hi]) / (nxt_hi - nxt_lo)
+
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > best_area:
+                best, best_area = j, area
+        picked.append(buckets[best])
+        a = best
+    picked.append(buckets[-1])
+    return picked
+
+
+async def snapshot_series(
+    user_id: str,
+    db: AsyncSession,
+    session_id: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    bucket_seconds: int | None = None,
+    points: int | None = None,
+    downsample: str = "avg",
+) -> tuple[int, list[SeriesBucket]]:
+    """Time-bucketed snapshot aggregates computed in the database.
+
+    Either bucket_seconds is given, or it is derived from `points` and the time span of the
+    matching rows. With downsample="lttb" the database buckets LTTB_OVERSAMPLE times finer
+    and LTTB picks `points` representative buckets from those. A derived width never yields
+    more than MAX_BUCKETS buckets; a given one that would raises ValueError.
+    """
+    clauses = series_filters(user_id, session_id, start, end)
+    lo, hi = await _time_span(clauses, db)
+    if lo is None:
+        return bucket_seconds or 1, []
+    if bucket_seconds is None:
+        target = points * LTTB_OVERSAMPLE if downsample == "lttb" else points
+        # a span split into n buckets can touch n + 1 epoch-aligned ones
+        bucket_seconds = bucket_width_for(min(target, MAX_BUCKETS - 1), lo, hi)
+    elif (count := bucket_count(bucket_seconds, lo, hi)) > MAX_BUCKETS:
+        raise ValueError(
+            f"{count} buckets of {bucket_seconds}s exceed the limit of {MAX_BUCKETS}; "
+            "pass a larger bucket_seconds or a narrower start/end"
+        )
+
+    buckets = await _bucketed(bucket_seconds, clauses, db)
+    if downsample == "lttb" and points:
+        buckets = lttb(buckets, points)
+    return bucket_seconds, buckets
@@ -0,0 +1,169 @@
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+
+from sqlalchemy import Float, Integer, Select, String, column, func, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.alert import PostureAlert
+from app.models.session import PostureSession
+from app.models.snapshot import PostureSnapshot
+from app.schemas.session import EndSessionRequest, SessionStats
+from app.schemas.snapshot import MinAvgMax
+
+settings = get_settings()
+
+
+def running_aggregates_enabled() -> bool:
+    return settings.SESSION_AGGREGATES == "running"
+
+
+async def bump_snapshot_aggregates(items: Iterable, db: AsyncSession):
+    """Fold new snapshots (anything with session_id/posture_score/posture_state) into the
+    running counters of their sessions with one UPDATE ... FROM (VALUES ...)."""
+    deltas: dict[str, list] = defaultdict(lambda: [0, 0.0, 0])
+    for item in items:
+        d = deltas[item.session_id]
+        d[0] += 1
+        d[1] += item.posture_score
+        d[2] += item.posture_state == "good"
+    if not deltas:
+        return
+
+    v = values(
+        column("id", String), column("n", Integer), column("score", Float), column("good", Integer),
+        name="v",
+    ).data([(sid, n, score, good) for sid, (n, score, good) in deltas.items()])
+    await db.execute(
+        update(PostureSession)
+        .where(PostureSession.id == v.c.id)
+        .values(
+            snapshot_count=PostureSession.snapshot_count + v.c.n,
+            score_sum=PostureSession.score_sum + v.c.score,
+            good_count=PostureSession.good_count + v.c.good,
+        )
+    )
+
+
+async def bump_alert_count(session_id: str, n: int, db: AsyncSession):
+    await db.execute(
+        update(PostureSession)
+        .where(PostureSession.id == session_id)
+        .values(total_alerts=PostureSession.total_alerts + n)
+    )
+
+
+def _angle_aggs(col):
+    return func.min(col), func.avg(col), func.max(col)
+
+
+def session_stats_query(session_id: str) -> Select:
+    per_type = (
+        select(PostureAlert.alert_type, func.sum(PostureAlert.repeat_count).label("n"))
+        .where(PostureAlert.session_id == session_id)
+        .group_by(PostureAlert.alert_type)
+        .subquery()
+    )
+    alerts_by_type = select(
+        func.json_object_agg(per_type.c.alert_type, per_type.c.n)
+    ).scalar_subquery()
+
+    return select(
+        func.count(),
+        func.avg(PostureSnapshot.posture_score),
+        func.count().filter(PostureSnapshot.posture_state == "good"),
+        *_angle_aggs(PostureSnapshot.neck_angle),
+        *_angle_aggs(PostureSnapshot.shoulder_tilt),
+        *_angle_aggs(PostureSnapshot.spine_angle),
+        alerts_by_type,
+    ).where(PostureSnapshot.session_id == session_id)
+
+
+def _stats_from_row(session_id: str, row) -> SessionStats:
+    count, avg_score, good, *angles, by_type = row
+    by_type = by_type or {}
+    return SessionStats(
+        session_id=session_id,
+        snapshot_count=count,
+        avg_posture_score=avg_score,
+        good_posture_percent=good * 100 / count if count else None,
+        total_alerts=sum(by_type.values()),
+        alerts_by_type=by_type,
+        neck_angle=MinAvgMax(min=angles[0], avg=angles[1], max=angles[2]),
+        shoulder_tilt=MinAvgMax(min=angles[3], avg=angles[4], max=angles[5]),
+        spine_angle=MinAvgMax(min=angles[6], avg=angles[7], max=angles[8]),
+    )
+
+
+async def compute_session_stats(session_id: str, db: AsyncSession) -> SessionStats:
+    """Aggregate a session's snapshots and alerts in one set-based query."""
+    row = (await db.execute(session_stats_query(session_id))).one()
+    return _stats_from_row(session_id, row)
+
+
+async def compute_sessions_stats(
+    session_ids: Sequence[str], db: AsyncSession
+) -> dict[str, SessionStats]:
+    """compute_session_stats for many sessions with one grouped query per table.
+
+    Sessions without snapshots come back with snapshot_count 0 so callers can index
+    the result by every id they asked for.
+    """
+    if not session_ids:
+        return {}
+    per_type = (
+        select(
+            PostureAlert.session_id,
+            PostureAlert.alert_type,
+            func.sum(PostureAlert.repeat_count).label("n"),
+        )
+        .where(PostureAlert.session_id.in_(session_ids))
+        .group_by(PostureAlert.session_id, PostureAlert.alert_type)
+        .subquery()
+    )
+    alerts = dict((await db.execute(
+        select(per_type.c.session_id, func.json_object_agg(per_type.c.alert_type, per_type.c.n))
+        .group_by(per_type.c.session_id)
+    )).all())
+    rows = await db.execute(
+        select(
+            PostureSnapshot.session_id,
+            func.count(),
+            func.avg(PostureSnapshot.posture_score),
+            func.count().filter(PostureSnapshot.posture_state == "good"),
+            *_angle_aggs(PostureSnapshot.neck_angle),
+            *_angle_aggs(PostureSnapshot.shoulder_tilt),
+            *_angle_aggs(PostureSnapshot.spine_angle),
+        )
+        .where(PostureSnapshot.session_id.in_(session_ids))
+        .group_by(PostureSnapshot.session_id)
+    )
+    found = {sid: (*rest, alerts.get(sid)) for sid, *rest in rows}
+    empty = (0, None, 0, *[None] * 9)
+    return {
+        sid: _stats_from_row(sid, found.get(sid) or (*empty, alerts.get(sid)))
+        for sid in session_ids
+    }
+
+
+async def finalize_aggregates(session: PostureSession, body: EndSessionRequest, db: AsyncSession):
+    """Fill the session's summary columns according to SESSION_AGGREGATES.
+
+    The client's numbers are kept only in "client" mode, or as a fallback for sessions
+    that have no stored snapshots.
+    """
+    avg, good, alerts = body.avg_posture_score, body.good_posture_percent, body.total_alerts
+    if settings.SESSION_AGGREGATES == "running":
+        alerts = session.total_alerts
+        if session.snapshot_count:
+            avg = session.score_sum / session.snapshot_count
+            good = session.good_count * 100 / session.snapshot_count
+    elif settings.SESSION_AGGREGATES == "query":
+        stats = await compute_session_stats(session.id, db)
+        alerts = stats.total_alerts
+        if stats.snapshot_count:
+            avg, good = stats.avg_posture_score, stats.good_posture_percent
+
+    session.avg_posture_score = avg
+    session.good_posture_percent = good
+    session.total_alerts = alerts
@@ -0,0 +1,41 @@
+import uuid
+from collections.abc import Iterable, Sequence
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.session import PostureSession
+from app.models.snapshot import PostureSnapshot
+from app.schemas.snapshot import SnapshotBatchItem
+from app.services.session_service import bump_snapshot_aggregates, running_aggregates_enabled
+
+
+async def missing_sessions(user_id: str, session_ids: Iterable[str], db: AsyncSession) -> set[str]:
+    """Return the subset of session_ids that do not exist or belong to another user."""
+    wanted = set(session_ids)
+    owned = await db.scalars(
+        select(PostureSession.id).where(
+            PostureSession.id.in_(wanted), PostureSession.user_id == user_id
+        )
+    )
+    return wanted - set(owned.all())
+
+
+async def insert_snapshots(
+    user_id: str, items: Sequence[SnapshotBatchItem], db: AsyncSession
+) -> list[str]:
+    """Write all items in a single multi-row INSERT. Does not commit; returns the new ids in
+    order."""
+    rows = [
+        {
+            **item.model_dump(exclude={"captured_at"}),
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "captured_at": item.captured_at or func.now(),
+        }
+        for item in items
+    ]
+    await db.execute(insert(PostureSnapshot).values(rows))
+    if running_aggregates_enabled():
+        await bump_snapshot_aggregates(items, db)
+    return [row["id"] for row in rows]
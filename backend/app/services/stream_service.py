@@ -0,0 +1,118 @@
+import asyncio
+import contextlib
+import logging
+
+from fastapi import WebSocket, status
+from pydantic import ValidationError
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.schemas.alert import AlertCreate
+from app.schemas.snapshot import SnapshotBatchItem
+from app.services.alert_service import insert_alerts
+from app.services.snapshot_service import insert_snapshots
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_CLOSE = object()
+
+
+class SessionStream:
+    """Buffers snapshot/alert frames from one websocket and writes them in bounded batches.
+
+    Frames are JSON objects with a "type" of "snapshot" or "alert" plus the fields of
+    SnapshotCreate / AlertCreate (session_id is implied by the connection). The buffer is
+    a bounded queue: once the writer falls behind, the reader stops pulling frames off the
+    socket and the client sees TCP backpressure.
+    """
+
+    def __init__(self, websocket: WebSocket, user_id: str, session_id: str):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.session_id = session_id
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.STREAM_MAX_PENDING)
+
+    async def run(self):
+        writer = asyncio.create_task(self._writer())
+        try:
+            async for frame in self.websocket.iter_json():
+                try:
+                    item = self._parse(frame)
+                except ValueError as e:
+                    await self._send({"type": "error", "detail": str(e)})
+                    continue
+                if writer.done():
+                    break
+                await self._queue.put(item)
+        finally:
+            # writer drains whatever is still queued before exiting
+            if not writer.done():
+                await self._queue.put(_CLOSE)
+            with contextlib.suppress(Exception):
+                await writer
+
+    def _parse(self, frame) -> SnapshotBatchItem | AlertCreate:
+        if not isinstance(frame, dict):
+            raise ValueError("Frame must be a JSON object")
+        kind = frame.pop("type", None)
+        frame["session_id"] = self.session_id
+        try:
+            if kind == "snapshot":
+                return SnapshotBatchItem(**frame)
+            if kind == "alert":
+                return AlertCreate(**frame)
+        except ValidationError as e:
+            raise ValueError(str(e)) from e
+        raise ValueError(f"Unknown frame type: {kind}")
+
+    async def _writer(self):
+        snapshots: list[SnapshotBatchItem] = []
+        alerts: list[AlertCreate] = []
+        loop = asyncio.get_running_loop()
+        deadline = None
+        try:
+            while True:
+                timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except TimeoutError:
+                    item = None
+
+                if isinstance(item, SnapshotBatchItem):
+                    snapshots.append(item)
+                elif isinstance(item, AlertCreate):
+                    alerts.append(item)
+                if deadline is None and (snapshots or alerts):
+                    deadline = loop.time() + settings.STREAM_FLUSH_SECONDS
+
+                full = len(snapshots) + len(alerts) >= settings.STREAM_BATCH_SIZE
+                if item is None or item is _CLOSE or full:
+                    if snapshots or alerts:
+                        await self._flush(snapshots, alerts)
+                        snapshots, alerts, deadline = [], [], None
+                    if item is _CLOSE:
+                        return
+        except Exception:
+            logger.exception("stream writer failed for session %s", self.session_id)
+            with contextlib.suppress(Exception):
+                await self.websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+            # unblock a reader waiting on a full queue so it can notice the writer is gone
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            raise
+
+    async def _flush(self, snapshots: list[SnapshotBatchItem], alerts: list[AlertCreate]):
+        # info marks the user for read-your-writes, as get_current_user does for requests
+        async with AsyncSessionLocal(info={"user_id": self.user_id}) as db:
+            if snapshots:
+                await insert_snapshots(self.user_id, snapshots, db)
+            if alerts:
+                await insert_alerts(self.user_id, alerts, db)
+            await db.commit()
+        await self._send({"type": "ack", "snapshots": len(snapshots), "alerts": len(alerts)})
+
+    async def _send(self, message: dict):
+        # the client may already be gone (e.g. the final flush after disconnect)
+        with contextlib.suppress(Exception):
+            await self.websocket.send_json(message)
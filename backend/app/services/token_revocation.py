@@ -0,0 +1,187 @@
+"""Revoked token families and refresh tokens, checked without a query on the hot path.
+
+Every access and refresh token carries a family id (one per sign-in) and refresh tokens a
+jti. Logout revokes the family; each refresh records the used jti so a replay is caught.
+revoked_tokens is mirrored into a Bloom filter: a miss means "not revoked" with certainty,
+and only a hit (a revoked key or a rare false positive) is confirmed against the table.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import TTLCache
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models.user import RevokedToken
+
+settings = get_settings()
+log = logging.getLogger(__name__)
+
+# rows committed by a transaction that started before the last reload carry an earlier
+# revoked_at than rows already seen, so incremental reloads look back this far
+_RELOAD_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        # double hashing: k positions from the two halves of one 128-bit digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8]), int.from_bytes(digest[8:]) | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RevocationList:
+    def __init__(self):
+        self.reloads = 0
+        self.confirmations = 0
+        self.false_positives = 0
+        self._bloom = self._new_filter(0)
+        self._loaded_until: datetime | None = None
+        self._confirmed = TTLCache(10_000, settings.REVOCATION_RELOAD_SECONDS)
+        self._task: asyncio.Task | None = None
+
+    @staticmethod
+    def _new_filter(rows: int) -> BloomFilter:
+        capacity = max(settings.REVOCATION_BLOOM_CAPACITY, rows * 2)
+        return BloomFilter(capacity, settings.REVOCATION_BLOOM_ERROR_RATE)
+
+    def add(self, key: str):
+        self._bloom.add(key)
+        self._confirmed.pop(key)
+
+    async def is_revoked(self, key: str) -> bool:
+        if key not in self._bloom:
+            return False
+        if (revoked := self._confirmed.get(key)) is not None:
+            return revoked
+        self.confirmations += 1
+        async with AsyncSessionLocal() as db:
+            found = await db.scalar(select(RevokedToken.key).where(RevokedToken.key == key))
+        revoked = found is not None
+        self.false_positives += not revoked
+        self._confirmed.set(key, revoked)
+        return revoked
+
+    async def load(self, full: bool = False):
+        """Add rows revoked since the last load to the filter; `full` prunes expired rows
+        and rebuilds it from scratch, which is also how the filter grows."""
+        async with AsyncSessionLocal() as db:
+            if full:
+                await db.execute(delete(RevokedToken).where(RevokedToken.expires_at < func.now()))
+                await db.commit()
+            q = select(RevokedToken.key, RevokedToken.revoked_at).where(
+                RevokedToken.expires_at >= func.now()
+            )
+            if not full and self._loaded_until is not None:
+                q = q.where(RevokedToken.revoked_at > self._loaded_until - _RELOAD_OVERLAP)
+            rows = (await db.execute(q)).all()
+
+        bloom = self._new_filter(len(rows)) if full else self._bloom
+        for key, _ in rows:
+            bloom.add(key)
+        if full:
+            self._bloom = bloom
+        latest = max((revoked_at for _, revoked_at in rows), default=None)
+        if latest is not None and (self._loaded_until is None or latest > self._loaded_until):
+            self._loaded_until = latest
+        self.reloads += 1
+        if self._bloom.count > self._bloom.capacity:
+            await self.load(full=True)
+
+    async def start(self):
+        await self.load(full=True)
+        self._task = asyncio.create_task(self._reload_loop(), name="token-revocation-reload")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _reload_loop(self):
+        loop = asyncio.get_running_loop()
+        next_rebuild = loop.time() + settings.REVOCATION_REBUILD_SECONDS
+        while True:
+            await asyncio.sleep(settings.REVOCATION_RELOAD_SECONDS)
+            try:
+                full = loop.time() >= next_rebuild
+                await self.load(full=full)
+                if full:
+                    next_rebuild = loop.time() + settings.REVOCATION_REBUILD_SECONDS
+            except Exception:
+                log.exception("token revocation reload failed")
+
+    def stats(self) -> dict:
+        return {
+            "entries": self._bloom.count,
+            "capacity": self._bloom.capacity,
+            "filter_bytes": len(self._bloom._bits),
+            "reloads": self.reloads,
+            "confirmations": self.confirmations,
+            "false_positives": self.false_positives,
+        }
+
+
+revocations = RevocationList()
+
+
+async def revoke(key: str, user_id: str, expires_at: datetime, reason: str, db: AsyncSession):
+    """Record a revoked jti or family. Does not commit."""
+    await db.execute(
+        insert(RevokedToken)
+        .values(key=key, user_id=user_id, expires_at=expires_at, reason=reason)
+        .on_conflict_do_nothing(index_elements=[RevokedToken.key])
+    )
+    revocations.add(key)
+
+
+async def revoke_family(family: str, user_id: str, reason: str, db: AsyncSession):
+    # no token of a family outlives the newest refresh token minted for it
+    expires_at = datetime.now(UTC) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    await revoke(family, user_id, expires_at, reason, db)
+
+
+async def rotate_refresh_token(claims: dict, db: AsyncSession) -> bool:
+    """Spend a refresh token: record its jti so it cannot be used again. Returns False when
+    the token may not be used; a replay after REFRESH_REUSE_GRACE_SECONDS is treated as
+    theft and revokes the whole family. Does not commit."""
+    jti, family, user_id = claims["jti"], claims["fam"], claims["sub"]
+    if await revocations.is_revoked(family):
+        return False
+    expires_at = datetime.fromtimestamp(claims["exp"], UTC)
+    spent = await db.scalar(
+        insert(RevokedToken)
+        .values(key=jti, user_id=user_id, expires_at=expires_at, reason="rotated")
+        .on_conflict_do_nothing(index_elements=[RevokedToken.key])
+        .returning(RevokedToken.key)
+    )
+    revocations.add(jti)
+    if spent is not None:
+        return True
+    grace = timedelta(seconds=settings.REFRESH_REUSE_GRACE_SECONDS)
+    revoked_at = await db.scalar(select(RevokedToken.revoked_at).where(RevokedToken.key == jti))
+    if revoked_at is not None and revoked_at >= datetime.now(UTC) - grace:
+        return True
+    await revoke_family(family, user_id, "reuse", db)
+    return False
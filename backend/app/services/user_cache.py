@@ -0,0 +1,64 @@
+import time
+
+from jose import JWTError, jwt
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import TTLCache
+from app.config import get_settings
+from app.models.user import User
+from app.services.token_revocation import revocations
+
+settings = get_settings()
+
+_users = TTLCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS)
+_tokens = TTLCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS)
+
+
+async def user_id_from_token(token: str) -> str | None:
+    """Decode an access token to its subject, remembering the result until the token expires.
+    Tokens of a revoked family are refused; that check is a Bloom filter lookup, not a query."""
+    claims = _tokens.get(token) if settings.TOKEN_CACHE_ENABLED else None
+    if claims is None:
+        try:
+            payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+        except JWTError:
+            return None
+        if payload.get("typ", "access") != "access":
+            return None  # refresh tokens only work on /auth/refresh
+        claims = (payload.get("sub"), payload.get("fam"))
+        if claims[0] and settings.TOKEN_CACHE_ENABLED and "exp" in payload:
+            _tokens.set(token, claims, ttl=payload["exp"] - time.time())
+    user_id, family = claims
+    if family and await revocations.is_revoked(family):
+        return None
+    return user_id
+
+
+async def load_user(user_id: str, db: AsyncSession) -> User | None:
+    """Return the User for user_id, served from memory for hot users.
+
+    Cached instances are detached from any session: read their attributes, don't add them to one.
+    """
+    if settings.USER_CACHE_ENABLED and (user := _users.get(user_id)):
+        return user
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if user and settings.USER_CACHE_ENABLED:
+        _users.set(user_id, user)
+    return user
+
+
+def invalidate_user(user_id: str):
+    _users.pop(user_id)
+
+
+def cache_stats() -> dict:
+    return {"users": _users.stats(), "tokens": _tokens.stats()}
+
+
+# Any ORM-level profile change or deletion drops the cached copy. Bulk Core UPDATE/DELETE
+# statements bypass these hooks and must call invalidate_user() themselves.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target: User):
+    invalidate_user(target.id)
@@ -0,0 +1,60 @@
+"""Shared helpers for the benchmark scripts.
+
+Run them from backend/ with `python -m benchmarks.<name>`.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import uuid
+
+import httpx
+
+BASE_URL = os.environ.get("BENCH_BASE_URL", "http://localhost:8000")
+
+
+def base_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser
+
+
+def percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None}
+    if len(samples) == 1:
+        return {"p50": samples[0], "p95": samples[0], "p99": samples[0]}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98]}
+
+
+def snapshot_body(session_id: str) -> dict:
+    score = random.uniform(30, 100)
+    return {
+        "session_id": session_id,
+        "posture_score": score,
+        "posture_state": "good" if score >= 70 else "bad",
+        "neck_angle": random.uniform(120, 180),
+        "shoulder_tilt": random.uniform(60, 100),
+        "spine_angle": random.uniform(0, 25),
+    }
+
+
+async def login_new_user(client: httpx.AsyncClient) -> str:
+    """Register a throwaway user; auth cookies stay on the client. Returns the user id."""
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    r = await client.post("/auth/register", json={"email": email, "password": "bench-password"})
+    r.raise_for_status()
+    return r.json()["id"]
+
+
+def write_report(report: dict, output: str | None):
+    text = json.dumps(report, indent=2, default=str)
+    if output:
+        with open(output, "w") as fh:
+            fh.write(text)
+    else:
+        sys.stdout.write(text + "\n")
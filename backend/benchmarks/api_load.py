@@ -0,0 +1,212 @@
+"""Throughput and p50/p95/p99 latency of the API hot paths at a fixed concurrency.
+
+Start the server with the fake Gemini client, then drive it:
+
+    python -m benchmarks.serve --port 8000 &
+    python -m benchmarks.api_load --users 16 --requests 1000 --output results.json
+
+Each virtual user registers its own account and gets --history-sessions completed sessions
+(with snapshots and alerts) seeded straight into DATABASE_URL, so listings and stats run
+against realistic volumes. Scenarios run one after another; their accounts are deleted at
+the end unless --keep is given.
+"""
+import asyncio
+import random
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+import httpx
+from sqlalchemy import text
+
+from app.database import engine
+from benchmarks._common import base_parser, login_new_user, percentiles, snapshot_body, write_report
+
+_SEED_SQL = """
+INSERT INTO sessions (id, user_id, started_at, ended_at, duration_seconds, avg_posture_score,
+                      good_posture_percent, total_alerts, status)
+SELECT u || '-h' || s, u, now() - make_interval(days => s),
+       now() - make_interval(days => s) + make_interval(secs => :snapshots * 5),
+       :snapshots * 5, 50 + random() * 50, random() * 100, :alerts, 'completed'
+FROM unnest(CAST(:ids AS text[])) u, generate_series(1, :sessions) s;
+
+INSERT INTO snapshots (id, session_id, user_id, captured_at, posture_score, posture_state,
+                       neck_angle, shoulder_tilt, spine_angle)
+SELECT gen_random_uuid()::text, u || '-h' || s, u,
+       now() - make_interval(days => s) + make_interval(secs => n * 5),
+       random() * 100, (ARRAY['good', 'bad', 'risky'])[1 + floor(random() * 3)::int],
+       120 + random() * 60, 60 + random() * 40, random() * 25
+FROM unnest(CAST(:ids AS text[])) u, generate_series(1, :sessions) s,
+     generate_series(1, :snapshots) n;
+
+INSERT INTO alerts (id, session_id, user_id, triggered_at, last_triggered_at, alert_type, message,
+                    acknowledged)
+SELECT gen_random_uuid()::text, u || '-h' || s, u,
+       now() - make_interval(days => s) + make_interval(secs => n * 60),
+       now() - make_interval(days => s) + make_interval(secs => n * 60),
+       (ARRAY['neck', 'shoulder', 'spine', 'break_reminder'])[1 + floor(random() * 4)::int],
+       'seeded', false
+FROM unnest(CAST(:ids AS text[])) u, generate_series(1, :sessions) s,
+     generate_series(1, :alerts) n;
+
+INSERT INTO user_stats (user_id, total_sessions, total_seconds, score_sum, scored_sessions)
+SELECT user_id, count(*), sum(duration_seconds), sum(avg_posture_score), count(*)
+FROM sessions WHERE user_id = ANY(CAST(:ids AS text[])) AND status = 'completed' GROUP BY user_id
+ON CONFLICT (user_id) DO UPDATE SET total_sessions = excluded.total_sessions,
+    total_seconds = excluded.total_seconds, score_sum = excluded.score_sum,
+    scored_sessions = excluded.scored_sessions, updated_at = now();
+
+ANALYZE sessions, snapshots, alerts, user_stats
+"""
+
+
+@dataclass
+class VirtualUser:
+    client: httpx.AsyncClient
+    user_id: str = ""
+    session_id: str = ""
+    samples: dict[str, list[float]] = field(default_factory=dict)
+
+    async def timed(self, method: str, url: str, **kwargs) -> tuple[float, int]:
+        start = time.perf_counter()
+        r = await self.client.request(method, url, **kwargs)
+        return (time.perf_counter() - start) * 1000, r.status_code
+
+
+def _insights_body(session_id: str) -> dict:
+    # varied so every request misses the insights cache and reaches the (fake) model
+    return {
+        "session_id": session_id,
+        "duration_seconds": random.randint(60, 7200),
+        "avg_posture_score": round(random.uniform(30, 100), 2),
+        "good_posture_percent": round(random.uniform(0, 100), 2),
+        "total_alerts": random.randint(0, 50),
+    }
+
+
+async def _session_end(vu: VirtualUser) -> tuple[float, int]:
+    session_id = (await vu.client.post("/sessions")).json()["id"]
+    batch = {"snapshots": [snapshot_body(session_id) for _ in range(20)]}
+    (await vu.client.post("/snapshots/batch", json=batch)).raise_for_status()
+    return await vu.timed("POST", f"/sessions/{session_id}/end", json={})
+
+
+Scenario = Callable[[VirtualUser], Awaitable[tuple[float, int]]]
+
+SCENARIOS: dict[str, Scenario] = {
+    "create_snapshot": lambda vu: vu.timed("POST", "/snapshots", json=snapshot_body(vu.session_id)),
+    "create_alert": lambda vu: vu.timed(
+        "POST", "/alerts",
+        json={"session_id": vu.session_id, "alert_type": "neck", "message": "benchmark"},
+    ),
+    "acknowledge_alerts": lambda vu: vu.timed(
+        "POST", "/alerts/acknowledge", json={"session_id": vu.session_id}
+    ),
+    "end_session": _session_end,
+    "list_sessions": lambda vu: vu.timed("GET", "/sessions", params={"limit": 20}),
+    "list_snapshots": lambda vu: vu.timed("GET", "/snapshots", params={"limit": 100}),
+    "list_alerts": lambda vu: vu.timed("GET", "/alerts", params={"limit": 50}),
+    "session_stats": lambda vu: vu.timed("GET", f"/sessions/{vu.user_id}-h1/stats"),
+    "gamification": lambda vu: vu.timed("GET", "/gamification"),
+    "insights": lambda vu: vu.timed(
+        "POST", "/insights", params={"engine": "gemini"}, json=_insights_body(vu.session_id)
+    ),
+}
+
+
+async def _run(name: str, users: list[VirtualUser], requests: int, warmup: int) -> dict:
+    scenario = SCENARIOS[name]
+    for vu in users[: max(warmup, 0)]:
+        await scenario(vu)
+
+    remaining = requests
+    samples: list[float] = []
+    statuses: Counter[int] = Counter()
+
+    async def drive(vu: VirtualUser):
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            ms, status = await scenario(vu)
+            samples.append(ms)
+            statuses[status] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(drive(vu) for vu in users))
+    wall = time.perf_counter() - start
+    errors = sum(n for status, n in statuses.items() if status >= 400)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "statuses": dict(statuses),
+        "seconds": round(wall, 3),
+        "rps": round(len(samples) / wall, 1) if wall else None,
+        "mean_ms": round(sum(samples) / len(samples), 3) if samples else None,
+        **{
+            k: round(v, 3) if v is not None else None
+            for k, v in percentiles(sorted(samples)).items()
+        },
+    }
+
+
+async def _seed(user_ids: list[str], sessions: int, snapshots: int, alerts: int):
+    params = {"ids": user_ids, "sessions": sessions, "snapshots": snapshots, "alerts": alerts}
+    async with engine.begin() as conn:
+        for statement in filter(str.strip, _SEED_SQL.split(";")):
+            await conn.execute(text(statement), params)
+
+
+async def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--users", type=int, default=16, help="virtual users, i.e. concurrency")
+    parser.add_argument("--requests", type=int, default=500, help="per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="unrecorded requests per scenario")
+    parser.add_argument(
+        "--scenarios", default=",".join(SCENARIOS), help="comma-separated subset, in order"
+    )
+    parser.add_argument("--history-sessions", type=int, default=50)
+    parser.add_argument("--history-snapshots", type=int, default=100, help="per seeded session")
+    parser.add_argument("--history-alerts", type=int, default=5, help="per seeded session")
+    parser.add_argument(
+        "--keep", action="store_true", help="leave the benchmark accounts in the database"
+    )
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()]
+    if unknown := [n for n in names if n not in SCENARIOS]:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    limits = httpx.Limits(max_connections=args.users)
+    users = [
+        VirtualUser(httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits))
+        for _ in range(args.users)
+    ]
+    try:
+        for vu in users:
+            vu.user_id = await login_new_user(vu.client)
+            vu.session_id = (await vu.client.post("/sessions")).json()["id"]
+        if args.history_sessions > 0:
+            await _seed(
+                [vu.user_id for vu in users],
+                args.history_sessions, args.history_snapshots, args.history_alerts,
+            )
+
+        results = {}
+        for name in names:
+            results[name] = await _run(name, users, args.requests, args.warmup)
+    finally:
+        for vu in users:
+            await vu.client.aclose()
+        if not args.keep:
+            async with engine.begin() as conn:
+                await conn.execute(text("DELETE FROM users WHERE id = ANY(CAST(:ids AS text[]))"),
+                                   {"ids": [vu.user_id for vu in users if vu.user_id]})
+        await engine.dispose()
+
+    config = {k: v for k, v in vars(args).items() if k not in ("output",)}
+    write_report({"config": config, "scenarios": results}, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
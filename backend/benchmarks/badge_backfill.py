@@ -0,0 +1,96 @@
+"""Set-based badge backfill over a seeded history versus evaluating the rules per user.
+
+Talks to DATABASE_URL directly, not the API. Seeds --users x --sessions-per-user completed
+sessions (1M by default) plus matching streaks and user_stats inside a transaction, runs
+backfill_badges over every user, times the per-user statements for a sample of users, and
+rolls everything back.
+"""
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import engine, init_db
+from app.services.badge_rules import BADGES, award_badges, backfill_badges
+from benchmarks._common import base_parser, write_report
+
+_SEED_SQL = """
+INSERT INTO users (id, email, hashed_password)
+SELECT 'bench-badge-' || u, 'bench-badge-' || u || '@example.com', 'x'
+FROM generate_series(1, :users) u;
+
+INSERT INTO sessions (id, user_id, started_at, ended_at, duration_seconds, avg_posture_score,
+                      good_posture_percent, total_alerts, status)
+SELECT 'bench-badge-' || u || '-' || s, 'bench-badge-' || u,
+       now() - make_interval(days => s),
+       now() - make_interval(days => s) + interval '30 minutes',
+       1800, 50 + random() * 50,
+       CASE WHEN random() < 0.01 THEN 100 ELSE random() * 100 END, 0, 'completed'
+FROM generate_series(1, :users) u, generate_series(1, :sessions) s;
+
+INSERT INTO streaks (id, user_id, current_streak, longest_streak, last_active_date)
+SELECT gen_random_uuid()::text, 'bench-badge-' || u, 1, floor(random() * 40)::int, current_date - 1
+FROM generate_series(1, :users) u;
+
+INSERT INTO user_stats (user_id, total_sessions, total_seconds, score_sum, scored_sessions)
+SELECT user_id, count(*), sum(duration_seconds), sum(avg_posture_score), count(*)
+FROM sessions WHERE user_id LIKE 'bench-badge-%' GROUP BY user_id;
+"""
+
+
+async def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--sessions-per-user", type=int, default=100)
+    parser.add_argument(
+        "--loop-sample", type=int, default=200, help="users timed with per-user statements"
+    )
+    args = parser.parse_args()
+
+    await init_db()
+    async with engine.connect() as conn:
+        tx = await conn.begin()
+        db = AsyncSession(bind=conn)
+        try:
+            start = time.perf_counter()
+            params = {"users": args.users, "sessions": args.sessions_per_user}
+            for statement in filter(str.strip, _SEED_SQL.split(";")):
+                await conn.execute(text(statement), params)
+            await conn.execute(text("ANALYZE sessions, streaks, user_stats, badges"))
+            seed_seconds = time.perf_counter() - start
+
+            # per-user evaluation of every rule, one statement per user, on a fresh sample
+            sample = [f"bench-badge-{u}" for u in range(1, min(args.loop_sample, args.users) + 1)]
+            await conn.execute(text("SAVEPOINT loop"))
+            start = time.perf_counter()
+            for user_id in sample:
+                await db.execute(award_badges(BADGES, user_id))
+            loop_seconds = time.perf_counter() - start
+            await conn.execute(text("ROLLBACK TO SAVEPOINT loop"))
+
+            start = time.perf_counter()
+            awarded = await backfill_badges(db)
+            backfill_seconds = time.perf_counter() - start
+        finally:
+            await db.close()
+            await tx.rollback()
+
+    per_user = loop_seconds / len(sample) if sample else None
+    report = {
+        "users": args.users,
+        "sessions": args.users * args.sessions_per_user,
+        "seed_seconds": round(seed_seconds, 2),
+        "backfill_seconds": round(backfill_seconds, 3),
+        "awarded": awarded,
+        "per_user_loop": {
+            "sample_users": len(sample),
+            "ms_per_user": round(per_user * 1000, 3) if sample else None,
+            "projected_seconds": round(per_user * args.users, 2) if sample else None,
+        },
+    }
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+"""Streaming export throughput and memory for one user with a long history.
+
+Talks to DATABASE_URL directly, not the API. Seeds one user with --snapshots snapshots
+(2M by default) spread over sessions of --snapshots-per-session, plus one alert per
+--snapshots-per-alert, inside a transaction; streams the export of each resource in every
+format, with and without gzip, and rolls everything back. Reports MB/s, rows/s and the
+process's peak RSS after each run: with a constant-memory export the peak should stay put
+as the formats go by. --buffered finally loads the snapshots with one plain .all() for
+comparison, which raises the peak by the size of the whole result.
+"""
+import asyncio
+import resource
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import engine, init_db
+from app.services.export_service import export_chunks, export_query, parquet_available
+from benchmarks._common import base_parser, write_report
+
+USER_ID = "bench-export"  # also spelled out in _SEED_SQL
+
+_SEED_SQL = """
+INSERT INTO users (id, email, hashed_password)
+VALUES ('bench-export', 'bench-export@example.com', 'x');
+
+INSERT INTO sessions (id, user_id, started_at, ended_at, duration_seconds, avg_posture_score,
+                      good_posture_percent, total_alerts, status)
+SELECT 'bench-export-' || s, 'bench-export',
+       now() - make_interval(hours => s),
+       now() - make_interval(hours => s) + make_interval(secs => :per_session),
+       :per_session, 50 + random() * 50, random() * 100, :per_session / :per_alert, 'completed'
+FROM generate_series(1, ceil(CAST(:snapshots AS float) / :per_session)::int) s;
+
+INSERT INTO snapshots (id, session_id, user_id, captured_at, posture_score, posture_state,
+                       neck_angle, shoulder_tilt, spine_angle)
+SELECT gen_random_uuid()::text, 'bench-export-' || (n / :per_session + 1), 'bench-export',
+       now() - make_interval(hours => n / :per_session + 1)
+             + make_interval(secs => n % :per_session),
+       random() * 100, (ARRAY['good', 'bad', 'risky'])[1 + floor(random() * 3)::int],
+       120 + random() * 60, 60 + random() * 40, random() * 25
+FROM generate_series(0, :snapshots - 1) n;
+
+INSERT INTO alerts (id, session_id, user_id, triggered_at, alert_type, message, acknowledged)
+SELECT gen_random_uuid()::text, session_id, user_id, captured_at,
+       (ARRAY['neck', 'shoulder', 'spine', 'break_reminder'])[1 + floor(random() * 4)::int],
+       'Posture needs attention', random() < 0.5
+FROM snapshots WHERE user_id = 'bench-export' AND random() < 1.0 / :per_alert;
+
+ANALYZE sessions, snapshots, alerts
+"""
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+async def _run(db: AsyncSession, res: str, fmt: str, gzip: bool, rows: int) -> dict:
+    start = time.perf_counter()
+    size = 0
+    async for chunk in export_chunks(res, fmt, USER_ID, db, gzip):
+        size += len(chunk)
+    seconds = time.perf_counter() - start
+    return {
+        "resource": res,
+        "format": fmt,
+        "gzip": gzip,
+        "rows": rows,
+        "mb": round(size / 1e6, 1),
+        "seconds": round(seconds, 2),
+        "mb_per_second": round(size / 1e6 / seconds, 1),
+        "rows_per_second": round(rows / seconds),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+async def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--snapshots", type=int, default=2_000_000)
+    parser.add_argument("--snapshots-per-session", type=int, default=1_800)
+    parser.add_argument("--snapshots-per-alert", type=int, default=50)
+    parser.add_argument("--resources", nargs="+", default=["sessions", "snapshots", "alerts"])
+    parser.add_argument("--formats", nargs="+", default=["ndjson", "csv", "parquet"])
+    parser.add_argument(
+        "--buffered", action="store_true", help="also load the snapshots in one .all()"
+    )
+    args = parser.parse_args()
+    formats = [f for f in args.formats if f != "parquet" or parquet_available()]
+
+    await init_db()
+    async with engine.connect() as conn:
+        tx = await conn.begin()
+        db = AsyncSession(bind=conn)
+        try:
+            start = time.perf_counter()
+            params = {"snapshots": args.snapshots, "per_session": args.snapshots_per_session,
+                      "per_alert": args.snapshots_per_alert}
+            for statement in filter(str.strip, _SEED_SQL.split(";")):
+                await conn.execute(text(statement), params)
+            seed_seconds = time.perf_counter() - start
+            count = "SELECT count(*) FROM {} WHERE user_id = :user"
+            counts = {
+                res: await conn.scalar(text(count.format(res)), {"user": USER_ID})
+                for res in args.resources
+            }
+            baseline_rss = _peak_rss_mb()
+
+            runs = []
+            for res in args.resources:
+                for fmt in formats:
+                    for gzip in (False, True):
+                        runs.append(await _run(db, res, fmt, gzip, counts[res]))
+
+            buffered = None
+            if args.buffered:
+                start = time.perf_counter()
+                rows = len((await db.execute(export_query("snapshots", USER_ID))).all())
+                buffered = {
+                    "rows": rows,
+                    "seconds": round(time.perf_counter() - start, 2),
+                    "peak_rss_mb": round(_peak_rss_mb(), 1),
+                }
+        finally:
+            await db.close()
+            await tx.rollback()
+
+    write_report({
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "base_url")},
+        "parquet": parquet_available(),
+        "seed_seconds": round(seed_seconds, 2),
+        "rows": counts,
+        "peak_rss_mb_before_exports": round(baseline_rss, 1),
+        "runs": runs,
+        "buffered_snapshots": buffered,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
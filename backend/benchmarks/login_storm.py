@@ -0,0 +1,84 @@
+"""p50/p95/p99 of POST /snapshots on its own and while a burst of logins runs alongside it."""
+import asyncio
+import time
+import uuid
+
+import httpx
+
+from benchmarks._common import base_parser, login_new_user, percentiles, write_report
+
+
+async def _snapshot_latencies(
+    client: httpx.AsyncClient, session_id: str, n: int, concurrency: int
+) -> list[float]:
+    sem = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+
+    async def post_one():
+        async with sem:
+            start = time.perf_counter()
+            snapshot = {"session_id": session_id, "posture_score": 80, "posture_state": "good"}
+            r = await client.post("/snapshots", json=snapshot)
+            samples.append((time.perf_counter() - start) * 1000)
+            r.raise_for_status()
+
+    await asyncio.gather(*(post_one() for _ in range(n)))
+    return samples
+
+
+async def _login_storm(
+    base_url: str, email: str, password: str, logins: int, concurrency: int
+) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    statuses: dict[int, int] = {}
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        async def login_once():
+            async with sem:
+                r = await client.post("/auth/login", json={"email": email, "password": password})
+                statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+        await asyncio.gather(*(login_once() for _ in range(logins)))
+    return statuses
+
+
+async def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--snapshots", type=int, default=1000)
+    parser.add_argument("--snapshot-concurrency", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=500)
+    parser.add_argument("--login-concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        await login_new_user(client)
+        session_id = (await client.post("/sessions")).json()["id"]
+
+        # a second account for the storm so its cookies don't disturb the ingest client
+        email, password = f"storm-{uuid.uuid4().hex[:12]}@example.com", "storm-password"
+        async with httpx.AsyncClient(base_url=args.base_url) as c:
+            r = await c.post("/auth/register", json={"email": email, "password": password})
+            r.raise_for_status()
+
+        ingest = (client, session_id, args.snapshots, args.snapshot_concurrency)
+        baseline = await _snapshot_latencies(*ingest)
+        storm = asyncio.create_task(
+            _login_storm(args.base_url, email, password, args.logins, args.login_concurrency)
+        )
+        during = await _snapshot_latencies(*ingest)
+        login_statuses = await storm
+
+    write_report(
+        {
+            "snapshot_ms": {
+                "baseline": percentiles(baseline),
+                "during_login_storm": percentiles(during),
+            },
+            "login_statuses": login_statuses,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
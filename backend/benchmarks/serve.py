@@ -0,0 +1,48 @@
+"""Run the API for load tests with Gemini replaced by a fake of fixed latency.
+
+    python -m benchmarks.serve --port 8000 --gemini-latency-ms 400
+
+Everything else (database, caches, workers) is the real app configured from the environment.
+"""
+import argparse
+import asyncio
+import random
+
+import uvicorn
+
+from app.main import app
+from app.services.insights_service import insights_cache
+
+_INSIGHTS = [
+    {"type": "success", "title": "Benchmark", "message": "Fake insight for load testing."},
+    {"type": "tip", "title": "Benchmark", "message": "Fake insight for load testing."},
+    {"type": "warning", "title": "Benchmark", "message": "Fake insight for load testing."},
+]
+
+
+def fake_gemini(latency_ms: float, error_rate: float):
+    async def generate(stats: dict) -> list[dict]:
+        await asyncio.sleep(latency_ms / 1000 * random.uniform(0.8, 1.2))
+        if random.random() < error_rate:
+            raise RuntimeError("fake Gemini error")
+        return _INSIGHTS
+
+    return generate
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--gemini-latency-ms", type=float, default=400)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    insights_cache.generate = fake_gemini(args.gemini_latency_ms, args.gemini_error_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Rows/sec of POST /snapshots (one row per request) vs POST /snapshots/batch."""
+import asyncio
+import time
+
+import httpx
+
+from benchmarks._common import base_parser, login_new_user, snapshot_body, write_report
+
+
+async def _single(client: httpx.AsyncClient, session_id: str, rows: int, concurrency: int) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def post_one():
+        async with sem:
+            (await client.post("/snapshots", json=snapshot_body(session_id))).raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(post_one() for _ in range(rows)))
+    return time.perf_counter() - start
+
+
+async def _batch(client: httpx.AsyncClient, session_id: str, rows: int, batch_size: int) -> float:
+    start = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        n = min(batch_size, rows - offset)
+        body = {"snapshots": [snapshot_body(session_id) for _ in range(n)]}
+        (await client.post("/snapshots/batch", json=body)).raise_for_status()
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        await login_new_user(client)
+        session_id = (await client.post("/sessions")).json()["id"]
+
+        single = await _single(client, session_id, args.rows, args.concurrency)
+        batch = await _batch(client, session_id, args.rows, args.batch_size)
+
+    write_report(
+        {
+            "rows": args.rows,
+            "single": {
+                "seconds": single,
+                "rows_per_sec": args.rows / single,
+                "concurrency": args.concurrency,
+            },
+            "batch": {
+                "seconds": batch,
+                "rows_per_sec": args.rows / batch,
+                "batch_size": args.batch_size,
+            },
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
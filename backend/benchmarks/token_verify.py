@@ -0,0 +1,75 @@
+"""Access tokens verified per second with the revocation check, in-process.
+
+No server or database is involved: the revocation filter is filled with --revoked random
+families, and the tokens checked all belong to live families, as on the common path.
+Reports verifications per second with the token cache off (a JWT decode per request) and
+on, the cost of the Bloom lookup alone, and the filter's measured false-positive rate
+(each false positive would cost one confirming query).
+"""
+import asyncio
+import time
+import uuid
+
+from app.services import user_cache
+from app.services.auth_service import create_access_token, new_token_family
+from app.services.token_revocation import BloomFilter, revocations
+from app.services.user_cache import user_id_from_token
+from benchmarks._common import base_parser, write_report
+
+
+async def _verify_rate(tokens: list[str], rounds: int, cache: bool) -> float:
+    user_cache.settings.TOKEN_CACHE_ENABLED = cache
+    user_cache._tokens.clear()
+    for token in tokens:  # warm the cache (or the decoder) once
+        await user_id_from_token(token)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for token in tokens:
+            if await user_id_from_token(token) is None:
+                raise RuntimeError("live token rejected")
+    return rounds * len(tokens) / (time.perf_counter() - start)
+
+
+def _bloom_rate(bloom: BloomFilter, keys: list[str]) -> tuple[float, float]:
+    start = time.perf_counter()
+    hits = sum(key in bloom for key in keys)
+    return len(keys) / (time.perf_counter() - start), hits / len(keys)
+
+
+async def main():
+    parser = base_parser(__doc__)
+    parser.add_argument(
+        "--revoked", type=int, default=100_000, help="revoked families in the filter"
+    )
+    parser.add_argument("--tokens", type=int, default=1_000, help="distinct live access tokens")
+    parser.add_argument(
+        "--rounds", type=int, default=20, help="passes over the tokens per measurement"
+    )
+    parser.add_argument(
+        "--probes", type=int, default=200_000, help="unrevoked keys probed for false positives"
+    )
+    args = parser.parse_args()
+
+    for _ in range(args.revoked):
+        revocations.add(uuid.uuid4().hex)
+    tokens = [
+        create_access_token(str(uuid.uuid4()), new_token_family()) for _ in range(args.tokens)
+    ]
+    probes = [uuid.uuid4().hex for _ in range(args.probes)]
+    lookups_per_second, fp_rate = _bloom_rate(revocations._bloom, probes)
+
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "base_url")}
+    uncached = await _verify_rate(tokens, max(1, args.rounds // 10), cache=False)
+    cached = await _verify_rate(tokens, args.rounds, cache=True)
+    write_report({
+        "config": config,
+        "filter": revocations.stats(),
+        "verify_per_second_uncached": round(uncached),
+        "verify_per_second_cached": round(cached),
+        "bloom_lookups_per_second": round(lookups_per_second),
+        "bloom_false_positive_rate": fp_rate,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+"""Award badges retroactively, e.g. after adding a rule to BADGES:
+
+    python -m scripts.backfill_badges                       # every rule
+    python -m scripts.backfill_badges --badge perfect_session --badge hours_10
+    python -m scripts.backfill_badges --dry-run             # report counts, roll back
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from app.database import AsyncSessionLocal, engine, init_db
+from app.services.badge_rules import backfill_badges
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--badge", action="append", dest="badges", help="badge key; repeat for several"
+    )
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        try:
+            awarded = await backfill_badges(db, args.badges)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 2
+        if args.dry_run:
+            await db.rollback()
+        else:
+            await db.commit()
+    await engine.dispose()
+
+    seconds = round(time.perf_counter() - start, 3)
+    report = {"awarded": awarded, "dry_run": args.dry_run, "seconds": seconds}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
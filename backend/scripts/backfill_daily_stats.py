@@ -0,0 +1,48 @@
+"""Rebuild daily_user_stats from sessions and alerts, e.g. after migrating to it:
+
+    python -m scripts.backfill_daily_stats                           # every day
+    python -m scripts.backfill_daily_stats --from 2025-01-01 --to 2025-01-31
+    python -m scripts.backfill_daily_stats --dry-run                 # report counts, roll back
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import date
+
+from app.database import AsyncSessionLocal, engine, init_db
+from app.services.daily_stats import rebuild_daily_stats
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    day = date.fromisoformat
+    parser.add_argument("--from", dest="start", type=day, help="first UTC day to rebuild")
+    parser.add_argument("--to", dest="end", type=day, help="last UTC day to rebuild")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    if args.start and args.end and args.end < args.start:
+        print("--to is before --from", file=sys.stderr)
+        return 2
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        rows = await rebuild_daily_stats(db, args.start, args.end)
+        if args.dry_run:
+            await db.rollback()
+        else:
+            await db.commit()
+    await engine.dispose()
+
+    seconds = round(time.perf_counter() - start, 3)
+    report = {"rows": rows, "dry_run": args.dry_run, "seconds": seconds}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,155 @@
+"""Fail when a hot router query falls back to a sequential scan.
+
+Runs EXPLAIN on the statements the routers issue, built from the same helpers, against
+DATABASE_URL. The planner only prefers indexes once tables hold realistic volumes, so
+point it at a seeded database or pass --seed to generate one (rolled back afterwards):
+
+    python -m scripts.check_query_plans --seed
+"""
+import argparse
+import asyncio
+import sys
+from datetime import UTC, datetime
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.database import engine, init_db
+from app.models.alert import PostureAlert
+from app.models.session import PostureSession
+from app.models.snapshot import PostureSnapshot
+from app.pagination import encode_cursor, keyset_page
+from app.services.series_service import series_filters, series_query
+from app.services.session_service import session_stats_query
+
+WATCHED_TABLES = {"users", "sessions", "snapshots", "alerts", "streaks", "badges"}
+
+_SEED_SQL = """
+INSERT INTO users (id, email, hashed_password)
+SELECT 'plan-user-' || u, 'plan-user-' || u || '@example.com', 'x'
+FROM generate_series(1, :users) u;
+
+INSERT INTO sessions (id, user_id, started_at, total_alerts, status)
+SELECT 'plan-session-' || u || '-' || s, 'plan-user-' || u,
+       now() - make_interval(days => s), 0, 'completed'
+FROM generate_series(1, :users) u, generate_series(1, :sessions) s;
+
+INSERT INTO snapshots (id, session_id, user_id, captured_at, posture_score, posture_state,
+                       neck_angle, shoulder_tilt, spine_angle)
+SELECT gen_random_uuid()::text, 'plan-session-' || u || '-' || s, 'plan-user-' || u,
+       now() - make_interval(days => s) + make_interval(secs => n * 5),
+       random() * 100, (ARRAY['good', 'bad', 'risky'])[1 + floor(random() * 3)::int],
+       random() * 40, random() * 10, random() * 25
+FROM generate_series(1, :users) u, generate_series(1, :sessions) s,
+     generate_series(1, :snapshots) n;
+
+INSERT INTO alerts (id, session_id, user_id, triggered_at, alert_type, message, acknowledged)
+SELECT gen_random_uuid()::text, 'plan-session-' || u || '-' || s, 'plan-user-' || u,
+       now() - make_interval(days => s) + make_interval(secs => n * 60),
+       (ARRAY['neck', 'shoulder', 'spine', 'break_reminder'])[1 + floor(random() * 4)::int],
+       'seeded', false
+FROM generate_series(1, :users) u, generate_series(1, :sessions) s,
+     generate_series(1, :alerts) n;
+"""
+
+
+async def seed(conn: AsyncConnection, users: int, sessions: int, snapshots: int, alerts: int):
+    params = {"users": users, "sessions": sessions, "snapshots": snapshots, "alerts": alerts}
+    for statement in filter(str.strip, _SEED_SQL.split(";")):
+        await conn.execute(text(statement), params)
+    await conn.execute(text("ANALYZE"))
+
+
+def hot_queries(user_id: str, session_id: str) -> dict:
+    cursor = encode_cursor(datetime.now(UTC), "~")
+    snap_user = select(PostureSnapshot).where(PostureSnapshot.user_id == user_id)
+    alert_user = select(PostureAlert).where(PostureAlert.user_id == user_id)
+    return {
+        "session ownership": select(PostureSession).where(
+            PostureSession.id == session_id, PostureSession.user_id == user_id
+        ),
+        "list_sessions": keyset_page(
+            select(PostureSession).where(PostureSession.user_id == user_id),
+            PostureSession.started_at, PostureSession.id, cursor, 20,
+        ),
+        "total_sessions": (
+            select(func.count())
+            .select_from(PostureSession)
+            .where(PostureSession.user_id == user_id)
+        ),
+        "list_snapshots": keyset_page(
+            snap_user, PostureSnapshot.captured_at, PostureSnapshot.id, cursor, 100
+        ),
+        "list_snapshots by session": keyset_page(
+            snap_user.where(PostureSnapshot.session_id == session_id),
+            PostureSnapshot.captured_at, PostureSnapshot.id, cursor, 100,
+        ),
+        "list_alerts": keyset_page(
+            alert_user, PostureAlert.triggered_at, PostureAlert.id, cursor, 50
+        ),
+        "list_alerts by session": keyset_page(
+            alert_user.where(PostureAlert.session_id == session_id),
+            PostureAlert.triggered_at, PostureAlert.id, cursor, 50,
+        ),
+        "session stats": session_stats_query(session_id),
+        "snapshot series": series_query(60, series_filters(user_id, session_id, None, None)),
+    }
+
+
+def seq_scans(node: dict) -> list[str]:
+    found = []
+    if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in WATCHED_TABLES:
+        found.append(node["Relation Name"])
+    for child in node.get("Plans", []):
+        found += seq_scans(child)
+    return found
+
+
+async def explain(conn: AsyncConnection, stmt) -> dict:
+    compiled = stmt.compile(dialect=conn.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + compiled.string, params)
+    return result.scalar_one()[0]["Plan"]
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--seed", action="store_true", help="insert synthetic plan-user-* rows first"
+    )
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=30)
+    parser.add_argument("--snapshots", type=int, default=100, help="per session")
+    parser.add_argument("--alerts", type=int, default=10, help="per session")
+    args = parser.parse_args()
+
+    await init_db()
+    failures = 0
+    async with engine.begin() as conn:
+        if args.seed:
+            await seed(conn, args.users, args.sessions, args.snapshots, args.alerts)
+        user_id, session_id = (
+            await conn.execute(
+                select(PostureSession.user_id, PostureSession.id)
+                .order_by(PostureSession.started_at.desc())
+                .limit(1)
+            )
+        ).one()
+
+        for name, stmt in hot_queries(user_id, session_id).items():
+            plan = await explain(conn, stmt)
+            scans = seq_scans(plan)
+            status = f"SEQ SCAN on {', '.join(scans)}" if scans else "ok"
+            print(f"{name:28} {plan['Node Type']:18} {status}")
+            failures += bool(scans)
+        if args.seed:
+            await conn.rollback()
+
+    await engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
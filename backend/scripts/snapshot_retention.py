@@ -0,0 +1,48 @@
+"""Snapshot partitioning and retention. Meant to run from cron, e.g. daily:
+
+    python -m scripts.snapshot_retention run            # uses SNAPSHOT_RETENTION_DAYS
+    python -m scripts.snapshot_retention run --days 90
+    python -m scripts.snapshot_retention partition      # one-off: convert snapshots to partitioned
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import UTC, datetime, timedelta
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal, engine, init_db
+from app.services.retention_service import convert_to_partitioned, ensure_partitions, run_retention
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser(
+        "run", help="roll up and purge raw snapshots older than the retention window"
+    )
+    run.add_argument("--days", type=int, default=get_settings().SNAPSHOT_RETENTION_DAYS)
+    sub.add_parser("partition", help="rebuild snapshots as a range-partitioned table")
+    args = parser.parse_args()
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        if args.command == "partition":
+            await convert_to_partitioned(db)
+            await ensure_partitions(db)
+            await db.commit()
+            report = {"partitioned": True}
+        elif args.days <= 0:
+            report = {"skipped": "retention disabled (SNAPSHOT_RETENTION_DAYS=0)"}
+        else:
+            report = await run_retention(db, datetime.now(UTC) - timedelta(days=args.days))
+    await engine.dispose()
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,105 @@
+"""Shared fixtures.
+
+Database tests run against DATABASE_URL (from the environment or .env), or TEST_DATABASE_URL
+when set. The schema is migrated to head once per run and every test works inside a
+transaction that is rolled back, so a local development database is fine. When Postgres
+cannot be reached those tests are skipped; the pure-logic ones still run.
+"""
+import asyncio
+import os
+import uuid
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+
+import pytest
+
+if url := os.environ.get("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = url
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+from sqlalchemy import delete, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.database import AsyncSessionLocal, _upgrade_to_head, engine  # noqa: E402
+from app.models.session import PostureSession  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+async def _migrate() -> str | None:
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:  # refused, no such database, bad credentials...
+        return f"Postgres at DATABASE_URL is not reachable: {e}"
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(_upgrade_to_head)
+    finally:
+        await engine.dispose()
+    return None
+
+
+@pytest.fixture(scope="session")
+def migrated():
+    if (reason := asyncio.run(_migrate())) is not None:
+        pytest.skip(reason)
+
+
+@pytest.fixture
+async def db(migrated):
+    """An AsyncSession in a transaction that is rolled back after the test; commits inside
+    the test only release savepoints."""
+    async with engine.connect() as conn:
+        tx = await conn.begin()
+        session = AsyncSession(
+            bind=conn, expire_on_commit=False, join_transaction_mode="create_savepoint"
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await tx.rollback()
+    # connections belong to this test's event loop
+    await engine.dispose()
+
+
+@pytest.fixture
+async def posture_session(db) -> PostureSession:
+    """A fresh user with one active session, started 2024-01-01 09:00 UTC."""
+    user = User(id=str(uuid.uuid4()), email=f"{uuid.uuid4()}@example.com", hashed_password="x")
+    session = PostureSession(
+        id=str(uuid.uuid4()), user_id=user.id, started_at=datetime(2024, 1, 1, 9, tzinfo=UTC)
+    )
+    db.add(user)
+    await db.flush()
+    db.add(session)
+    await db.flush()
+    return session
+
+
+@pytest.fixture
+async def committed_session(migrated) -> AsyncIterator[PostureSession]:
+    """Like posture_session, but committed so that several connections see it; for tests of
+    concurrent requests. The user and everything hanging off it are deleted afterwards."""
+    user = User(id=str(uuid.uuid4()), email=f"{uuid.uuid4()}@example.com", hashed_password="x")
+    session = PostureSession(
+        id=str(uuid.uuid4()), user_id=user.id, started_at=datetime(2024, 1, 1, 9, tzinfo=UTC)
+    )
+    async with AsyncSessionLocal() as db:
+        db.add(user)
+        await db.flush()
+        db.add(session)
+        await db.commit()
+    try:
+        yield session
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.commit()
+        await engine.dispose()
@@ -0,0 +1,90 @@
+"""Alert coalescing, bulk acknowledgement and the acknowledge request's validation."""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select, update
+
+from app.models.alert import PostureAlert
+from app.schemas.alert import AlertAcknowledgeRequest, AlertCreate
+from app.services import alert_service
+from app.services.alert_service import acknowledge_alerts, coalesce_alert
+
+
+@pytest.mark.parametrize(
+    "body",
+    [{"ids": ["a1"]}, {"session_id": "s1"}, {"before": "2024-01-01T00:00:00Z"}],
+)
+def test_acknowledge_request_takes_any_filter(body):
+    AlertAcknowledgeRequest(**body)
+
+
+@pytest.mark.parametrize("body", [{}, {"ids": []}, {"ids": ["a"] * 1001}])
+def test_acknowledge_request_refuses_to_match_everything(body):
+    with pytest.raises(ValidationError):
+        AlertAcknowledgeRequest(**body)
+
+
+@pytest.fixture
+def coalesce_window(monkeypatch):
+    monkeypatch.setattr(alert_service.settings, "ALERT_COALESCE_SECONDS", 60)
+
+
+def _alert(session, alert_type="neck", message="Neck angle too steep") -> AlertCreate:
+    return AlertCreate(session_id=session.id, alert_type=alert_type, message=message)
+
+
+@pytest.mark.anyio
+async def test_repeats_fold_into_the_open_alert(db, posture_session, coalesce_window):
+    first = await coalesce_alert(posture_session.user_id, _alert(posture_session), db)
+    again = await coalesce_alert(
+        posture_session.user_id, _alert(posture_session, message="Still too steep"), db, repeats=3
+    )
+    other = await coalesce_alert(posture_session.user_id, _alert(posture_session, "spine"), db)
+
+    assert again.id == first.id
+    assert (again.repeat_count, again.message) == (4, "Still too steep")
+    assert other.id != first.id and other.repeat_count == 1
+
+
+@pytest.mark.anyio
+async def test_acknowledged_or_stale_alerts_are_not_reopened(db, posture_session, coalesce_window):
+    user = posture_session.user_id
+    first = await coalesce_alert(user, _alert(posture_session), db)
+    await acknowledge_alerts(user, db, ids=[first.id])
+    second = await coalesce_alert(user, _alert(posture_session), db)
+    assert second.id != first.id
+
+    await db.execute(
+        update(PostureAlert)
+        .where(PostureAlert.id == second.id)
+        .values(last_triggered_at=datetime.now(UTC) - timedelta(minutes=5))
+    )
+    third = await coalesce_alert(user, _alert(posture_session), db)
+    assert third.id not in (first.id, second.id)
+
+
+@pytest.mark.anyio
+async def test_acknowledge_filters_combine(db, posture_session):
+    user = posture_session.user_id
+    now = datetime.now(UTC)
+    alerts = [
+        PostureAlert(session_id=posture_session.id, user_id=user, alert_type="neck", message="m",
+                     last_triggered_at=now - timedelta(minutes=m))
+        for m in (30, 20, 10)
+    ]
+    db.add_all(alerts)
+    await db.flush()
+
+    acked = await acknowledge_alerts(user, db, session_id=posture_session.id,
+                                     before=now - timedelta(minutes=15))
+    assert sorted(acked) == sorted(a.id for a in alerts[:2])
+    assert await acknowledge_alerts(user, db, ids=[alerts[0].id]) == []  # already acknowledged
+    assert await acknowledge_alerts("someone-else", db, ids=[alerts[2].id]) == []
+
+    still_open = await db.scalars(
+        select(PostureAlert.id).where(
+            PostureAlert.session_id == posture_session.id, PostureAlert.acknowledged.is_(False)
+        )
+    )
+    assert still_open.all() == [alerts[2].id]
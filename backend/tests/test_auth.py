@@ -0,0 +1,47 @@
+"""Registration when the email is taken, before or during the password hash."""
+import uuid
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import func, insert, select
+
+from app.models.user import User
+from app.routers import auth
+from app.schemas.auth import RegisterRequest
+
+pytestmark = pytest.mark.anyio
+
+
+def _request() -> RegisterRequest:
+    return RegisterRequest(email=f"{uuid.uuid4()}@example.com", password="correct horse")
+
+
+async def _register(body: RegisterRequest, db):
+    with pytest.raises(HTTPException) as exc:
+        await auth.register(body, Response(), db)
+    return exc.value
+
+
+async def test_a_taken_email_is_refused(db, posture_session):
+    owner = await db.get(User, posture_session.user_id)
+    body = _request().model_copy(update={"email": owner.email})
+
+    error = await _register(body, db)
+    assert (error.status_code, error.detail) == (409, "Email already registered")
+
+
+async def test_an_email_taken_during_the_hash_is_refused(db, monkeypatch):
+    body = _request()
+
+    async def racing_hash(password: str) -> str:
+        # another request registers the same email while this one hashes
+        await db.execute(insert(User).values(id=str(uuid.uuid4()), email=body.email,
+                                             hashed_password="x"))
+        await db.commit()
+        return "hashed"
+
+    monkeypatch.setattr(auth, "hash_password_async", racing_hash)
+
+    error = await _register(body, db)
+    assert (error.status_code, error.detail) == (409, "Email already registered")
+    assert await db.scalar(select(func.count()).where(User.email == body.email)) == 1
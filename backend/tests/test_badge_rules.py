@@ -0,0 +1,105 @@
+"""Badge rules compiled to SQL: thresholds, session filters, sources and the backfill."""
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import literal, select
+
+from app.models.gamification import UserBadge, UserStats
+from app.models.session import PostureSession
+from app.models.user import User
+from app.services.badge_rules import BadgeDefinition, backfill_badges, earned_by
+
+pytestmark = pytest.mark.anyio
+
+TWO_GOOD = BadgeDefinition("two_good", "Two Good", "sessions", 2, {"good_posture_percent": 80})
+
+
+async def _completed(db, user_id: str, good: float, days_ago: int = 0):
+    started = datetime(2024, 1, 10, 9, tzinfo=UTC) - timedelta(days=days_ago)
+    db.add(PostureSession(
+        id=str(uuid.uuid4()), user_id=user_id, started_at=started, status="completed",
+        ended_at=started + timedelta(minutes=30), duration_seconds=1800,
+        avg_posture_score=good, good_posture_percent=good,
+    ))
+    await db.flush()
+
+
+async def _user(db) -> str:
+    user = User(id=str(uuid.uuid4()), email=f"{uuid.uuid4()}@example.com", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    return user.id
+
+
+async def _earners(db, rule: BadgeDefinition, user_id: str | None = None, **kw) -> list:
+    return (await db.execute(earned_by(rule, user_id, **kw))).all()
+
+
+async def test_where_filters_the_sessions_a_rule_counts(db, posture_session):
+    user = posture_session.user_id
+    await _completed(db, user, 90)
+    assert await _earners(db, TWO_GOOD, user) == []
+
+    await _completed(db, user, 50)  # below the filter: still one qualifying session
+    assert await _earners(db, TWO_GOOD, user) == []
+
+    await _completed(db, user, 85)
+    assert await _earners(db, TWO_GOOD, user) == [(user, "two_good")]
+
+
+async def test_a_user_id_limits_the_rule_to_that_user(db, posture_session):
+    other = await _user(db)
+    for user in (posture_session.user_id, other):
+        await _completed(db, user, 90)
+        await _completed(db, user, 95)
+
+    assert await _earners(db, TWO_GOOD, other) == [(other, "two_good")]
+    everyone = {row[0] for row in await _earners(db, TWO_GOOD)}
+    assert {posture_session.user_id, other} <= everyone
+
+
+async def test_active_days_count_distinct_days(db, posture_session):
+    user = posture_session.user_id
+    rule = BadgeDefinition("good_days_2", "Two Good Days", "active_days", 2,
+                           {"good_posture_percent": 80})
+    await _completed(db, user, 90)
+    await _completed(db, user, 90)  # same day
+    assert await _earners(db, rule, user) == []
+
+    await _completed(db, user, 90, days_ago=1)
+    assert await _earners(db, rule, user) == [(user, "good_days_2")]
+
+
+async def test_sources_replace_the_metric_query(db, posture_session):
+    user = posture_session.user_id
+    rule = BadgeDefinition("hours_1", "One Hour", "hours_tracked", 1)
+    assert await _earners(db, rule, user) == []  # no user_stats row yet
+
+    hours = {"hours_tracked": select(literal(user), literal(1.5))}
+    assert await _earners(db, rule, user, sources=hours) == [(user, "hours_1")]
+
+
+def test_where_is_refused_on_other_metrics():
+    rule = BadgeDefinition("odd", "Odd", "streak_days", 3, {"good_posture_percent": 80})
+    with pytest.raises(ValueError, match="only applies to session metrics"):
+        earned_by(rule)
+
+
+async def test_backfill_awards_each_badge_once(db, posture_session):
+    user = posture_session.user_id
+    await _completed(db, user, 100)
+
+    awarded = await backfill_badges(db, ["first_session", "perfect_session"])
+    assert awarded["first_session"] >= 1 and awarded["perfect_session"] >= 1
+    assert await backfill_badges(db, ["first_session", "perfect_session"]) == {}
+
+    held = await db.scalars(select(UserBadge.badge_key).where(UserBadge.user_id == user))
+    assert sorted(held.all()) == ["first_session", "perfect_session"]
+    stats = await db.get(UserStats, user)
+    assert stats.badge_count == 2
+
+
+async def test_backfill_refuses_unknown_badges(db):
+    with pytest.raises(ValueError, match="unknown badges: nope"):
+        await backfill_badges(db, ["first_session", "nope"])
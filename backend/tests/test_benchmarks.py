@@ -0,0 +1,67 @@
+"""The load-test harness: percentile maths, the fake Gemini, scenario runs and the seed SQL."""
+import time
+
+import pytest
+from sqlalchemy import func, select, text
+
+from app.models.session import PostureSession
+from benchmarks import api_load
+from benchmarks._common import percentiles
+from benchmarks.serve import fake_gemini
+
+
+def test_percentiles():
+    samples = [float(n) for n in range(1, 101)]
+    assert percentiles(samples) == {"p50": 50.5, "p95": 95.05, "p99": 99.01}
+    assert percentiles([7.0]) == {"p50": 7.0, "p95": 7.0, "p99": 7.0}
+    assert percentiles([]) == {"p50": None, "p95": None, "p99": None}
+
+
+@pytest.mark.anyio
+async def test_fake_gemini_answers_after_its_latency():
+    generate = fake_gemini(latency_ms=50, error_rate=0)
+    start = time.perf_counter()
+    insights = await generate({})
+    assert time.perf_counter() - start >= 0.04  # 50ms minus the 20% jitter
+    assert {i["type"] for i in insights} == {"success", "tip", "warning"}
+
+
+@pytest.mark.anyio
+async def test_fake_gemini_fails_at_its_error_rate():
+    with pytest.raises(RuntimeError):
+        await fake_gemini(latency_ms=0, error_rate=1)({})
+
+
+@pytest.mark.anyio
+async def test_a_run_makes_exactly_the_requested_number_of_requests(monkeypatch):
+    calls = []
+
+    async def scenario(vu):
+        calls.append(vu)
+        return 2.0, 500 if len(calls) % 4 == 0 else 200
+
+    monkeypatch.setitem(api_load.SCENARIOS, "fake", scenario)
+    users = [object(), object(), object()]
+
+    report = await api_load._run("fake", users, requests=20, warmup=2)
+
+    assert len(calls) == 22  # warmup requests are made but not recorded
+    assert (report["requests"], report["errors"]) == (20, 5)
+    assert report["statuses"] == {200: 15, 500: 5}
+    assert report["mean_ms"] == report["p50"] == report["p99"] == 2.0
+
+
+@pytest.mark.anyio
+async def test_seed_sql_matches_the_schema(db, posture_session):
+    params = {"ids": [posture_session.user_id], "sessions": 3, "snapshots": 4, "alerts": 2}
+    conn = await db.connection()
+    for statement in filter(str.strip, api_load._SEED_SQL.split(";")):
+        await conn.execute(text(statement), params)
+
+    seeded = await db.scalar(
+        select(func.count()).where(
+            PostureSession.user_id == posture_session.user_id,
+            PostureSession.status == "completed",
+        )
+    )
+    assert seeded == 3
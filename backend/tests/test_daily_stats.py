@@ -0,0 +1,145 @@
+"""Folding sessions into daily_user_stats, rebuilding it, reading it back, and its day."""
+import uuid
+from datetime import UTC, date, datetime, time, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.models.alert import PostureAlert
+from app.models.gamification import UserStreak
+from app.models.session import PostureSession
+from app.models.user import User
+from app.routers.sessions import end_session
+from app.schemas.session import EndSessionRequest
+from app.services.daily_stats import daily_stats, fold_session, rebuild_daily_stats
+
+pytestmark = pytest.mark.anyio
+
+DAY = date(2024, 1, 1)
+
+
+async def _completed(db, user_id: str, started_at: datetime, seconds: int, score, good,
+                     alerts: dict[str, int] | None = None) -> PostureSession:
+    session = PostureSession(
+        id=str(uuid.uuid4()), user_id=user_id, started_at=started_at,
+        ended_at=started_at + timedelta(seconds=seconds), duration_seconds=seconds,
+        avg_posture_score=score, good_posture_percent=good, status="completed",
+        total_alerts=sum((alerts or {}).values()),
+    )
+    db.add(session)
+    await db.flush()
+    for alert_type, repeats in (alerts or {}).items():
+        db.add(PostureAlert(
+            session_id=session.id, user_id=user_id, alert_type=alert_type, message="test",
+            repeat_count=repeats,
+        ))
+    await db.flush()
+    return session
+
+
+async def _fold(db, session: PostureSession):
+    await db.execute(fold_session(session))
+
+
+async def test_fold_weights_averages_by_duration(db, posture_session):
+    user = posture_session.user_id
+    morning = datetime(2024, 1, 1, 9, tzinfo=UTC)
+    await _fold(db, await _completed(db, user, morning, 600, 90.0, 80.0, {"neck": 3, "spine": 1}))
+    afternoon = morning.replace(hour=14)
+    await _fold(db, await _completed(db, user, afternoon, 1800, 50.0, 20.0, {"neck": 2}))
+    # no score or good percent: adds time and alerts, but not to the averages
+    await _fold(db, await _completed(db, user, morning.replace(hour=18), 300, None, None,
+                                     {"break_reminder": 1, "other": 4}))
+
+    [day] = await daily_stats(user, DAY, DAY, db)
+
+    assert (day.day, day.sessions, day.tracked_seconds) == (DAY, 3, 2700)
+    assert day.avg_posture_score == pytest.approx((90 * 600 + 50 * 1800) / 2400)  # 60
+    assert day.good_posture_percent == pytest.approx((80 * 600 + 20 * 1800) / 2400)  # 35
+    assert day.total_alerts == 11
+    assert day.alerts_by_type == {"neck": 5, "shoulder": 0, "spine": 1, "break_reminder": 1}
+
+
+async def test_fold_uses_the_utc_start_date(db, posture_session):
+    # 23:30 in New York on 1 January is 04:30 UTC on 2 January
+    new_york = timezone(timedelta(hours=-5))
+    started = datetime(2024, 1, 1, 23, 30, tzinfo=new_york)
+    await _fold(db, await _completed(db, posture_session.user_id, started, 60, 70.0, 50.0))
+
+    days = await daily_stats(posture_session.user_id, DAY, DAY + timedelta(days=1), db)
+    assert [d.day for d in days] == [date(2024, 1, 2)]
+
+
+async def test_rebuild_matches_folding(db, posture_session):
+    user = posture_session.user_id
+    start = datetime(2024, 1, 1, 9, tzinfo=UTC)
+    sessions = [
+        await _completed(db, user, start, 600, 90.0, 80.0, {"neck": 3}),
+        await _completed(db, user, start + timedelta(hours=5), 1200, 40.0, None, {"shoulder": 1}),
+        await _completed(db, user, start + timedelta(days=1), 300, 75.0, 60.0),
+    ]
+    for session in sessions:
+        await _fold(db, session)
+    folded = await daily_stats(user, DAY, DAY + timedelta(days=1), db)
+
+    await rebuild_daily_stats(db, DAY, DAY + timedelta(days=1))
+
+    assert await daily_stats(user, DAY, DAY + timedelta(days=1), db) == folded
+    assert [d.sessions for d in folded] == [2, 1]
+
+
+async def test_zero_duration_days_average_by_session(db, posture_session):
+    user = posture_session.user_id
+    start = datetime(2024, 1, 1, 9, tzinfo=UTC)
+    for score, good in [(80.0, 60.0), (60.0, None)]:
+        await _fold(db, await _completed(db, user, start, 0, score, good))
+
+    [day] = await daily_stats(user, DAY, DAY, db)
+    assert (day.avg_posture_score, day.good_posture_percent) == (70.0, 60.0)
+
+    await rebuild_daily_stats(db, DAY, DAY)
+    assert await daily_stats(user, DAY, DAY, db) == [day]
+
+
+async def test_a_session_ended_twice_is_folded_once(db, posture_session):
+    body = EndSessionRequest(avg_posture_score=75.0, good_posture_percent=50.0)
+    user = User(id=posture_session.user_id)
+    await end_session(posture_session.id, body, db, user)
+    with pytest.raises(HTTPException):
+        await end_session(posture_session.id, body, db, user)
+
+    [day] = await daily_stats(user.id, DAY, DAY, db)
+    assert day.sessions == 1
+
+
+async def test_the_streak_uses_the_daily_rows_utc_day(db, posture_session):
+    # started 23:30 UTC yesterday, ended after midnight: both count it under yesterday
+    today = datetime.now(UTC).date()
+    yesterday = today - timedelta(days=1)
+    late = PostureSession(
+        id=str(uuid.uuid4()), user_id=posture_session.user_id,
+        started_at=datetime.combine(yesterday, time(23, 30), UTC),
+    )
+    db.add(late)
+    await db.flush()
+    await end_session(late.id, EndSessionRequest(), db, User(id=late.user_id))
+
+    streak = await db.scalar(select(UserStreak).where(UserStreak.user_id == late.user_id))
+    [day] = await daily_stats(late.user_id, yesterday, today, db)
+    assert streak.last_active_date == day.day == yesterday
+
+
+async def test_an_earlier_session_ending_late_keeps_the_streak(db, posture_session):
+    today = datetime.now(UTC).date()
+    db.add(UserStreak(user_id=posture_session.user_id, current_streak=5, longest_streak=5,
+                      last_active_date=today))
+    await db.flush()
+    # posture_session started in 2024
+    await end_session(posture_session.id, EndSessionRequest(), db,
+                      User(id=posture_session.user_id))
+
+    streak = await db.scalar(
+        select(UserStreak).where(UserStreak.user_id == posture_session.user_id)
+    )
+    assert (streak.current_streak, streak.last_active_date) == (5, today)
@@ -0,0 +1,54 @@
+"""Streamed history exports in each format."""
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from app.services import export_service
+from app.services.export_service import export_chunks
+
+pytestmark = pytest.mark.anyio
+
+
+async def _export(db, user_id: str, fmt: str, compress: bool = False) -> bytes:
+    chunks = export_chunks("sessions", fmt, user_id, db, compress)
+    return b"".join([chunk async for chunk in chunks])
+
+
+async def test_ndjson_has_one_object_per_row(db, posture_session):
+    lines = (await _export(db, posture_session.user_id, "ndjson")).splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert [r["id"] for r in rows] == [posture_session.id]
+    assert rows[0]["started_at"].startswith("2024-01-01T09:00:00")
+
+
+async def test_csv_uses_the_response_field_names(db, posture_session):
+    body = await _export(db, posture_session.user_id, "csv")
+    rows = list(csv.reader(io.StringIO(body.decode())))
+    assert rows[0] == [
+        "id", "user_id", "started_at", "ended_at", "duration_seconds",
+        "avg_posture_score", "good_posture_percent", "total_alerts", "status",
+    ]
+    assert rows[1][0] == posture_session.id
+    assert len(rows) == 2
+
+
+async def test_an_empty_history_is_a_header_only_csv(db, posture_session):
+    body = await _export(db, "no-such-user", "csv")
+    assert body.decode().splitlines()[0].startswith("id,user_id,")
+    assert len(body.decode().splitlines()) == 1
+
+
+async def test_gzip_wraps_the_same_bytes(db, posture_session):
+    plain = await _export(db, posture_session.user_id, "ndjson")
+    assert gzip.decompress(await _export(db, posture_session.user_id, "ndjson", True)) == plain
+
+
+async def test_parquet_round_trips(db, posture_session):
+    if not export_service.parquet_available():
+        pytest.skip("pyarrow is not installed")
+    body = await _export(db, posture_session.user_id, "parquet")
+    table = export_service.pq.read_table(io.BytesIO(body))
+    assert table.column("id").to_pylist() == [posture_session.id]
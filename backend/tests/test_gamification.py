@@ -0,0 +1,106 @@
+"""Lifetime stats kept at session end, and GET /gamification's ETag."""
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi import Request, Response
+from sqlalchemy import func, select, update
+
+from app.models.gamification import UserBadge, UserStats
+from app.models.session import PostureSession
+from app.models.user import User
+from app.routers.gamification import get_gamification
+from app.routers.sessions import end_session
+from app.schemas.gamification import GamificationResponse
+from app.schemas.session import EndSessionRequest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _end_new_session(db, user_id: str, minutes: int, score: float | None):
+    session = PostureSession(
+        id=str(uuid.uuid4()), user_id=user_id,
+        started_at=datetime.now(UTC) - timedelta(minutes=minutes),
+    )
+    db.add(session)
+    await db.flush()
+    body = EndSessionRequest(avg_posture_score=score, good_posture_percent=50.0)
+    await end_session(session.id, body, db, User(id=user_id))
+
+
+def _request(if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/gamification", "headers": headers})
+
+
+async def test_user_stats_match_a_recount(db, posture_session):
+    user_id = posture_session.user_id
+    for minutes, score in [(30, 80.0), (45, None), (10, 55.5)]:
+        await _end_new_session(db, user_id, minutes, score)
+
+    completed = PostureSession.status == "completed"
+    recount = (await db.execute(
+        select(
+            func.count(),
+            func.sum(PostureSession.duration_seconds),
+            func.sum(PostureSession.avg_posture_score),
+            func.count(PostureSession.avg_posture_score),
+        ).where(PostureSession.user_id == user_id, completed)
+    )).one()
+    badges = await db.scalar(select(func.count()).where(UserBadge.user_id == user_id))
+    stats = await db.get(UserStats, user_id)
+
+    assert (stats.total_sessions, stats.total_seconds, stats.scored_sessions) == (
+        recount[0], recount[1], recount[3]
+    )
+    assert stats.score_sum == pytest.approx(recount[2])
+    assert stats.badge_count == badges
+    # the still-active posture_session is not counted until it ends
+    assert stats.total_sessions == 3
+
+
+async def test_the_response_is_served_with_a_weak_etag(db, posture_session):
+    user = User(id=posture_session.user_id)
+    await _end_new_session(db, user.id, 20, 70.0)
+
+    response = Response()
+    body = await get_gamification(_request(), response, db, user)
+
+    assert isinstance(body, GamificationResponse)
+    assert body.stats.total_sessions == body.streak.total_sessions == 1
+    assert response.headers["ETag"].startswith('W/"')
+
+
+async def test_a_matching_etag_is_not_modified(db, posture_session):
+    user = User(id=posture_session.user_id)
+    await _end_new_session(db, user.id, 20, 70.0)
+    response = Response()
+    await get_gamification(_request(), response, db, user)
+    etag = response.headers["ETag"]
+
+    for header in (etag, f'W/"other", {etag}', "*"):
+        cached = await get_gamification(_request(header), Response(), db, user)
+        assert cached.status_code == 304
+        assert cached.headers["ETag"] == etag
+
+    fresh = await get_gamification(_request('W/"other"'), Response(), db, user)
+    assert isinstance(fresh, GamificationResponse)
+
+
+async def test_the_etag_changes_with_user_stats(db, posture_session):
+    user = User(id=posture_session.user_id)
+    await _end_new_session(db, user.id, 20, 70.0)
+    response = Response()
+    await get_gamification(_request(), response, db, user)
+    etag = response.headers["ETag"]
+
+    await db.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user.id)
+        .values(updated_at=datetime.now(UTC) + timedelta(seconds=1))
+    )
+
+    again = Response()
+    body = await get_gamification(_request(etag), again, db, user)
+    assert isinstance(body, GamificationResponse)
+    assert again.headers["ETag"] != etag
@@ -0,0 +1,114 @@
+"""Insights job runs: results, retries, the run timeout and the local fallback."""
+import asyncio
+
+import pytest
+
+from app.database import AsyncSessionLocal
+from app.models.insight import InsightCacheEntry, InsightJob
+from app.services import insight_jobs
+from app.services.insight_jobs import InsightsWorkerPool
+from app.services.insights_cache import InsightsCache, stats_hash
+
+pytestmark = pytest.mark.anyio
+
+INSIGHTS = [{"type": "tip", "title": "Breaks", "message": "Stand up every 30 minutes."}]
+STATS = {"duration_seconds": 600}
+
+
+async def _running_job(db, session, request: dict | None = None) -> InsightJob:
+    job = InsightJob(
+        user_id=session.user_id, session_id=session.id,
+        request=request or {"duration_seconds": 600},
+        status="running", attempts=1,
+    )
+    db.add(job)
+    await db.commit()
+    return job
+
+
+def _pool(generate) -> InsightsWorkerPool:
+    cache = InsightsCache(generate, maxsize=10, ttl=60)
+    return InsightsWorkerPool(cache, workers=0, max_concurrency=2, rate_per_second=0)
+
+
+async def test_a_finished_run_stores_the_result(db, posture_session):
+    async def generate(stats):
+        return INSIGHTS
+
+    job = await _running_job(db, posture_session)
+    pool = _pool(generate)
+    await pool._run(job, db)
+
+    await db.refresh(job)
+    assert (job.status, job.result, pool.completed) == ("done", INSIGHTS, 1)
+
+
+async def test_a_slow_run_is_requeued_before_it_goes_stale(db, posture_session, monkeypatch):
+    monkeypatch.setattr(insight_jobs.settings, "INSIGHTS_JOB_TIMEOUT_SECONDS", 0.1)
+    release = asyncio.Event()
+
+    async def generate(stats):
+        await release.wait()
+        return INSIGHTS
+
+    job = await _running_job(db, posture_session)
+    pool = _pool(generate)
+    await pool._run(job, db)
+
+    await db.refresh(job)
+    assert (job.status, job.error, pool.retried) == ("queued", "TimeoutError", 1)
+    # the model call carried on and answers the retry from the cache
+    release.set()
+    await asyncio.sleep(0.01)
+    assert await pool.insights.get(posture_session.id, job.request) == INSIGHTS
+
+
+async def test_a_local_fallback_is_not_counted_as_a_failure(db, posture_session, monkeypatch):
+    monkeypatch.setattr(insight_jobs.settings, "INSIGHTS_ENGINE", "auto")
+    monkeypatch.setattr(insight_jobs.settings, "INSIGHTS_JOB_MAX_ATTEMPTS", 1)
+
+    async def generate(stats):
+        raise RuntimeError("quota exceeded")
+
+    request = {"duration_seconds": 600, "avg_posture_score": 85.0, "good_posture_percent": 80.0,
+               "total_alerts": 0}
+    job = await _running_job(db, posture_session, request)
+    pool = _pool(generate)
+    await pool._run(job, db)
+
+    await db.refresh(job)
+    assert (job.status, job.error) == ("done", "quota exceeded")
+    assert job.result
+    assert (pool.failed, pool.fell_back) == (0, 1)
+
+
+async def test_the_worker_holds_no_transaction_during_the_model_call(committed_session):
+    seen = []
+    async with AsyncSessionLocal() as db:
+
+        async def generate(stats):
+            seen.append(db.in_transaction())
+            return INSIGHTS
+
+        job = await _running_job(db, committed_session)
+        pool = _pool(generate)
+        pool.insights.persist = True
+        await pool._run(job, db)
+        await db.refresh(job)
+
+    assert seen == [False]
+    assert (job.status, job.result) == ("done", INSIGHTS)
+
+
+async def test_a_persisted_result_is_found_without_a_db(committed_session):
+    async def generate(stats):
+        raise AssertionError("should come from insight_cache")
+
+    async with AsyncSessionLocal() as db:
+        db.add(InsightCacheEntry(
+            session_id=committed_session.id, stats_hash=stats_hash(STATS), insights=INSIGHTS
+        ))
+        await db.commit()
+
+    cache = InsightsCache(generate, maxsize=10, ttl=60, persist=True)
+    assert await cache.get(committed_session.id, STATS) == INSIGHTS
@@ -0,0 +1,100 @@
+"""InsightsCache coalescing, cancellation and failure handling (in memory, no database)."""
+import asyncio
+
+import pytest
+
+from app.services.insights_cache import InsightsCache
+
+pytestmark = pytest.mark.anyio
+
+STATS = {"duration_seconds": 600, "avg_posture_score": 72.5}
+INSIGHTS = [{"type": "tip", "title": "Breaks", "message": "Stand up every 30 minutes."}]
+
+
+class Generator:
+    """Counts calls and answers once `release` is set."""
+
+    def __init__(self, result=INSIGHTS):
+        self.calls = 0
+        self.result = result
+        self.release = asyncio.Event()
+
+    async def __call__(self, stats: dict):
+        self.calls += 1
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def _cache(generate) -> InsightsCache:
+    return InsightsCache(generate, maxsize=10, ttl=60)
+
+
+async def test_concurrent_requests_share_one_call():
+    generate = Generator()
+    cache = _cache(generate)
+    callers = [asyncio.create_task(cache.get("s1", STATS)) for _ in range(3)]
+    await asyncio.sleep(0)
+    generate.release.set()
+
+    assert await asyncio.gather(*callers) == [INSIGHTS] * 3
+    assert (generate.calls, cache.coalesced) == (1, 2)
+    assert await cache.get("s1", STATS) == INSIGHTS  # now from memory
+    assert generate.calls == 1
+    assert cache.stats()["inflight"] == 0
+
+
+async def test_cancelling_the_first_caller_does_not_cancel_the_others():
+    generate = Generator()
+    cache = _cache(generate)
+    leader = asyncio.create_task(cache.get("s1", STATS))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(cache.get("s1", STATS))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    generate.release.set()
+
+    assert await follower == INSIGHTS
+    assert leader.cancelled()
+    assert generate.calls == 1
+
+
+async def test_an_abandoned_call_still_fills_the_cache():
+    generate = Generator()
+    cache = _cache(generate)
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(cache.get("s1", STATS), 0.01)
+    generate.release.set()
+    await asyncio.sleep(0.01)
+
+    assert await cache.get("s1", STATS) == INSIGHTS
+    assert generate.calls == 1
+
+
+@pytest.mark.parametrize("result", [RuntimeError("model overloaded"), None])
+async def test_failures_reach_every_caller_and_are_not_cached(result):
+    generate = Generator(result)
+    cache = _cache(generate)
+    callers = [asyncio.create_task(cache.get("s1", STATS)) for _ in range(2)]
+    await asyncio.sleep(0)
+    generate.release.set()
+
+    outcomes = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(o, RuntimeError | ValueError) for o in outcomes)
+
+    generate.result = INSIGHTS
+    assert await cache.get("s1", STATS) == INSIGHTS
+    assert generate.calls == 2
+
+
+async def test_keys_differ_by_stats():
+    generate = Generator()
+    generate.release.set()
+    cache = _cache(generate)
+    await cache.get("s1", STATS)
+    await cache.get("s1", {**STATS, "avg_posture_score": 80})
+    await cache.get("s2", STATS)
+    assert generate.calls == 3
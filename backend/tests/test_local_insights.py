@@ -0,0 +1,34 @@
+"""The rule-based insights engine and how POST /insights routes to it."""
+import pytest
+from fastapi import HTTPException, Response
+
+from app.routers.insights import get_insights
+from app.schemas.insights import Insight, InsightsRequest
+from app.services.local_insights import MAX_INSIGHTS, MIN_INSIGHTS, local_insights
+
+GOOD = {"duration_seconds": 600, "avg_posture_score": 92.0, "good_posture_percent": 88.0,
+        "total_alerts": 0}
+POOR = {"duration_seconds": 3600, "avg_posture_score": 41.0, "good_posture_percent": 30.0,
+        "total_alerts": 12, "neck_alerts": 9, "shoulder_alerts": 1, "spine_alerts": 2,
+        "break_alerts": 1}
+
+
+@pytest.mark.parametrize("stats", [GOOD, POOR])
+def test_insights_have_the_gemini_shape(stats):
+    insights = local_insights(stats)
+    assert MIN_INSIGHTS <= len(insights) <= MAX_INSIGHTS
+    for insight in insights:
+        Insight(**insight)
+
+
+def test_the_worst_alert_type_gets_its_advice():
+    titles = [i["title"] for i in local_insights(POOR)]
+    assert titles[:3] == ["Low posture score", "Posture drifts", "Neck strain"]
+
+
+@pytest.mark.anyio
+async def test_the_local_engine_does_not_run_jobs():
+    body = InsightsRequest(session_id="s1", **GOOD)
+    with pytest.raises(HTTPException) as exc:
+        await get_insights(body, Response(), mode="job", engine="local", db=None, user=None)
+    assert exc.value.status_code == 400
@@ -0,0 +1,66 @@
+"""Prometheus exposition helpers and the request metrics middleware."""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from app import metrics
+from app.metrics import Histogram, RequestMetricsMiddleware, histogram_lines
+
+
+def test_histogram_lines_are_cumulative():
+    assert histogram_lines("wait_seconds", {"pool": "primary"}, (0.1, 1), [2, 0, 3], 7.5) == [
+        'wait_seconds_bucket{pool="primary",le="0.1"} 2',
+        'wait_seconds_bucket{pool="primary",le="1"} 2',
+        'wait_seconds_bucket{pool="primary",le="+Inf"} 5',
+        'wait_seconds_sum{pool="primary"} 7.5',
+        'wait_seconds_count{pool="primary"} 5',
+    ]
+
+
+def test_histogram_observe_puts_bounds_in_their_own_bucket():
+    h = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+    for value in (0.1, 0.5, 1, 3):
+        h.observe(value, route='/a"b')
+    assert h.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a\\"b",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a\\"b",le="1"} 3',
+        'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a\\"b"} 4.6',
+        'latency_seconds_count{route="/a\\"b"} 4',
+    ]
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware, slow_ms=100)
+
+    @app.get("/test-metrics/stream/{n}")
+    async def stream(n: int):
+        async def body():
+            for _ in range(n):
+                await asyncio.sleep(0.05)
+                metrics.current_request.get().queries += 1  # as the engine's cursor hook does
+                yield b"chunk\n"
+
+        return StreamingResponse(body())
+
+    return app
+
+
+@pytest.mark.anyio
+async def test_streamed_responses_are_measured_to_the_last_byte(caplog):
+    transport = httpx.ASGITransport(app=_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/test-metrics/stream/3")
+    assert response.text == "chunk\n" * 3
+
+    route = "/test-metrics/stream/{n}"
+    assert metrics.http_requests._sums[("GET", route, 200)] >= 0.15
+    assert metrics.db_queries_per_request._sums[(route,)] == 3
+    assert metrics.slow_requests._values[(route,)] == 1
+    assert "slow request GET /test-metrics/stream/{n}" in caplog.text
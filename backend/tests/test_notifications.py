@@ -0,0 +1,102 @@
+"""GET /notifications/stream: catch-up replay, live events through the hub, and how sent
+badges are flagged."""
+import orjson
+import pytest
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models.gamification import UserBadge
+from app.routers import notifications
+from app.services.gamification_service import badge_event
+from app.services.notifications import hub, notify_user
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def marks(monkeypatch) -> list[list[str]]:
+    """Every batch of keys the stream flags, in order; flagging itself still runs."""
+    calls: list[list[str]] = []
+    mark = notifications._mark_delivered
+
+    async def recording(user_id: str, keys: list[str]):
+        calls.append(list(keys))
+        await mark(user_id, keys)
+
+    monkeypatch.setattr(notifications, "_mark_delivered", recording)
+    monkeypatch.setattr(notifications.settings, "NOTIFY_HEARTBEAT_SECONDS", 0.05)
+    return calls
+
+
+def _event(chunk: bytes) -> tuple[str, dict]:
+    kind, data = chunk.decode().strip().split("\n")
+    return kind.removeprefix("event: "), orjson.loads(data.removeprefix("data: "))
+
+
+async def _earn(user_id: str, key: str, announce: bool = False):
+    async with AsyncSessionLocal() as db:
+        db.add(UserBadge(user_id=user_id, badge_key=key))
+        if announce:
+            await notify_user(db, user_id, "badge", badge_event(key))
+        await db.commit()
+
+
+async def _notified(user_id: str) -> dict[str, bool]:
+    async with AsyncSessionLocal() as db:
+        rows = await db.execute(
+            select(UserBadge.badge_key, UserBadge.notified).where(UserBadge.user_id == user_id)
+        )
+        return dict(rows.all())
+
+
+async def test_missed_and_live_badges_are_sent_then_flagged_together(committed_session, marks):
+    user_id = committed_session.user_id
+    await _earn(user_id, "first_session")  # earned while no stream was open
+
+    stream = notifications._events(user_id)
+    try:
+        assert _event(await anext(stream)) == ("badge", badge_event("first_session"))
+        assert hub.stats()["users"] >= 1
+
+        await _earn(user_id, "streak_3", announce=True)  # the hub hands it over on commit
+        assert _event(await anext(stream)) == ("badge", badge_event("streak_3"))
+        assert marks == []  # not flagged while the burst is still going out
+
+        assert await anext(stream) == b": keepalive\n\n"
+        assert marks == [["first_session", "streak_3"]]
+    finally:
+        await stream.aclose()
+
+    assert await _notified(user_id) == {"first_session": True, "streak_3": True}
+    assert user_id not in hub._subscribers
+
+
+async def test_an_unflagged_badge_is_sent_again_on_reconnect(committed_session, marks):
+    user_id = committed_session.user_id
+    await _earn(user_id, "first_session")
+
+    stream = notifications._events(user_id)
+    assert _event(await anext(stream))[0] == "badge"
+    await stream.aclose()  # the client left before the batch was flagged
+
+    stream = notifications._events(user_id)
+    try:
+        assert _event(await anext(stream)) == ("badge", badge_event("first_session"))
+        assert await anext(stream) == b": keepalive\n\n"
+    finally:
+        await stream.aclose()
+    assert marks == [["first_session"]]
+    assert await _notified(user_id) == {"first_session": True}
+
+
+async def test_other_events_pass_through_without_flagging(committed_session, marks):
+    user_id = committed_session.user_id
+    stream = notifications._events(user_id)
+    try:
+        assert await anext(stream) == b": keepalive\n\n"  # subscribed, nothing missed
+        hub.deliver(user_id, [{"type": "alert", "data": {"kind": "slouch"}}])
+        assert _event(await anext(stream)) == ("alert", {"kind": "slouch"})
+        assert await anext(stream) == b": keepalive\n\n"
+    finally:
+        await stream.aclose()
+    assert marks == []
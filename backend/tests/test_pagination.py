@@ -0,0 +1,88 @@
+"""Keyset pagination of the snapshot listing: ties on the timestamp and bad cursors."""
+import base64
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import orjson
+import pytest
+from fastapi import HTTPException, Response
+
+from app.models.snapshot import PostureSnapshot
+from app.models.user import User
+from app.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from app.routers.snapshots import list_snapshots
+
+pytestmark = pytest.mark.anyio
+
+T0 = datetime(2024, 1, 1, 9, 30, tzinfo=UTC)
+
+
+async def _snapshots(db, session, times: list[datetime]) -> list[str]:
+    ids = [str(uuid.uuid4()) for _ in times]
+    db.add_all(
+        PostureSnapshot(
+            id=row_id, session_id=session.id, user_id=session.user_id, captured_at=ts,
+            posture_score=80.0, posture_state="good",
+        )
+        for row_id, ts in zip(ids, times, strict=True)
+    )
+    await db.flush()
+    return ids
+
+
+async def _page(db, session, cursor: str | None, limit: int) -> tuple[list[str], str | None]:
+    response = Response()
+    body = await list_snapshots(
+        response, session_id=session.id, limit=limit, offset=0, cursor=cursor, fmt="json",
+        db=db, user=User(id=session.user_id),
+    )
+    return [row["id"] for row in orjson.loads(body.body)], response.headers.get(NEXT_CURSOR_HEADER)
+
+
+def _raw_cursor(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+async def test_pages_split_inside_a_run_of_equal_timestamps(db, posture_session):
+    # five rows share one timestamp, so a page boundary falls among them whatever the limit
+    times = [T0 + timedelta(seconds=1)] + [T0] * 5 + [T0 - timedelta(seconds=1)]
+    ids = await _snapshots(db, posture_session, times)
+    newest_first = [ids[0], *sorted(ids[1:6], reverse=True), ids[6]]
+
+    seen, cursor = [], None
+    for _ in range(len(ids)):
+        page, cursor = await _page(db, posture_session, cursor, limit=2)
+        seen += page
+        if cursor is None:
+            break
+
+    assert seen == newest_first
+
+
+async def test_the_last_full_page_leads_to_an_empty_one(db, posture_session):
+    await _snapshots(db, posture_session, [T0, T0])
+
+    page, cursor = await _page(db, posture_session, None, limit=2)
+    assert len(page) == 2 and cursor is not None
+    assert await _page(db, posture_session, cursor, limit=2) == ([], None)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    _raw_cursor(b"no separator"),
+    _raw_cursor(b"yesterday|" + b"x" * 8),
+    _raw_cursor(b"\xff\xfe|id"),
+    _raw_cursor(b"2024-01-01T09:30:00|id"),  # no offset: never produced by encode_cursor
+])
+async def test_a_bad_cursor_is_a_400(db, posture_session, cursor):
+    with pytest.raises(HTTPException) as exc:
+        await _page(db, posture_session, cursor, limit=2)
+    assert (exc.value.status_code, exc.value.detail) == (400, "Invalid cursor")
+
+
+async def test_a_cursor_for_another_position_only_moves_the_page(db, posture_session):
+    ids = await _snapshots(db, posture_session, [T0, T0 - timedelta(seconds=1)])
+
+    # a hand-edited but well-formed cursor is just a different starting point
+    page, _ = await _page(db, posture_session, encode_cursor(T0, "~"), limit=5)
+    assert page == [ids[0], ids[1]]
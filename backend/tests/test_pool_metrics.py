@@ -0,0 +1,49 @@
+"""InstrumentedPool's checkout, wait and timeout accounting, as reported by pool_stats."""
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import get_settings
+from app.database import InstrumentedPool, pool_stats
+
+pytestmark = pytest.mark.anyio
+
+settings = get_settings()
+
+
+@pytest.fixture
+async def tiny(migrated):
+    engine = create_async_engine(
+        settings.DATABASE_URL, poolclass=InstrumentedPool,
+        pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    yield engine
+    await engine.dispose()
+
+
+async def test_checkouts_and_waits_are_counted(tiny):
+    for _ in range(3):
+        async with tiny.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    stats = pool_stats(tiny)
+    assert (stats["checkouts"], stats["timeouts"], stats["checked_out"]) == (3, 0, 0)
+    assert sum(stats["wait_buckets"].values()) == 3
+    assert list(stats["wait_buckets"])[-1] == "+Inf"
+    assert 0 <= stats["wait_avg_ms"] <= stats["wait_max_ms"]
+
+
+async def test_an_exhausted_pool_times_out_and_counts_it(tiny):
+    async with tiny.connect() as held:
+        await held.execute(text("SELECT 1"))
+        assert pool_stats(tiny)["saturation"] == 1.0
+
+        with pytest.raises(exc.TimeoutError):
+            async with tiny.connect():
+                pass
+
+    stats = pool_stats(tiny)
+    assert (stats["checkouts"], stats["timeouts"]) == (2, 1)
+    # the failed checkout waited out pool_timeout, so it lands in a bucket above 50 ms
+    assert stats["wait_max_ms"] >= 50
+    assert sum(n for le, n in stats["wait_buckets"].items() if le in ("0.1", "0.5")) == 1
@@ -0,0 +1,18 @@
+"""The hot router queries must stay on their indexes (see scripts/check_query_plans.py)."""
+import pytest
+
+from scripts.check_query_plans import explain, hot_queries, seed, seq_scans
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_hot_queries_avoid_sequential_scans(db):
+    conn = await db.connection()
+    # enough rows that the planner prefers the indexes over scanning
+    await seed(conn, users=300, sessions=30, snapshots=10, alerts=3)
+
+    scanned = {}
+    for name, stmt in hot_queries("plan-user-1", "plan-session-1-1").items():
+        if tables := seq_scans(await explain(conn, stmt)):
+            scanned[name] = tables
+    assert scanned == {}
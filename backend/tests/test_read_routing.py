@@ -0,0 +1,98 @@
+"""Replica routing in get_read_db and the read-your-writes window behind it."""
+import time
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app import database, dependencies
+from app.cache import TTLCache
+from app.database import engine, wrote_recently
+from app.schemas.snapshot import SnapshotBatchItem
+from app.services import stream_service
+from app.services.stream_service import SessionStream
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def writers(monkeypatch) -> TTLCache:
+    recent = TTLCache(maxsize=100, ttl=60)
+    monkeypatch.setattr(database, "_recent_writers", recent)
+    return recent
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """Stands in for the replica: same database, sessions tagged so the test can tell."""
+    replica_sessions = async_sessionmaker(engine, info={"replica": True})
+    monkeypatch.setattr(dependencies, "ReplicaSessionLocal", replica_sessions)
+
+    async def user_id_from_token(token):
+        return token.removeprefix("token-")
+
+    monkeypatch.setattr(dependencies, "user_id_from_token", user_id_from_token)
+
+
+async def _read_session(access_token):
+    gen = dependencies.get_read_db(access_token)
+    session = await anext(gen)
+    await gen.aclose()
+    return session
+
+
+async def test_reads_use_the_primary_without_a_replica(monkeypatch, writers):
+    monkeypatch.setattr(dependencies, "ReplicaSessionLocal", None)
+    session = await _read_session("token-u1")
+    assert "replica" not in session.info
+
+
+async def test_reads_use_the_replica_unless_the_user_wrote_recently(replica, writers):
+    assert (await _read_session("token-u1")).info.get("replica")
+    assert (await _read_session(None)).info.get("replica")
+
+    writers.set("u1", True)
+    assert "replica" not in (await _read_session("token-u1")).info
+    assert (await _read_session("token-u2")).info.get("replica")  # only the writer is pinned
+
+
+async def test_the_read_your_writes_window_expires(monkeypatch):
+    monkeypatch.setattr(database, "_recent_writers", TTLCache(maxsize=100, ttl=0.05))
+    database._recent_writers.set("u1", True)
+    assert wrote_recently("u1")
+    time.sleep(0.06)
+    assert not wrote_recently("u1")
+
+
+async def test_commits_mark_the_user_only_after_a_write(db, posture_session, writers):
+    await db.commit()  # the fixture's inserts, before the session knew its user
+    db.info["user_id"] = posture_session.user_id
+    await db.commit()
+    assert not wrote_recently(posture_session.user_id)
+
+    posture_session.total_alerts = 1
+    await db.commit()
+    assert wrote_recently(posture_session.user_id)
+
+
+class _Socket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+async def test_stream_flush_marks_the_user(db, posture_session, writers, monkeypatch):
+    conn = await db.connection()
+    monkeypatch.setattr(
+        stream_service,
+        "AsyncSessionLocal",
+        async_sessionmaker(bind=conn, join_transaction_mode="create_savepoint"),
+    )
+    stream = SessionStream(_Socket(), posture_session.user_id, posture_session.id)
+    item = SnapshotBatchItem(session_id=posture_session.id, posture_score=80, posture_state="good")
+
+    await stream._flush([item], [])
+
+    assert stream.websocket.sent == [{"type": "ack", "snapshots": 1, "alerts": 0}]
+    assert wrote_recently(posture_session.user_id)
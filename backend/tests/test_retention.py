@@ -0,0 +1,140 @@
+"""Snapshot partition ranges, the per-minute rollup and the retention cutoff."""
+from datetime import UTC, date, datetime
+
+import pytest
+from sqlalchemy import select, text
+
+from app.models.rollup import SnapshotRollup
+from app.models.snapshot import PostureSnapshot
+from app.services import retention_service
+from app.services.retention_service import (
+    convert_to_partitioned,
+    ensure_partitions,
+    partition_ranges,
+    rollup_snapshots,
+    run_retention,
+)
+
+
+def at(minute: int, second: int = 0) -> datetime:
+    return datetime(2024, 1, 1, 10, minute, second, tzinfo=UTC)
+
+
+def test_partition_ranges_monthly():
+    assert partition_ranges(date(2024, 11, 15), date(2025, 1, 1), 1) == [
+        ("snapshots_p202411", date(2024, 11, 1), date(2024, 12, 1)),
+        ("snapshots_p202412", date(2024, 12, 1), date(2025, 1, 1)),
+        ("snapshots_p202501", date(2025, 1, 1), date(2025, 2, 1)),
+    ]
+
+
+def test_partition_ranges_align_blocks_to_the_year():
+    # quarters start in January, April, July and October whatever the start date
+    assert partition_ranges(date(2024, 5, 20), date(2024, 10, 1), 3) == [
+        ("snapshots_p202404", date(2024, 4, 1), date(2024, 7, 1)),
+        ("snapshots_p202407", date(2024, 7, 1), date(2024, 10, 1)),
+        ("snapshots_p202410", date(2024, 10, 1), date(2025, 1, 1)),
+    ]
+
+
+def test_partition_ranges_empty_when_start_is_after_end():
+    assert partition_ranges(date(2024, 3, 1), date(2024, 1, 1), 1) == []
+
+
+def _snapshot(session, captured_at: datetime, score: float, state: str, neck=None):
+    return PostureSnapshot(
+        session_id=session.id, user_id=session.user_id, captured_at=captured_at,
+        posture_score=score, posture_state=state, neck_angle=neck,
+    )
+
+
+@pytest.mark.anyio
+async def test_rollup_aggregates_per_minute(db, posture_session):
+    db.add_all([
+        _snapshot(posture_session, at(0, 5), 90, "good", neck=10),
+        _snapshot(posture_session, at(0, 35), 50, "bad", neck=30),
+        _snapshot(posture_session, at(0, 50), 40, "risky"),
+        _snapshot(posture_session, at(1, 10), 70, "good"),
+        _snapshot(posture_session, at(5), 20, "bad"),  # at the cutoff: kept raw
+    ])
+    await db.flush()
+
+    assert await rollup_snapshots(db, at(5)) == 2
+    rows = (await db.scalars(
+        select(SnapshotRollup)
+        .where(SnapshotRollup.session_id == posture_session.id)
+        .order_by(SnapshotRollup.minute)
+    )).all()
+    first, second = rows
+    assert first.minute == at(0)
+    counts = first.sample_count, first.good_count, first.bad_count, first.risky_count
+    assert counts == (3, 1, 1, 1)
+    assert first.avg_posture_score == pytest.approx(60)
+    assert (first.min_posture_score, first.max_posture_score) == (40, 90)
+    assert first.avg_neck_angle == pytest.approx(20)  # NULL angles are left out
+    assert first.avg_shoulder_tilt is None
+    assert (second.minute, second.sample_count, second.avg_posture_score) == (at(1), 1, 70)
+
+
+@pytest.mark.anyio
+async def test_rollup_merges_a_minute_split_across_runs(db, posture_session):
+    db.add_all([
+        _snapshot(posture_session, at(0, 10), 80, "good", neck=10),
+        _snapshot(posture_session, at(0, 20), 60, "good", neck=20),
+        _snapshot(posture_session, at(0, 40), 20, "bad", neck=40),
+    ])
+    await db.flush()
+
+    await run_retention(db, at(0, 30))
+    await run_retention(db, at(1))
+
+    rollup = await db.scalar(
+        select(SnapshotRollup).where(SnapshotRollup.session_id == posture_session.id)
+    )
+    await db.refresh(rollup)
+    assert (rollup.sample_count, rollup.good_count, rollup.bad_count) == (3, 2, 1)
+    assert rollup.avg_posture_score == pytest.approx(160 / 3)  # weighted, not (70 + 20) / 2
+    assert (rollup.min_posture_score, rollup.max_posture_score) == (20, 80)
+    assert rollup.avg_neck_angle == pytest.approx(70 / 3)
+
+
+@pytest.mark.anyio
+async def test_retention_removes_only_rows_before_the_cutoff(db, posture_session):
+    db.add_all([
+        _snapshot(posture_session, at(0, 59), 50, "bad"),
+        _snapshot(posture_session, at(1), 60, "good"),
+        _snapshot(posture_session, at(2), 70, "good"),
+    ])
+    await db.flush()
+
+    await run_retention(db, at(1))
+
+    assert await db.scalar(select(SnapshotRollup.sample_count).where(
+        SnapshotRollup.session_id == posture_session.id
+    )) == 1
+    kept = await db.scalars(
+        select(PostureSnapshot.captured_at)
+        .where(PostureSnapshot.session_id == posture_session.id)
+        .order_by(PostureSnapshot.captured_at)
+    )
+    assert kept.all() == [at(1), at(2)]
+
+
+@pytest.mark.anyio
+async def test_ensure_partitions_moves_rows_out_of_the_default_partition(
+    db, posture_session, monkeypatch
+):
+    monkeypatch.setattr(retention_service.settings, "SNAPSHOT_PARTITION_MONTHS", 12)
+    await convert_to_partitioned(db)
+    # older than any partition created on conversion, so it lands in the DEFAULT partition
+    snapshot = _snapshot(posture_session, datetime(2001, 6, 1, tzinfo=UTC), 50, "good")
+    db.add(snapshot)
+    await db.flush()
+    partition_of = text("SELECT tableoid::regclass::text FROM snapshots WHERE id = :id").bindparams(
+        id=snapshot.id
+    )
+
+    assert await db.scalar(partition_of) == "snapshots_default"
+    created = await ensure_partitions(db, start=date(2001, 1, 1))
+    assert "snapshots_p200101" in created
+    assert await db.scalar(partition_of) == "snapshots_p200101"
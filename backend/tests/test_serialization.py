@@ -0,0 +1,90 @@
+"""orjson list bodies: datetimes and UUIDs encoded as Pydantic would, in every format."""
+import uuid
+from datetime import UTC, datetime, timedelta, timezone
+
+import orjson
+import pytest
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.models.snapshot import PostureSnapshot
+from app.models.user import User
+from app.routers.snapshots import list_snapshots
+from app.schemas.snapshot import SnapshotResponse
+from app.serialization import dumps
+
+pytestmark = pytest.mark.anyio
+
+T0 = datetime(2024, 1, 1, 9, 30, 15, 123456, tzinfo=UTC)
+
+
+def test_datetimes_and_uuids_match_pydantic():
+    row_id = uuid.UUID("12345678-1234-5678-1234-567812345678")
+    values = {
+        "utc": T0,
+        "offset": T0.astimezone(timezone(timedelta(hours=2))),
+        "whole_second": T0.replace(microsecond=0),
+        "naive": T0.replace(tzinfo=None),
+        "id": row_id,
+    }
+
+    assert dumps(values) == TypeAdapter(dict).dump_json(values)
+    assert orjson.loads(dumps(values)) == {
+        "utc": "2024-01-01T09:30:15.123456Z",
+        "offset": "2024-01-01T11:30:15.123456+02:00",
+        "whole_second": "2024-01-01T09:30:15Z",
+        "naive": "2024-01-01T09:30:15.123456",
+        "id": "12345678-1234-5678-1234-567812345678",
+    }
+
+
+def test_non_string_keys_are_written_as_strings():
+    assert dumps({1: T0.date(), uuid.UUID(int=0): None}) == (
+        b'{"1":"2024-01-01","00000000-0000-0000-0000-000000000000":null}'
+    )
+
+
+async def _list(db, session, fmt: str):
+    response = Response()
+    return await list_snapshots(
+        response, session_id=session.id, limit=10, offset=0, cursor=None, fmt=fmt,
+        db=db, user=User(id=session.user_id),
+    )
+
+
+async def _stored(db, session) -> list[PostureSnapshot]:
+    rows = [
+        PostureSnapshot(
+            session_id=session.id, user_id=session.user_id, captured_at=T0 - timedelta(minutes=i),
+            posture_score=80.0 - i, posture_state="good", neck_angle=None if i else 12.5,
+        )
+        for i in range(3)
+    ]
+    db.add_all(rows)
+    await db.flush()
+    return rows
+
+
+async def test_the_json_body_is_the_response_model_output(db, posture_session):
+    rows = await _stored(db, posture_session)
+
+    body = (await _list(db, posture_session, "json")).body
+
+    expected = TypeAdapter(list[SnapshotResponse]).dump_json(
+        [SnapshotResponse.model_validate(r, from_attributes=True) for r in rows]
+    )
+    assert orjson.loads(body) == orjson.loads(expected)
+    assert b'"captured_at":"2024-01-01T09:30:15.123456Z"' in body
+
+
+async def test_columnar_and_ndjson_carry_the_same_values(db, posture_session):
+    await _stored(db, posture_session)
+    objects = orjson.loads((await _list(db, posture_session, "json")).body)
+
+    columns = orjson.loads((await _list(db, posture_session, "columnar")).body)
+    rows = zip(*columns.values(), strict=True)
+    assert [dict(zip(columns, values, strict=True)) for values in rows] == objects
+
+    streamed = await _list(db, posture_session, "ndjson")
+    chunks = [chunk async for chunk in streamed.body_iterator]
+    assert [orjson.loads(line) for line in b"".join(chunks).splitlines()] == objects
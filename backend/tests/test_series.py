@@ -0,0 +1,107 @@
+"""Snapshot series: bucket sizing, the MAX_BUCKETS bound and LTTB downsampling."""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.schemas.snapshot import MinAvgMax, SeriesBucket
+from app.services.series_service import (
+    MAX_BUCKETS,
+    bucket_count,
+    bucket_width_for,
+    lttb,
+    snapshot_series,
+)
+
+T0 = datetime(2024, 1, 1, 10, tzinfo=UTC)
+
+
+def _bucket(i: int, score: float) -> SeriesBucket:
+    empty = MinAvgMax(min=None, avg=None, max=None)
+    return SeriesBucket(
+        bucket_start=T0 + timedelta(minutes=i), count=1,
+        posture_score=MinAvgMax(min=score, avg=score, max=score),
+        neck_angle=empty, shoulder_tilt=empty, spine_angle=empty, good=1, bad=0, risky=0,
+    )
+
+
+def test_bucket_width_covers_the_span():
+    assert bucket_width_for(100, T0, T0 + timedelta(seconds=1000)) == 10
+    assert bucket_width_for(3, T0, T0 + timedelta(seconds=10)) == 4  # rounded up
+    assert bucket_width_for(100, T0, T0) == 1
+
+
+def test_bucket_count_uses_epoch_aligned_buckets():
+    assert bucket_count(60, T0, T0 + timedelta(seconds=59)) == 1
+    assert bucket_count(60, T0 + timedelta(seconds=30), T0 + timedelta(seconds=90)) == 2
+    assert bucket_count(1, T0, T0 + timedelta(hours=1)) == 3601
+
+
+def test_lttb_keeps_the_ends_and_the_extremes():
+    scores = [50.0] * 100
+    scores[37], scores[71] = 95.0, 5.0
+    buckets = [_bucket(i, s) for i, s in enumerate(scores)]
+
+    picked = lttb(buckets, 10)
+
+    assert len(picked) == 10
+    assert picked[0] is buckets[0] and picked[-1] is buckets[-1]
+    assert buckets[37] in picked and buckets[71] in picked
+    assert picked == sorted(picked, key=lambda b: b.bucket_start)
+
+
+def test_lttb_returns_short_series_unchanged():
+    buckets = [_bucket(i, i) for i in range(5)]
+    assert lttb(buckets, 5) is buckets
+    assert lttb(buckets, 2) is buckets
+
+
+async def _seed(db, session, seconds: int):
+    await db.execute(
+        text(
+            "INSERT INTO snapshots "
+            "(id, session_id, user_id, captured_at, posture_score, posture_state) "
+            "SELECT gen_random_uuid()::text, :session, :user, "
+            "CAST(:t0 AS timestamptz) + make_interval(secs => n), "
+            "n % 100, 'good' FROM generate_series(0, :last) n"
+        ),
+        {"session": session.id, "user": session.user_id, "t0": T0, "last": seconds - 1},
+    )
+
+
+@pytest.mark.anyio
+async def test_too_many_explicit_buckets_are_refused(db, posture_session):
+    await _seed(db, posture_session, 2)
+    await db.execute(
+        text("UPDATE snapshots SET captured_at = captured_at + interval '2 hours' "
+             "WHERE session_id = :s AND posture_score = 1"),
+        {"s": posture_session.id},
+    )
+    with pytest.raises(ValueError, match="buckets"):
+        await snapshot_series(posture_session.user_id, db, posture_session.id, bucket_seconds=1)
+
+    width, buckets = await snapshot_series(
+        posture_session.user_id, db, posture_session.id, bucket_seconds=2
+    )
+    assert (width, len(buckets)) == (2, 2)
+
+
+@pytest.mark.anyio
+async def test_derived_buckets_cover_the_whole_span(db, posture_session):
+    # LTTB asks the database for 4x the points; 2000 points over 6000 one-second
+    # snapshots would be 6000 buckets, so the width is widened to stay within MAX_BUCKETS
+    await _seed(db, posture_session, 6000)
+
+    width, buckets = await snapshot_series(
+        posture_session.user_id, db, posture_session.id, points=2000, downsample="lttb"
+    )
+
+    assert bucket_count(width, T0, T0 + timedelta(seconds=5999)) <= MAX_BUCKETS
+    assert len(buckets) == 2000
+    assert buckets[-1].bucket_start + timedelta(seconds=width) > T0 + timedelta(seconds=5999)
+
+
+@pytest.mark.anyio
+async def test_no_rows_give_an_empty_series(db, posture_session):
+    series = await snapshot_series(posture_session.user_id, db, posture_session.id, points=100)
+    assert series == (1, [])
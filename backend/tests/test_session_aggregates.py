@@ -0,0 +1,104 @@
+"""Running session aggregates kept on ingest agree with recomputing them from the rows."""
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+
+from app.models.session import PostureSession
+from app.models.user import User
+from app.routers.alerts import create_alert
+from app.routers.snapshots import create_snapshot
+from app.schemas.alert import AlertCreate
+from app.schemas.session import EndSessionRequest
+from app.schemas.snapshot import SnapshotBatchItem, SnapshotCreate
+from app.services import session_service
+from app.services.alert_service import insert_alerts
+from app.services.session_service import compute_session_stats, finalize_aggregates
+from app.services.snapshot_service import insert_snapshots
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def running(monkeypatch):
+    monkeypatch.setattr(session_service.settings, "SESSION_AGGREGATES", "running")
+
+
+def _snapshot(session_id: str, score: float) -> SnapshotBatchItem:
+    state = "good" if score >= 70 else "slouching"
+    return SnapshotBatchItem(session_id=session_id, posture_score=score, posture_state=state)
+
+
+async def _ingest(db, posture_session) -> PostureSession:
+    """Feed both sessions of one user through every write path; returns the second one."""
+    user = User(id=posture_session.user_id)
+    other = PostureSession(
+        id=str(uuid.uuid4()), user_id=user.id, started_at=datetime(2024, 1, 1, 10, tzinfo=UTC)
+    )
+    db.add(other)
+    await db.flush()
+
+    first, second = posture_session.id, other.id
+    scores = [(first, 90.0), (second, 40.0), (first, 55.5), (first, 72.0), (second, 88.0)]
+    await insert_snapshots(user.id, [_snapshot(sid, score) for sid, score in scores], db)
+    await insert_snapshots(user.id, [_snapshot(first, 10.0)], db)
+    await create_snapshot(
+        SnapshotCreate(session_id=second, posture_score=95.0, posture_state="good"), db, user
+    )
+
+    alerts = [AlertCreate(session_id=sid, alert_type=kind, message="!") for sid, kind in
+              [(first, "slouch"), (first, "slouch"), (second, "neck"), (first, "neck")]]
+    await insert_alerts(user.id, alerts, db)
+    await create_alert(AlertCreate(session_id=second, alert_type="neck", message="!"), db, user)
+    return other
+
+
+async def test_running_counters_match_a_recount(db, posture_session, running):
+    other = await _ingest(db, posture_session)
+
+    for session in (posture_session, other):
+        await db.refresh(session)
+        stats = await compute_session_stats(session.id, db)
+        assert session.snapshot_count == stats.snapshot_count
+        assert session.score_sum / session.snapshot_count == pytest.approx(
+            stats.avg_posture_score
+        )
+        assert session.good_count * 100 / session.snapshot_count == pytest.approx(
+            stats.good_posture_percent
+        )
+        assert session.total_alerts == stats.total_alerts
+
+    assert (posture_session.snapshot_count, posture_session.total_alerts) == (4, 3)
+    assert (other.snapshot_count, other.total_alerts) == (3, 2)
+
+
+async def test_running_and_query_modes_end_a_session_alike(
+    db, posture_session, running, monkeypatch
+):
+    await _ingest(db, posture_session)
+    await db.refresh(posture_session)
+    body = EndSessionRequest(avg_posture_score=1.0, good_posture_percent=1.0, total_alerts=99)
+
+    ended = {}
+    for mode in ("running", "query"):
+        monkeypatch.setattr(session_service.settings, "SESSION_AGGREGATES", mode)
+        await finalize_aggregates(posture_session, body, db)
+        ended[mode] = (
+            posture_session.avg_posture_score,
+            posture_session.good_posture_percent,
+            posture_session.total_alerts,
+        )
+
+    assert ended["running"] == pytest.approx(ended["query"])
+    assert ended["running"][2] == 3  # the client's numbers are ignored
+
+
+async def test_a_session_without_snapshots_keeps_the_clients_scores(
+    db, posture_session, running
+):
+    body = EndSessionRequest(avg_posture_score=64.0, good_posture_percent=50.0, total_alerts=7)
+
+    await finalize_aggregates(posture_session, body, db)
+
+    assert (posture_session.avg_posture_score, posture_session.good_posture_percent) == (64, 50)
+    assert posture_session.total_alerts == 0  # alerts are always the server's count
@@ -0,0 +1,113 @@
+"""Ending a session: the 409 on a second end, concurrent ends, streaks and badges."""
+import asyncio
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.models.gamification import UserBadge, UserStats, UserStreak
+from app.models.rollup import DailyUserStats
+from app.models.session import PostureSession
+from app.models.user import User
+from app.routers.sessions import end_session
+from app.schemas.session import EndSessionRequest
+
+pytestmark = pytest.mark.anyio
+
+BODY = EndSessionRequest(avg_posture_score=72.0, good_posture_percent=60.0)
+
+
+async def _end(db, session: PostureSession):
+    user = User(id=session.user_id)
+    return await end_session(session.id, BODY, db, user)
+
+
+async def _start(db, user_id: str) -> PostureSession:
+    session = PostureSession(id=str(uuid.uuid4()), user_id=user_id, started_at=datetime.now(UTC))
+    db.add(session)
+    await db.flush()
+    return session
+
+
+async def _streak(db, user_id: str, current: int, longest: int, days_ago: int):
+    today = datetime.now(UTC).date()
+    db.add(UserStreak(user_id=user_id, current_streak=current, longest_streak=longest,
+                      last_active_date=today - timedelta(days=days_ago)))
+    await db.flush()
+
+
+async def test_a_second_end_is_refused(db, posture_session):
+    ended = await _end(db, posture_session)
+    assert ended.status == "completed"
+
+    with pytest.raises(HTTPException) as exc:
+        await _end(db, posture_session)
+    assert exc.value.status_code == 409
+
+
+async def test_concurrent_ends_record_the_session_once(committed_session):
+    async def end():
+        async with AsyncSessionLocal() as db:
+            return await _end(db, committed_session)
+
+    results = await asyncio.gather(end(), end(), end(), end(), return_exceptions=True)
+
+    refused = [r for r in results if isinstance(r, HTTPException)]
+    assert len(refused) == 3 and {r.status_code for r in refused} == {409}
+    user_id = committed_session.user_id
+    async with AsyncSessionLocal() as db:
+        stats = await db.get(UserStats, user_id)
+        streak = await db.scalar(select(UserStreak).where(UserStreak.user_id == user_id))
+        day = await db.scalar(select(DailyUserStats).where(DailyUserStats.user_id == user_id))
+        badges = await db.scalar(select(func.count()).where(UserBadge.user_id == user_id))
+    assert stats.total_sessions == 1
+    assert stats.badge_count == badges  # each earned badge counted once
+    assert (streak.current_streak, day.sessions) == (1, 1)
+
+
+async def test_a_streak_continues_from_yesterday(db, posture_session):
+    user_id = posture_session.user_id
+    await _streak(db, user_id, current=2, longest=2, days_ago=1)
+
+    await _end(db, await _start(db, user_id))
+
+    streak = await db.scalar(select(UserStreak).where(UserStreak.user_id == user_id))
+    assert (streak.current_streak, streak.longest_streak) == (3, 3)
+    assert streak.last_active_date == datetime.now(UTC).date()
+    held = await db.scalars(select(UserBadge.badge_key).where(UserBadge.user_id == user_id))
+    assert "streak_3" in held.all()
+
+
+async def test_a_missed_day_resets_the_streak(db, posture_session):
+    user_id = posture_session.user_id
+    await _streak(db, user_id, current=4, longest=6, days_ago=2)
+
+    await _end(db, await _start(db, user_id))
+
+    streak = await db.scalar(select(UserStreak).where(UserStreak.user_id == user_id))
+    assert (streak.current_streak, streak.longest_streak) == (1, 6)
+
+
+async def test_a_second_session_the_same_day_keeps_the_streak(db, posture_session):
+    user_id = posture_session.user_id
+    await _streak(db, user_id, current=2, longest=2, days_ago=1)
+
+    await _end(db, await _start(db, user_id))
+    await _end(db, await _start(db, user_id))
+
+    streak = await db.scalar(select(UserStreak).where(UserStreak.user_id == user_id))
+    assert streak.current_streak == 3
+
+
+async def test_a_badge_is_awarded_once(db, posture_session):
+    user_id = posture_session.user_id
+    await _end(db, await _start(db, user_id))
+    await _end(db, await _start(db, user_id))
+
+    held = await db.scalars(select(UserBadge.badge_key).where(UserBadge.user_id == user_id))
+    assert held.all() == ["first_session"]
+    stats = await db.get(UserStats, user_id)
+    assert (stats.total_sessions, stats.badge_count) == (2, 1)
@@ -0,0 +1,70 @@
+"""POST /snapshots/batch: one insert for the whole batch, all or nothing on ownership."""
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.models.session import PostureSession
+from app.models.snapshot import PostureSnapshot
+from app.models.user import User
+from app.routers.snapshots import create_snapshots_batch
+from app.schemas.snapshot import SnapshotBatchCreate
+
+pytestmark = pytest.mark.anyio
+
+T0 = datetime(2024, 1, 1, 9, 30, tzinfo=UTC)
+
+
+def _batch(*items: tuple[str, float, datetime | None]) -> SnapshotBatchCreate:
+    return SnapshotBatchCreate(snapshots=[
+        {"session_id": sid, "posture_score": score, "posture_state": "good", "captured_at": ts}
+        for sid, score, ts in items
+    ])
+
+
+async def _count(db, session_id: str) -> int:
+    q = select(func.count()).where(PostureSnapshot.session_id == session_id)
+    return await db.scalar(q)
+
+
+async def test_a_batch_is_written_in_order(db, posture_session):
+    user = User(id=posture_session.user_id)
+    body = _batch((posture_session.id, 70.0, T0), (posture_session.id, 90.0, None))
+
+    response = await create_snapshots_batch(body, db, user)
+
+    assert response.accepted == 2
+    written = await db.scalars(select(PostureSnapshot).where(PostureSnapshot.id.in_(response.ids)))
+    rows = {s.id: s for s in written}
+    first, second = (rows[i] for i in response.ids)
+    assert (first.posture_score, first.captured_at, first.user_id) == (70.0, T0, user.id)
+    assert second.posture_score == 90.0 and second.captured_at > T0  # server time
+
+
+async def test_an_unknown_session_fails_the_whole_batch(db, posture_session):
+    user = User(id=posture_session.user_id)
+    body = _batch((posture_session.id, 70.0, T0), ("no-such-session", 80.0, T0))
+
+    with pytest.raises(HTTPException) as exc:
+        await create_snapshots_batch(body, db, user)
+
+    assert (exc.value.status_code, exc.value.detail) == (404, "Session not found: no-such-session")
+    assert await _count(db, posture_session.id) == 0
+
+
+async def test_another_users_session_is_not_found(db, posture_session):
+    other = User(id=str(uuid.uuid4()), email=f"{uuid.uuid4()}@example.com", hashed_password="x")
+    db.add(other)
+    await db.flush()
+    theirs = PostureSession(id=str(uuid.uuid4()), user_id=other.id, started_at=T0)
+    db.add(theirs)
+    await db.flush()
+
+    user = User(id=posture_session.user_id)
+    with pytest.raises(HTTPException) as exc:
+        await create_snapshots_batch(_batch((theirs.id, 70.0, T0)), db, user)
+
+    assert exc.value.status_code == 404
+    assert await _count(db, theirs.id) == 0
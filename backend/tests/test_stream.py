@@ -0,0 +1,147 @@
+"""The session websocket stream: batch and timed flushes, the final flush on disconnect, and
+backpressure from its bounded queue."""
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal, engine
+from app.main import app
+from app.models.alert import PostureAlert
+from app.models.snapshot import PostureSnapshot
+from app.routers import sessions
+from app.services import stream_service
+from app.services.auth_service import create_access_token, new_token_family
+
+pytestmark = pytest.mark.anyio
+settings = get_settings()
+
+SNAPSHOT = {"type": "snapshot", "posture_score": 80.0, "posture_state": "good"}
+ALERT = {"type": "alert", "alert_type": "slouch", "message": "Sit up"}
+
+
+@pytest.fixture
+async def client(committed_session):
+    # the test client runs the app on an event loop of its own, and pooled connections cannot
+    # move between loops: every session gets a connection of its own for the test
+    unpooled = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    AsyncSessionLocal.configure(bind=unpooled)
+    client = TestClient(app)
+    client.cookies["access_token"] = create_access_token(
+        committed_session.user_id, new_token_family()
+    )
+    try:
+        yield client
+    finally:
+        client.close()
+        AsyncSessionLocal.configure(bind=engine)
+        await unpooled.dispose()
+
+
+def _stream(client: TestClient, session):
+    return client.websocket_connect(f"/sessions/{session.id}/stream")
+
+
+async def _written(session) -> tuple[int, int]:
+    async with AsyncSessionLocal() as db:
+        snapshots = await db.scalar(
+            select(func.count()).where(PostureSnapshot.session_id == session.id)
+        )
+        alerts = await db.scalar(
+            select(func.count()).where(PostureAlert.session_id == session.id)
+        )
+    return snapshots, alerts
+
+
+async def test_a_full_batch_is_written_at_once(client, committed_session, monkeypatch):
+    monkeypatch.setattr(stream_service.settings, "STREAM_BATCH_SIZE", 3)
+    monkeypatch.setattr(stream_service.settings, "STREAM_FLUSH_SECONDS", 60)
+
+    with _stream(client, committed_session) as ws:
+        for frame in (SNAPSHOT, ALERT, SNAPSHOT):
+            ws.send_json(frame)
+        assert ws.receive_json() == {"type": "ack", "snapshots": 2, "alerts": 1}
+
+    assert await _written(committed_session) == (2, 1)
+
+
+async def test_a_partial_batch_is_written_after_the_flush_interval(
+    client, committed_session, monkeypatch
+):
+    monkeypatch.setattr(stream_service.settings, "STREAM_FLUSH_SECONDS", 0.05)
+
+    with _stream(client, committed_session) as ws:
+        ws.send_json(SNAPSHOT)
+        assert ws.receive_json() == {"type": "ack", "snapshots": 1, "alerts": 0}
+
+
+async def test_a_bad_frame_is_answered_and_skipped(client, committed_session, monkeypatch):
+    monkeypatch.setattr(stream_service.settings, "STREAM_FLUSH_SECONDS", 0.05)
+
+    with _stream(client, committed_session) as ws:
+        ws.send_json({"type": "video"})
+        assert ws.receive_json() == {"type": "error", "detail": "Unknown frame type: video"}
+        ws.send_json(SNAPSHOT)
+        assert ws.receive_json()["type"] == "ack"
+
+
+async def test_what_is_buffered_at_disconnect_is_still_written(
+    client, committed_session, monkeypatch
+):
+    monkeypatch.setattr(stream_service.settings, "STREAM_FLUSH_SECONDS", 60)
+
+    with _stream(client, committed_session) as ws:
+        for frame in (SNAPSHOT, SNAPSHOT, ALERT):
+            ws.send_json(frame)
+        ws.close()
+        # leaving the block cancels the app, which a real server would not do on disconnect
+        for _ in range(50):
+            if await _written(committed_session) == (2, 1):
+                break
+            await asyncio.sleep(0.02)
+
+    assert await _written(committed_session) == (2, 1)
+
+
+async def test_a_stalled_writer_stops_the_reader(client, committed_session, monkeypatch):
+    monkeypatch.setattr(stream_service.settings, "STREAM_BATCH_SIZE", 1)
+    monkeypatch.setattr(stream_service.settings, "STREAM_MAX_PENDING", 2)
+    gate = threading.Event()
+    streams: list[stream_service.SessionStream] = []
+    read = 0
+
+    class Stalled(stream_service.SessionStream):
+        def __init__(self, *args):
+            super().__init__(*args)
+            streams.append(self)
+
+        def _parse(self, frame):
+            nonlocal read
+            read += 1
+            return super()._parse(frame)
+
+        async def _flush(self, snapshots, alerts):
+            await asyncio.to_thread(gate.wait)
+            await super()._flush(snapshots, alerts)
+
+    monkeypatch.setattr(sessions, "SessionStream", Stalled)
+
+    with _stream(client, committed_session) as ws:
+        for _ in range(10):
+            ws.send_json(SNAPSHOT)
+        time.sleep(0.2)
+        # one batch held by the writer, a full queue, and one frame waiting to be queued
+        assert streams[0]._queue.full()
+        assert read == 1 + 2 + 1
+
+        gate.set()
+        acks = [ws.receive_json() for _ in range(10)]
+        assert {a["snapshots"] for a in acks} == {1}
+
+    assert await _written(committed_session) == (10, 0)
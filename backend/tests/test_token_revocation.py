@@ -0,0 +1,169 @@
+"""Refresh-token rotation, family revocation, the revocation list and its Bloom filter."""
+import math
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi import Response
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models.user import RevokedToken
+from app.routers.auth import logout
+from app.services import token_revocation, user_cache
+from app.services.auth_service import create_access_token, new_token_family
+from app.services.token_revocation import (
+    BloomFilter,
+    RevocationList,
+    revoke_family,
+    rotate_refresh_token,
+)
+from app.services.user_cache import user_id_from_token
+
+
+def test_sizing_follows_the_error_rate():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.001)
+    assert bloom.size == math.ceil(-10_000 * math.log(0.001) / math.log(2) ** 2)  # ~14.4 bits/key
+    assert bloom.hashes == 10
+    assert len(bloom._bits) * 8 >= bloom.size
+
+
+def test_added_keys_are_always_found():
+    bloom = BloomFilter(capacity=1_000, error_rate=0.01)
+    keys = [f"jti-{n}" for n in range(1_000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    assert bloom.count == 1_000
+
+
+def test_false_positive_rate_stays_near_the_target_at_capacity():
+    bloom = BloomFilter(capacity=5_000, error_rate=0.01)
+    for n in range(5_000):
+        bloom.add(f"revoked-{n}")
+    false_positives = sum(f"live-{n}" in bloom for n in range(20_000))
+    assert false_positives / 20_000 < 0.02
+
+
+def test_an_empty_filter_contains_nothing():
+    bloom = BloomFilter(capacity=100, error_rate=0.001)
+    assert "anything" not in bloom
+
+
+@pytest.fixture
+def revocations(monkeypatch) -> RevocationList:
+    """A fresh, empty revocation list in place of the process-wide one."""
+    fresh = RevocationList()
+    monkeypatch.setattr(token_revocation, "revocations", fresh)
+    monkeypatch.setattr(user_cache, "revocations", fresh)
+    return fresh
+
+
+def _refresh_claims(user_id: str, family: str) -> dict:
+    exp = int(time.time()) + 3600
+    return {"sub": user_id, "fam": family, "jti": uuid.uuid4().hex, "exp": exp}
+
+
+async def _revoked(key: str) -> RevokedToken | None:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(RevokedToken).where(RevokedToken.key == key))
+
+
+async def _rotate(claims: dict) -> bool:
+    async with AsyncSessionLocal() as db:
+        rotated = await rotate_refresh_token(claims, db)
+        await db.commit()
+    return rotated
+
+
+@pytest.mark.anyio
+async def test_a_refresh_token_is_spent_once(committed_session, revocations):
+    claims = _refresh_claims(committed_session.user_id, new_token_family())
+
+    assert await _rotate(claims)
+    assert (await _revoked(claims["jti"])).reason == "rotated"
+    # a second tab refreshing with the same cookie inside the grace window still works
+    assert await _rotate(claims)
+    assert await _revoked(claims["fam"]) is None
+
+
+@pytest.mark.anyio
+async def test_reusing_a_rotated_token_revokes_the_family(
+    committed_session, revocations, monkeypatch
+):
+    monkeypatch.setattr(token_revocation.settings, "REFRESH_REUSE_GRACE_SECONDS", 0)
+    family = new_token_family()
+    stolen = _refresh_claims(committed_session.user_id, family)
+    assert await _rotate(stolen)
+
+    assert not await _rotate(stolen)
+
+    assert (await _revoked(family)).reason == "reuse"
+    # every other token of the family is refused from now on, unspent ones included
+    assert not await _rotate(_refresh_claims(committed_session.user_id, family))
+
+
+@pytest.mark.anyio
+async def test_revoke_family_records_the_family_until_its_tokens_expire(
+    committed_session, revocations
+):
+    family = new_token_family()
+    async with AsyncSessionLocal() as db:
+        await revoke_family(family, committed_session.user_id, "logout", db)
+        await revoke_family(family, committed_session.user_id, "logout", db)  # idempotent
+        await db.commit()
+
+    row = await _revoked(family)
+    lifetime = timedelta(days=token_revocation.settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    expected = datetime.now(UTC) + lifetime
+    assert row.reason == "logout"
+    assert abs(row.expires_at - expected) < timedelta(minutes=1)
+    assert await revocations.is_revoked(family)
+
+
+@pytest.mark.anyio
+async def test_an_access_token_is_refused_after_logout(committed_session, revocations):
+    user_id = committed_session.user_id
+    token = create_access_token(user_id, new_token_family())
+    assert await user_id_from_token(token) == user_id
+
+    async with AsyncSessionLocal() as db:
+        await logout(Response(), access_token=token, refresh_token=None, db=db)
+
+    assert await user_id_from_token(token) is None
+
+
+@pytest.mark.anyio
+async def test_reloads_pick_up_keys_revoked_elsewhere(committed_session, revocations):
+    await revocations.load(full=True)
+    bloom = revocations._bloom
+    family = new_token_family()
+    # revoked by another process: in the table, not yet in this filter
+    async with AsyncSessionLocal() as db:
+        db.add(RevokedToken(key=family, user_id=committed_session.user_id, reason="logout",
+                            expires_at=datetime.now(UTC) + timedelta(days=1)))
+        await db.commit()
+    assert not await revocations.is_revoked(family)
+
+    await revocations.load()
+
+    assert revocations._bloom is bloom  # added to, not rebuilt
+    assert await revocations.is_revoked(family)
+    assert revocations.reloads == 2
+
+
+@pytest.mark.anyio
+async def test_filter_hits_are_confirmed_once(committed_session, revocations):
+    family = new_token_family()
+    async with AsyncSessionLocal() as db:
+        await revoke_family(family, committed_session.user_id, "logout", db)
+        await db.commit()
+    revocations.add("not-revoked")  # stands in for a false positive
+
+    assert await revocations.is_revoked(family)
+    assert await revocations.is_revoked(family)
+    assert not await revocations.is_revoked("not-revoked")
+    assert not await revocations.is_revoked(new_token_family())  # a miss needs no query
+
+    assert (revocations.confirmations, revocations.false_positives) == (2, 1)
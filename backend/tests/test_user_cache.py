@@ -0,0 +1,78 @@
+"""The in-process user and token caches: hits, invalidation and the switches."""
+import pytest
+from sqlalchemy import delete, select
+
+from app.models.user import User
+from app.services import user_cache
+from app.services.auth_service import create_access_token, create_refresh_token
+from app.services.user_cache import load_user, user_id_from_token
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(user_cache.settings, "USER_CACHE_ENABLED", True)
+    monkeypatch.setattr(user_cache.settings, "TOKEN_CACHE_ENABLED", True)
+
+
+async def _user(db, posture_session) -> User:
+    return await db.scalar(select(User).where(User.id == posture_session.user_id))
+
+
+async def test_a_cached_user_is_served_without_a_query(db, posture_session, enabled):
+    user_id = posture_session.user_id
+    first = await load_user(user_id, db)
+    hits = user_cache._users.hits
+
+    # a Core delete skips the ORM hooks, so only the cache can still answer
+    await db.execute(delete(User).where(User.id == user_id))
+    again = await load_user(user_id, db)
+
+    assert again is first
+    assert user_cache._users.hits == hits + 1
+
+
+async def test_an_orm_update_drops_the_cached_user(db, posture_session, enabled):
+    user_id = posture_session.user_id
+    await load_user(user_id, db)
+
+    user = await _user(db, posture_session)
+    user.email = "renamed@example.com"
+    await db.flush()
+
+    assert user_cache._users.get(user_id) is None
+    assert (await load_user(user_id, db)).email == "renamed@example.com"
+
+
+async def test_an_orm_delete_drops_the_cached_user(db, posture_session, enabled):
+    user_id = posture_session.user_id
+    await load_user(user_id, db)
+
+    await db.delete(await _user(db, posture_session))
+    await db.flush()
+
+    assert await load_user(user_id, db) is None
+
+
+async def test_nothing_is_kept_when_the_cache_is_off(db, posture_session, monkeypatch):
+    monkeypatch.setattr(user_cache.settings, "USER_CACHE_ENABLED", False)
+    user_id = posture_session.user_id
+
+    await load_user(user_id, db)
+
+    assert user_cache._users.get(user_id) is None
+
+
+async def test_a_token_is_decoded_once(posture_session, enabled):
+    token = create_access_token(posture_session.user_id, "family")
+
+    assert await user_id_from_token(token) == posture_session.user_id
+    assert user_cache._tokens.get(token) == (posture_session.user_id, "family")
+    assert await user_id_from_token(token) == posture_session.user_id
+
+
+async def test_refresh_and_garbled_tokens_are_refused(posture_session, enabled):
+    assert await user_id_from_token(create_refresh_token(posture_session.user_id, "f")) is None
+    assert await user_id_from_token("not-a-token") is None
+    assert user_cache._tokens.get("not-a-token") is None
@@ -1,57 +1,29 @@
-import { api, Session, Snapshot } from "@/lib/api";
+import { api, Session } from "@/lib/api";
 import { format, parseISO } from "date-fns";
 
-export async function exportSessionsCSV() {
-  const { data: sessions } = await api.get<Session[]>("/sessions");
-  if (!sessions?.length) throw new Error("No sessions to export");
-
-  const headers = ["Date", "Start Time", "End Time", "Duration (min)", "Avg Score", "Alerts"];
-  const rows = sessions.map((s) => {
-    const start = parseISO(s.started_at);
-    const end = s.ended_at ? parseISO(s.ended_at) : null;
-    const duration = end ? Math.round((end.getTime() - start.getTime()) / 60000) : "In progress";
-    return [
-      format(start, "yyyy-MM-dd"),
-      format(start, "HH:mm:ss"),
-      end ? format(end, "HH:mm:ss") : "—",
-      String(duration),
-      String(s.avg_posture_score ?? "—"),
-      String(s.total_alerts ?? 0),
-    ];
-  });
-
-  const csv = [headers, ...rows].map((r) => r.join(",")).join("\n");
-  downloadFile(csv, "posture-sessions.csv", "text/csv");
-}
-
-export async function exportSnapshotsCSV() {
-  const { data: snapshots } = await api.get<Snapshot[]>("/snapshots?limit=1000");
-  if (!snapshots?.length) throw new Error("No snapshots to export");
-
-  const headers = ["Timestamp", "Score", "Status", "Neck Angle", "Spine Angle", "Shoulder Tilt"];
-  const rows = snapshots.map((s) => [
-    format(parseISO(s.captured_at), "yyyy-MM-dd HH:mm:ss"),
-    String(s.posture_score),
-    s.posture_state,
-    String(s.neck_angle ?? "—"),
-    String(s.spine_angle ?? "—"),
-    String(s.shoulder_tilt ?? "—"),
-  ]);
+type ExportResource = "sessions" | "snapshots" | "alerts";
 
-  const csv = [headers, ...rows].map((r) => r.join(",")).join("\n");
-  downloadFile(csv, "posture-snapshots.csv", "text/csv");
-}
+// The server streams the whole history straight to disk, so nothing is paged or held in memory here.
+// A plain link bypasses the 401 refresh interceptor, so a one-row request through `api` goes first:
+// it refreshes an expired access token and reports an empty history before the browser navigates.
+async function downloadExport(resource: ExportResource, fileFormat: "csv" | "ndjson" | "parquet") {
+  const { data } = await api.get<unknown[]>(`/${resource}?limit=1`);
+  if (!data?.length) throw new Error(`No ${resource} to export`);
 
-function downloadFile(content: string, filename: string, mimeType: string) {
-  const blob = new Blob([content], { type: mimeType });
-  const url = URL.createObjectURL(blob);
   const a = document.createElement("a");
-  a.href = url;
-  a.download = filename;
+  a.href = `${api.defaults.baseURL}/export/${resource}?format=${fileFormat}`;
+  a.download = `posture-${resource}.${fileFormat}`;
   document.body.appendChild(a);
   a.click();
   document.body.removeChild(a);
-  URL.revokeObjectURL(url);
+}
+
+export async function exportSessionsCSV() {
+  await downloadExport("sessions", "csv");
+}
+
+export async function exportSnapshotsCSV() {
+  await downloadExport("snapshots", "csv");
 }
 
 export async function generatePDFReport() {